@@ -0,0 +1,69 @@
+import sqlite3
+from datetime import datetime
+from database.connection import get_connection
+
+# تسجيل حالة عدة عمال ليوم واحد؛ السجل الموجود مسبقاً تُحدّث حالته فقط
+BATCH_ATTENDANCE_SQL = """
+    INSERT INTO attendance (worker_id, date, time_in, status, created_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (worker_id, date) DO UPDATE SET
+        status = excluded.status,
+        time_in = COALESCE(attendance.time_in, excluded.time_in)
+"""
+
+class AttendanceManager:
+    """تسجيل الحضور في قاعدة بيانات العمال"""
+
+    def __init__(self, db_path="database/workers.db"):
+        self.db_path = db_path
+
+    def get_db_connection(self):
+        try:
+            return get_connection(self.db_path)
+        except sqlite3.Error as e:
+            print(f"Database connection error: {str(e)}")
+            return None
+
+    def get_active_worker_ids(self):
+        """أرقام كل العمال النشطين"""
+        conn = self.get_db_connection()
+        if not conn:
+            return []
+        try:
+            return [row['id'] for row in conn.execute(
+                "SELECT id FROM workers WHERE status = 'نشط' ORDER BY name"
+            )]
+        finally:
+            conn.close()
+
+    def mark_attendance_batch(self, worker_ids, date, status):
+        """
+        تسجيل حالة واحدة لعدة عمال في يوم واحد بمعاملة واحدة
+        Args:
+            worker_ids: أرقام العمال
+            date: التاريخ
+            status: الحالة (حاضر، غائب، متأخر، إجازة)
+        Returns:
+            (نجاح العملية, رسالة النتيجة)
+        """
+        worker_ids = list(dict.fromkeys(worker_ids))
+        if not worker_ids:
+            return False, "الرجاء اختيار عامل واحد على الأقل"
+
+        conn = self.get_db_connection()
+        if not conn:
+            return False, "فشل الاتصال بقاعدة البيانات"
+
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        date = str(date)
+        try:
+            with conn:
+                conn.executemany(BATCH_ATTENDANCE_SQL, [
+                    (worker_id, date, current_time, status, current_time)
+                    for worker_id in worker_ids
+                ])
+            return True, f"تم تسجيل {len(worker_ids)} عامل بحالة {status}"
+        except sqlite3.Error as e:
+            return False, f"خطأ في تسجيل الحضور: {str(e)}"
+        finally:
+            conn.close()
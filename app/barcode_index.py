@@ -0,0 +1,128 @@
+"""
+فهرس رموز القطع في الذاكرة لوضع الماسح في شاشة البيع
+
+الرمز الممسوح يُبحث أولاً كما هو عبر فهرسي part_number و barcode. الخريطة
+تربط الرمز بعد توحيده (of 1001 = OF-1001) برقم القطعة، للرموز التي لا تطابق
+حرفياً، ويُتحقق من أن القطعة ما زالت تحمل الرمز قبل إرجاعها.
+كل كتابة لرقم قطعة أو باركود تستدعي invalidate_codes بعد الحفظ فتُعاد بناء
+الخرائط عند المسح التالي.
+"""
+
+import threading
+from typing import Optional
+from sqlalchemy import or_
+from app.part_cache import part_cache
+from database.models import Part
+from database.queries import PartRow
+
+# الأرقام العربية الهندية إلى أرقام لاتينية
+ARABIC_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
+
+# فواصل لا تميز الرمز (OF-1001 و of 1001 نفس القطعة)
+CODE_SEPARATORS = str.maketrans('', '', ' -_./\t')
+
+# رمز موحد يطابق أكثر من قطعة: لا يُعتمد إلا على المطابقة الحرفية
+AMBIGUOUS = None
+
+_codes_lock = threading.Lock()
+_codes_version = 0
+
+
+def normalize_code(code) -> str:
+    """توحيد الرمز: بدون مسافات وفواصل، بأحرف كبيرة وأرقام لاتينية"""
+    return str(code or '').translate(ARABIC_DIGITS).translate(CODE_SEPARATORS).upper()
+
+
+def codes_version() -> int:
+    with _codes_lock:
+        return _codes_version
+
+
+def invalidate_codes():
+    """إعلام كل الخرائط بتغير أرقام القطع أو الباركود (بعد الحفظ)"""
+    global _codes_version
+    with _codes_lock:
+        _codes_version += 1
+
+
+class BarcodeIndex:
+    """خريطة الرموز الموحدة إلى أرقام القطع"""
+
+    def __init__(self):
+        self.codes = {}
+        self.ready = False
+        self.version = None
+        self._lock = threading.Lock()
+
+    def build(self, session) -> int:
+        """
+        بناء الخريطة من كل القطع (عمودان فقط)
+        Returns:
+            عدد الرموز في الخريطة
+        """
+        # الإصدار قبل القراءة: أي تغيير أثناء البناء يعيد البناء لاحقاً
+        version = codes_version()
+        codes = {}
+        for part_number, barcode in session.query(Part.part_number, Part.barcode):
+            for code in (part_number, barcode):
+                key = normalize_code(code)
+                if not key:
+                    continue
+                if key in codes and codes[key] != part_number:
+                    codes[key] = AMBIGUOUS
+                else:
+                    codes[key] = part_number
+        with self._lock:
+            self.codes = codes
+            self.version = version
+            self.ready = True
+        return len(codes)
+
+    def is_current(self) -> bool:
+        with self._lock:
+            return self.ready and self.version == codes_version()
+
+    def part_number_for(self, code) -> Optional[str]:
+        """رقم القطعة للرمز الموحد (None إن لم يوجد أو طابق أكثر من قطعة)"""
+        with self._lock:
+            return self.codes.get(normalize_code(code))
+
+    def find(self, session, code) -> Optional[PartRow]:
+        """
+        سجل القطعة للرمز الممسوح أو None
+        Args:
+            session: جلسة قاعدة البيانات
+            code: الرمز كما أرسله الماسح
+        """
+        code = str(code or '').strip()
+        if not code:
+            return None
+
+        # المطابقة الحرفية أولاً (رقم القطعة قبل الباركود)
+        found = session.query(Part.part_number, Part.barcode).filter(
+            or_(Part.part_number == code, Part.barcode == code)
+        ).all()
+        if found:
+            found.sort(key=lambda row: row.part_number != code)
+            return part_cache.get(session, found[0].part_number)
+
+        key = normalize_code(code)
+        if not key:
+            return None
+        if not self.is_current():
+            self.build(session)
+
+        for _ in range(2):
+            part_number = self.part_number_for(key)
+            if part_number is None:
+                return None
+            # التأكد من أن القطعة ما زالت تحمل الرمز (تغيرت من جهاز آخر مثلاً)
+            current = session.query(Part.part_number, Part.barcode).filter_by(
+                part_number=part_number
+            ).first()
+            if current is not None and key in (normalize_code(current.part_number),
+                                               normalize_code(current.barcode)):
+                return part_cache.get(session, part_number)
+            # الخريطة قديمة: إعادة بنائها مرة واحدة
+            self.build(session)
+        return None
@@ -3,10 +3,49 @@ from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
 from database.models import Part
 from database.db_setup import Session
+from app.search import PartSearch
+from app.part_cache import part_cache
+from app.barcode_index import invalidate_codes
+from database.queries import PartRow
+
+def validate_part_data(part_data: Dict) -> Tuple[bool, str]:
+    """
+    التحقق من صحة بيانات القطعة
+    Args:
+        part_data: بيانات القطعة المراد التحقق منها
+    Returns:
+        (صحة البيانات, رسالة الخطأ)
+    """
+    try:
+        if not part_data.get('part_number'):
+            return False, "رقم القطعة مطلوب"
+        
+        if not part_data.get('name'):
+            return False, "اسم القطعة مطلوب"
+        
+        quantity = int(part_data.get('quantity', 0))
+        if quantity < 0:
+            return False, "الكمية يجب أن تكون أكبر من أو تساوي صفر"
+        
+        cost_price = float(part_data.get('cost_price', 0))
+        if cost_price <= 0:
+            return False, "سعر التكلفة يجب أن يكون أكبر من صفر"
+        
+        selling_price = float(part_data.get('selling_price', 0))
+        if selling_price <= 0:
+            return False, "سعر البيع يجب أن يكون أكبر من صفر"
+        
+        if selling_price < cost_price:
+            return False, "سعر البيع يجب أن يكون أكبر من سعر التكلفة"
+        
+        return True, ""
+        
+    except (ValueError, TypeError):
+        return False, "خطأ في تنسيق البيانات"
 
 class InventoryManager:
-    def __init__(self):
-        self.session = Session()
+    def __init__(self, session=None):
+        self.session = session or Session()
 
     def validate_part_data(self, part_data: Dict) -> Tuple[bool, str]:
         """
@@ -16,32 +55,7 @@ class InventoryManager:
         Returns:
             (صحة البيانات, رسالة الخطأ)
         """
-        try:
-            if not part_data.get('part_number'):
-                return False, "رقم القطعة مطلوب"
-            
-            if not part_data.get('name'):
-                return False, "اسم القطعة مطلوب"
-            
-            quantity = int(part_data.get('quantity', 0))
-            if quantity < 0:
-                return False, "الكمية يجب أن تكون أكبر من أو تساوي صفر"
-            
-            cost_price = float(part_data.get('cost_price', 0))
-            if cost_price <= 0:
-                return False, "سعر التكلفة يجب أن يكون أكبر من صفر"
-            
-            selling_price = float(part_data.get('selling_price', 0))
-            if selling_price <= 0:
-                return False, "سعر البيع يجب أن يكون أكبر من صفر"
-            
-            if selling_price < cost_price:
-                return False, "سعر البيع يجب أن يكون أكبر من سعر التكلفة"
-            
-            return True, ""
-            
-        except ValueError:
-            return False, "خطأ في تنسيق البيانات"
+        return validate_part_data(part_data)
 
     def add_part(self, part_data: Dict) -> Tuple[bool, str]:
         """
@@ -72,11 +86,14 @@ class InventoryManager:
                 type=part_data['type'],
                 quantity=int(part_data['quantity']),
                 cost_price=float(part_data['cost_price']),
-                selling_price=float(part_data['selling_price'])
+                selling_price=float(part_data['selling_price']),
+                barcode=part_data.get('barcode') or None
             )
 
             self.session.add(new_part)
             self.session.commit()
+            part_cache.invalidate(self.session, new_part.part_number)
+            invalidate_codes()
             return True, "تمت إضافة القطعة بنجاح"
 
         except SQLAlchemyError as e:
@@ -108,8 +125,12 @@ class InventoryManager:
             part.quantity = int(part_data['quantity'])
             part.cost_price = float(part_data['cost_price'])
             part.selling_price = float(part_data['selling_price'])
+            if 'barcode' in part_data:
+                part.barcode = part_data['barcode'] or None
 
             self.session.commit()
+            part_cache.invalidate(self.session, part_number)
+            invalidate_codes()
             return True, "تم تحديث بيانات القطعة بنجاح"
 
         except SQLAlchemyError as e:
@@ -131,6 +152,8 @@ class InventoryManager:
 
             self.session.delete(part)
             self.session.commit()
+            part_cache.invalidate(self.session, part_number)
+            invalidate_codes()
             return True, "تم حذف القطعة بنجاح"
 
         except SQLAlchemyError as e:
@@ -145,16 +168,7 @@ class InventoryManager:
         Returns:
             قائمة بالقطع المطابقة
         """
-        try:
-            query = self.session.query(Part)
-            if search_term:
-                query = query.filter(
-                    (Part.name.ilike(f'%{search_term}%')) |
-                    (Part.part_number.ilike(f'%{search_term}%'))
-                )
-            return query.all()
-        except SQLAlchemyError:
-            return []
+        return PartSearch(self.session).search(search_term)
 
     def get_low_stock_parts(self, threshold: int = 5) -> List[Part]:
         """
@@ -169,16 +183,16 @@ class InventoryManager:
         except SQLAlchemyError:
             return []
 
-    def get_part_by_number(self, part_number: str) -> Optional[Part]:
+    def get_part_by_number(self, part_number: str) -> Optional[PartRow]:
         """
-        استرجاع قطعة محددة برقمها
+        استرجاع قطعة محددة برقمها (من الذاكرة المؤقتة للقطع)
         Args:
             part_number: رقم القطعة
         Returns:
-            القطعة المطلوبة أو None
+            سجل القطعة للقراءة فقط (PartRow) أو None؛ التعديل يتم عبر update_part
         """
         try:
-            return self.session.query(Part).filter_by(part_number=part_number).first()
+            return part_cache.get(self.session, part_number)
         except SQLAlchemyError:
             return None
 
@@ -0,0 +1,71 @@
+from typing import Dict
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from database.db_setup import LOW_STOCK_THRESHOLD, INVENTORY_STATS_REBUILD
+
+STATS_SQL = text("""
+    SELECT part_count, total_quantity, low_stock_count, total_value
+    FROM inventory_stats
+    WHERE id = 1
+""")
+
+# حساب الإحصائيات مباشرة في حال عدم وجود جدول الملخص
+AGGREGATE_STATS_SQL = text(f"""
+    SELECT
+        COUNT(*) AS part_count,
+        COALESCE(SUM(quantity), 0) AS total_quantity,
+        COALESCE(SUM(CASE WHEN quantity <= {LOW_STOCK_THRESHOLD} THEN 1 ELSE 0 END), 0) AS low_stock_count,
+        COALESCE(SUM(cost_price * quantity), 0) AS total_value
+    FROM parts
+""")
+
+class InventoryStats:
+    """خدمة إحصائيات المخزون المقروءة من جدول الملخص inventory_stats"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def get_stats(self) -> Dict:
+        """
+        استرجاع إحصائيات المخزون
+        Returns:
+            عدد القطع، إجمالي الكمية، عدد القطع منخفضة المخزون، القيمة الإجمالية
+        """
+        try:
+            try:
+                row = self.session.execute(STATS_SQL).first()
+            except OperationalError:
+                # جدول الملخص غير موجود (قاعدة لم تتم تهيئتها بعد)
+                row = None
+            if row is None:
+                row = self.session.execute(AGGREGATE_STATS_SQL).first()
+
+            return {
+                'part_count': row.part_count,
+                'total_quantity': row.total_quantity,
+                'low_stock_count': row.low_stock_count,
+                'total_value': row.total_value
+            }
+        except SQLAlchemyError:
+            return self.get_empty_stats()
+
+    def rebuild(self) -> bool:
+        """إعادة حساب الملخص بالكامل من جدول القطع"""
+        try:
+            self.session.execute(text(
+                INVENTORY_STATS_REBUILD.format(threshold=LOW_STOCK_THRESHOLD)
+            ))
+            self.session.commit()
+            return True
+        except SQLAlchemyError:
+            self.session.rollback()
+            return False
+
+    def get_empty_stats(self) -> Dict:
+        """إحصائيات فارغة في حالة حدوث خطأ"""
+        return {
+            'part_count': 0,
+            'total_quantity': 0,
+            'low_stock_count': 0,
+            'total_value': 0
+        }
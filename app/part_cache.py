@@ -0,0 +1,184 @@
+"""
+ذاكرة مؤقتة لسجلات القطع حسب رقم القطعة (LRU محدودة الحجم)
+
+تحفظ صفوف PartRow (لا كائنات ORM) فيمكن مشاركتها بين الجلسات والخيوط.
+كل عملية تغير القطعة (إضافة، تعديل، حذف، مرتجع) تستدعي invalidate بعد الحفظ،
+والبيع يستبدل السجل بالمخزون الجديد (put) بدل حذفه،
+والسجل ينتهي بعد عمر محدد حتى تظهر تعديلات أجهزة البيع الأخرى.
+الإعدادات في config/cache_config.py
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from config.cache_config import is_part_cache_enabled, get_part_cache_size, get_part_cache_ttl
+from database.models import Part
+from database.queries import PART_ROW_COLUMNS, PartRow
+
+
+def database_key(session):
+    """مفتاح قاعدة البيانات التي تتصل بها الجلسة (لكل قاعدة سجلاتها)"""
+    return str(session.get_bind().url)
+
+
+def load_part_row(session, part_number) -> Optional[PartRow]:
+    """قراءة سجل القطعة من قاعدة البيانات مباشرة"""
+    row = session.query(*PART_ROW_COLUMNS).filter_by(part_number=part_number).first()
+    return PartRow._make(row) if row is not None else None
+
+
+def load_part_rows(session, part_numbers) -> Dict[str, PartRow]:
+    """قراءة سجلات عدة قطع باستعلام IN واحد"""
+    if not part_numbers:
+        return {}
+    rows = session.query(*PART_ROW_COLUMNS).filter(
+        Part.part_number.in_(part_numbers)
+    ).all()
+    return {row.part_number: PartRow._make(row) for row in rows}
+
+
+class PartCache:
+    """ذاكرة LRU لسجلات القطع مع عدادات الإصابة والإخفاق"""
+
+    def __init__(self, max_size=None, ttl=None, enabled=None):
+        self.enabled = is_part_cache_enabled() if enabled is None else enabled
+        self.max_size = get_part_cache_size() if max_size is None else max_size
+        self.ttl = get_part_cache_ttl() if ttl is None else ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # يزيد مع كل إلغاء حتى لا يُحفظ سجل قُرئ قبل تغيير القطعة
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, session, part_number) -> Optional[PartRow]:
+        """
+        سجل القطعة من الذاكرة أو من قاعدة البيانات عند عدم وجوده
+        (القطع غير الموجودة لا تُحفظ حتى تظهر فور إضافتها من جهاز آخر)
+        """
+        if not self.enabled:
+            return load_part_row(session, part_number)
+
+        key = (database_key(session), part_number)
+        now = time.monotonic()
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self.generation
+
+        row = load_part_row(session, part_number)
+        if row is not None:
+            self._store(session, [row], now + self.ttl, generation)
+        return row
+
+    def get_many(self, session, part_numbers: Iterable[str]) -> Dict[str, PartRow]:
+        """
+        سجلات عدة قطع: الموجود في الذاكرة يُعاد منها، والباقي يُقرأ باستعلام IN واحد
+        (القطع غير الموجودة لا تظهر في النتيجة)
+        """
+        part_numbers = list(dict.fromkeys(part_numbers))
+        if not self.enabled:
+            return load_part_rows(session, part_numbers)
+
+        database = database_key(session)
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for part_number in part_numbers:
+                key = (database, part_number)
+                entry = self.entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    found[part_number] = entry[0]
+                else:
+                    self.misses += 1
+            generation = self.generation
+
+        misses = [part_number for part_number in part_numbers if part_number not in found]
+        if misses:
+            loaded = load_part_rows(session, misses)
+            self._store(session, loaded.values(), now + self.ttl, generation)
+            found.update(loaded)
+        return found
+
+    def _store(self, session, rows, expires, generation):
+        """حفظ سجلات مقروءة ما لم تتغير القطع منذ بدء القراءة"""
+        database = database_key(session)
+        with self._lock:
+            if generation != self.generation:
+                return
+            for row in rows:
+                key = (database, row.part_number)
+                self.entries[key] = (row, expires)
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def refresh(self, session, part_number) -> Optional[PartRow]:
+        """إعادة قراءة سجل القطعة من قاعدة البيانات (مثلاً قبل رفض بيع بسبب المخزون)"""
+        self.invalidate(session, part_number)
+        return self.get(session, part_number)
+
+    def put(self, session, row: PartRow):
+        """
+        استبدال سجل القطعة بعد تغييرها بسجل قُرئ داخل نفس المعاملة (مثلاً بعد البيع)
+        بدل حذفه، فلا تُقرأ القطع الأكثر بيعاً من قاعدة البيانات بعد كل عملية
+        """
+        if not self.enabled:
+            return
+        key = (database_key(session), row.part_number)
+        with self._lock:
+            # القراءات الجارية أقدم من هذا السجل فلا تُحفظ فوقه
+            self.generation += 1
+            self.entries[key] = (row, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, session, *part_numbers):
+        """حذف سجلات القطع بعد تغييرها"""
+        if not self.enabled:
+            return
+        database = database_key(session)
+        with self._lock:
+            self.generation += 1
+            for part_number in part_numbers:
+                if self.entries.pop((database, part_number), None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def stats(self) -> Dict:
+        """عدادات الذاكرة المؤقتة ونسبة الإصابة"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+part_cache = PartCache()
@@ -0,0 +1,183 @@
+import csv
+import os
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+from sqlalchemy.exc import SQLAlchemyError
+from database.models import Part
+from database.db_setup import bulk_load
+from app.inventory import validate_part_data
+
+BATCH_SIZE = 1000
+
+PART_FIELDS = ('part_number', 'name', 'type', 'quantity', 'cost_price', 'selling_price')
+
+# أسماء الأعمدة المقبولة في ملفات الموردين (بالعربية أو الإنجليزية)
+HEADER_ALIASES = {
+    'part_number': 'part_number',
+    'part number': 'part_number',
+    'رقم القطعة': 'part_number',
+    'name': 'name',
+    'الاسم': 'name',
+    'اسم القطعة': 'name',
+    'type': 'type',
+    'النوع': 'type',
+    'quantity': 'quantity',
+    'الكمية': 'quantity',
+    'cost_price': 'cost_price',
+    'cost price': 'cost_price',
+    'سعر التكلفة': 'cost_price',
+    'selling_price': 'selling_price',
+    'selling price': 'selling_price',
+    'سعر البيع': 'selling_price',
+}
+
+class PartImporter:
+    """استيراد القطع بالجملة من ملفات CSV أو XLSX"""
+
+    def __init__(self, session, batch_size: int = BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+
+    def import_file(self, path: str) -> Dict:
+        """
+        استيراد ملف قطع غيار
+        Args:
+            path: مسار ملف CSV أو XLSX
+        Returns:
+            عدد القطع المضافة وقائمة بالصفوف المرفوضة وأسباب رفضها
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            rows = self.read_csv(path)
+        elif extension in ('.xlsx', '.xlsm'):
+            rows = self.read_xlsx(path)
+        else:
+            raise ValueError("نوع الملف غير مدعوم")
+        return self.import_rows(rows)
+
+    def import_rows(self, rows) -> Dict:
+        """
+        استيراد صفوف (رقم السطر, بيانات القطعة) على دفعات
+        كل دفعة تُتحقق معاً وتُدرج بأمر executemany واحد داخل معاملة واحدة
+        """
+        result = {'imported': 0, 'rejected': []}
+
+        # ملف bulk-load على اتصالات الاستيراد فقط (انظر database/db_setup.bulk_load)
+        with bulk_load(self.session):
+            try:
+                # أرقام القطع الموجودة مسبقاً لفحص التكرار دون استعلام لكل صف
+                existing = {number for number, in self.session.query(Part.part_number)}
+            except SQLAlchemyError as e:
+                result['rejected'].append((0, '', f"خطأ في قاعدة البيانات: {str(e)}"))
+                return result
+
+            rows = iter(rows)
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+
+                valid, rejected = self.validate_batch(batch, existing)
+                result['rejected'].extend(rejected)
+                if not valid:
+                    continue
+
+                try:
+                    self.session.execute(
+                        Part.__table__.insert(),
+                        [{field: part[field] for field in PART_FIELDS} for part in valid]
+                    )
+                    self.session.commit()
+                    result['imported'] += len(valid)
+                except SQLAlchemyError as e:
+                    self.session.rollback()
+                    for part in valid:
+                        existing.discard(part['part_number'])
+                        result['rejected'].append(
+                            (part['line'], part['part_number'], f"خطأ في قاعدة البيانات: {str(e)}")
+                        )
+
+        return result
+
+    def validate_batch(self, batch: List[Tuple[int, Dict]], existing: set) -> Tuple[List[Dict], List[Tuple]]:
+        """
+        التحقق من دفعة كاملة من الصفوف
+        Args:
+            batch: قائمة (رقم السطر, بيانات القطعة)
+            existing: أرقام القطع الموجودة (يضاف إليها ما يُقبل من الدفعة)
+        Returns:
+            (الصفوف الصالحة للإدراج, الصفوف المرفوضة)
+        """
+        valid = []
+        rejected = []
+        for line, part_data in batch:
+            part_number = part_data.get('part_number') or ''
+
+            is_valid, message = validate_part_data(part_data)
+            if not is_valid:
+                rejected.append((line, part_number, message))
+                continue
+
+            if part_number in existing:
+                rejected.append((line, part_number, "رقم القطعة موجود مسبقاً"))
+                continue
+
+            existing.add(part_number)
+            valid.append({
+                'line': line,
+                'part_number': part_number,
+                'name': part_data['name'],
+                'type': part_data.get('type') or None,
+                'quantity': int(part_data.get('quantity', 0)),
+                'cost_price': float(part_data['cost_price']),
+                'selling_price': float(part_data['selling_price'])
+            })
+        return valid, rejected
+
+    def read_csv(self, path: str) -> Iterator[Tuple[int, Dict]]:
+        """قراءة ملف CSV سطراً بسطر"""
+        with open(path, newline='', encoding='utf-8-sig') as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader, None)
+            if header is None:
+                return
+            yield from self.map_rows(header, reader, first_line=2)
+
+    def read_xlsx(self, path: str) -> Iterator[Tuple[int, Dict]]:
+        """قراءة أول ورقة من ملف XLSX في وضع القراءة فقط (دون تحميل الملف كاملاً)"""
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("استيراد ملفات Excel يتطلب تثبيت مكتبة openpyxl")
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            yield from self.map_rows(header, rows, first_line=2)
+        finally:
+            workbook.close()
+
+    def map_rows(self, header, rows, first_line: int) -> Iterator[Tuple[int, Dict]]:
+        """تحويل الصفوف إلى قواميس بأسماء حقول القطعة وتجاهل الصفوف الفارغة"""
+        columns = [
+            HEADER_ALIASES.get(str(name).strip().lower()) if name is not None else None
+            for name in header
+        ]
+        for line, values in enumerate(rows, start=first_line):
+            part_data = {}
+            for field, value in zip(columns, values):
+                if field is None or value is None:
+                    continue
+                value = value.strip() if isinstance(value, str) else value
+                if value != '':
+                    part_data[field] = value
+            if part_data:
+                part_number = part_data.get('part_number')
+                if isinstance(part_number, float) and part_number.is_integer():
+                    part_number = int(part_number)
+                if part_number is not None:
+                    part_data['part_number'] = str(part_number)
+                yield line, part_data
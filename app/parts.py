@@ -1,7 +1,9 @@
 from typing import List, Optional
-from sqlalchemy import or_
 from database.models import Part
 from database.db_setup import Session
+from app.search import PartSearch
+from app.part_cache import part_cache
+from database.queries import PartRow
 from sqlalchemy.exc import SQLAlchemyError
 
 class PartsManager:
@@ -16,30 +18,18 @@ class PartsManager:
         Returns:
             قائمة بالقطع المطابقة للبحث
         """
-        try:
-            query = self.session.query(Part)
-            
-            if search_term:
-                search_filter = or_(
-                    Part.name.ilike(f"%{search_term}%"),
-                    Part.part_number.ilike(f"%{search_term}%")
-                )
-                query = query.filter(search_filter)
-            
-            return query.all()
-        except SQLAlchemyError:
-            return []
+        return PartSearch(self.session).search(search_term)
 
-    def get_part_by_number(self, part_number: str) -> Optional[Part]:
+    def get_part_by_number(self, part_number: str) -> Optional[PartRow]:
         """
-        البحث عن قطعة محددة برقمها
+        البحث عن قطعة محددة برقمها (من الذاكرة المؤقتة للقطع)
         Args:
             part_number: رقم القطعة
         Returns:
-            القطعة المطلوبة أو None إذا لم يتم العثور عليها
+            سجل القطعة للقراءة فقط (PartRow) أو None إذا لم يتم العثور عليها
         """
         try:
-            return self.session.query(Part).filter_by(part_number=part_number).first()
+            return part_cache.get(self.session, part_number)
         except SQLAlchemyError:
             return None
 
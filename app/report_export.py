@@ -0,0 +1,150 @@
+import csv
+from datetime import timedelta
+from typing import Callable, Optional
+from app.sales_reports import SalesReports
+
+EXPORT_BATCH_SIZE = 1000
+
+# عناوين أعمدة ملف التصدير بنفس ترتيب صفوف التقرير
+EXPORT_HEADERS = ["رقم القطعة", "اسم القطعة", "النوع", "الكمية", "سعر البيع", "الربح", "التاريخ"]
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# عرض أعمدة ملف Excel (بنفس ترتيب العناوين)
+XLSX_COLUMN_WIDTHS = [15, 25, 15, 10, 12, 12, 18]
+
+class ExportCancelled(Exception):
+    """أوقف المستخدم عملية التصدير"""
+
+class ReportExporter:
+    """تصدير تقارير المبيعات من قاعدة البيانات مباشرة على دفعات"""
+
+    def __init__(self, session, batch_size: int = EXPORT_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+        self.sales_reports = SalesReports(session)
+
+    def export_csv(self, path: str, start_date, end_date,
+                   progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        تصدير مبيعات الفترة [start_date, end_date) إلى ملف CSV بترميز UTF-8 مع BOM
+        لا تُحمّل في الذاكرة إلا دفعة واحدة من الصفوف في كل مرة
+        Args:
+            path: مسار الملف
+            start_date: بداية الفترة
+            end_date: نهاية الفترة (غير مشمولة)
+            progress: دالة تُستدعى بعد كل دفعة (عدد الصفوف المكتوبة, العدد الكلي)
+        Returns:
+            عدد الصفوف المصدرة
+        """
+        total = self.sales_reports.count_sales(start_date, end_date) if progress else 0
+        written = 0
+
+        with open(path, 'w', newline='', encoding='utf-8-sig') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(EXPORT_HEADERS)
+            for batch in self.sales_reports.iter_report_rows(start_date, end_date, self.batch_size):
+                writer.writerows(self.format_row(row) for row in batch)
+                written += len(batch)
+                if progress:
+                    progress(written, total)
+
+        return written
+
+    def export_xlsx(self, path: str, start_date, end_date, title: str = "",
+                    progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        تصدير مبيعات الفترة [start_date, end_date) إلى ملف Excel
+        يعمل xlsxwriter في وضع constant_memory فيكتب كل صف إلى القرص فور اكتماله،
+        والصفوف تُقرأ من قاعدة البيانات على دفعات، فلا يكبر استهلاك الذاكرة مع حجم التقرير
+        Args:
+            path: مسار الملف
+            start_date: بداية الفترة
+            end_date: نهاية الفترة (غير مشمولة)
+            title: عنوان التقرير في أعلى الورقة
+            progress: دالة تُستدعى بعد كل دفعة (عدد الصفوف المكتوبة, العدد الكلي)
+        Returns:
+            عدد الصفوف المصدرة
+        """
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise ValueError("التصدير إلى Excel يتطلب تثبيت مكتبة xlsxwriter")
+
+        totals = self.sales_reports.get_period_totals(start_date, end_date)
+        total = self.sales_reports.count_sales(start_date, end_date) if progress else 0
+        last_day = end_date - timedelta(days=1)
+        period = start_date.strftime("%Y-%m-%d")
+        if last_day.date() != start_date.date():
+            period += " - " + last_day.strftime("%Y-%m-%d")
+
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        try:
+            worksheet = workbook.add_worksheet()
+            worksheet.right_to_left()
+
+            title_format = workbook.add_format({
+                'bold': True, 'font_size': 16, 'align': 'center', 'valign': 'vcenter'
+            })
+            header_format = workbook.add_format({
+                'bold': True, 'bg_color': '#34495e', 'font_color': 'white',
+                'border': 1, 'align': 'center', 'valign': 'vcenter'
+            })
+            cell_format = workbook.add_format({'align': 'center', 'valign': 'vcenter', 'border': 1})
+            integer_format = workbook.add_format({
+                'align': 'center', 'valign': 'vcenter', 'border': 1, 'num_format': '#,##0'
+            })
+            number_format = workbook.add_format({
+                'align': 'center', 'valign': 'vcenter', 'border': 1, 'num_format': '#,##0.00'
+            })
+            date_format = workbook.add_format({
+                'align': 'center', 'valign': 'vcenter', 'border': 1, 'num_format': 'yyyy-mm-dd hh:mm'
+            })
+
+            for col, width in enumerate(XLSX_COLUMN_WIDTHS):
+                worksheet.set_column(col, col, width)
+
+            # في وضع constant_memory يجب كتابة الصفوف بالترتيب
+            worksheet.merge_range(0, 0, 0, 6, title, title_format)
+            worksheet.merge_range(1, 0, 1, 6, period, title_format)
+            worksheet.merge_range(3, 0, 3, 2, f"إجمالي المبيعات: {totals['total_sales']:,.2f}", cell_format)
+            worksheet.merge_range(3, 3, 3, 6, f"إجمالي الأرباح: {totals['total_profit']:,.2f}", cell_format)
+            worksheet.write_row(5, 0, EXPORT_HEADERS, header_format)
+
+            written = 0
+            for batch in self.sales_reports.iter_report_rows(start_date, end_date, self.batch_size):
+                for part_number, name, part_type, quantity, selling_price, profit, sale_date in batch:
+                    row = 6 + written
+                    worksheet.write_string(row, 0, part_number, cell_format)
+                    worksheet.write_string(row, 1, name, cell_format)
+                    worksheet.write_string(row, 2, part_type or '', cell_format)
+                    worksheet.write_number(row, 3, quantity, integer_format)
+                    worksheet.write_number(row, 4, selling_price, number_format)
+                    worksheet.write_number(row, 5, profit or 0, number_format)
+                    if sale_date:
+                        worksheet.write_datetime(row, 6, sale_date, date_format)
+                    else:
+                        worksheet.write_blank(row, 6, None, cell_format)
+                    written += 1
+                if progress:
+                    progress(written, total)
+
+            worksheet.autofilter(5, 0, 5 + written, len(EXPORT_HEADERS) - 1)
+        finally:
+            workbook.close()
+
+        return written
+
+    @staticmethod
+    def format_row(row):
+        """تحويل صف التقرير إلى قيم ملف التصدير (الأرقام تبقى أرقاماً)"""
+        part_number, name, part_type, quantity, selling_price, profit, sale_date = row
+        return [
+            part_number,
+            name,
+            part_type or '',
+            quantity,
+            selling_price,
+            profit if profit is not None else 0,
+            sale_date.strftime(DATE_FORMAT) if sale_date else ''
+        ]
@@ -1,17 +1,110 @@
 import sqlite3
+from array import array
 from datetime import datetime, timedelta
 import calendar
+from database.connection import get_connection
 from PyQt5.QtWidgets import QMessageBox
 
+# قواعد الخصم: الراتب الشهري يقسم على 30 يوماً، والتأخير يخصم ربع يوم
+DAYS_PER_MONTH = 30
+LATE_DEDUCTION_RATE = 0.25
+
+# رواتب كل العمال النشطين مع الخصومات في استعلام مجمع واحد
+PAYROLL_SQL = f"""
+    SELECT
+        w.id AS worker_id,
+        w.name,
+        w.salary AS base_salary,
+        COUNT(CASE WHEN a.status = 'غائب' THEN 1 END) AS absent_days,
+        COUNT(CASE WHEN a.status = 'متأخر' THEN 1 END) AS late_days,
+        COUNT(CASE WHEN a.status = 'غائب' THEN 1 END)
+            * w.salary / {float(DAYS_PER_MONTH)} AS absent_deduction,
+        COUNT(CASE WHEN a.status = 'متأخر' THEN 1 END)
+            * w.salary / {float(DAYS_PER_MONTH)} * {LATE_DEDUCTION_RATE} AS late_deduction
+    FROM workers w
+    LEFT JOIN attendance a ON a.worker_id = w.id
+        AND a.date BETWEEN ? AND ?
+    WHERE w.status = 'نشط'
+    GROUP BY w.id
+    ORDER BY w.name
+"""
+
+# أعمدة نتيجة الرواتب ونوع مصفوفة كل عمود رقمي
+PAYROLL_COLUMNS = {
+    'worker_id': 'q',
+    'name': None,
+    'base_salary': 'd',
+    'absent_days': 'l',
+    'late_days': 'l',
+    'absent_deduction': 'd',
+    'late_deduction': 'd',
+    'final_salary': 'd',
+}
+
+# رموز حالات الحضور في مصفوفة الشهر (0 = لا يوجد تسجيل)
+NO_RECORD = 0
+STATUS_CODES = {
+    'حاضر': 1,
+    'غائب': 2,
+    'متأخر': 3,
+    'إجازة': 4,
+}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+
+# سجلات الشهر لكل العمال النشطين باستعلام واحد يستخدم فهرس (worker_id, date)
+ATTENDANCE_MATRIX_SQL = """
+    SELECT
+        w.id AS worker_id,
+        w.name,
+        CAST(substr(a.date, 9, 2) AS INTEGER) AS day,
+        a.status
+    FROM workers w
+    LEFT JOIN attendance a ON a.worker_id = w.id
+        AND a.date BETWEEN ? AND ?
+    WHERE w.status = 'نشط'
+    ORDER BY w.name, w.id
+"""
+
+class AttendanceMatrix:
+    """
+    مصفوفة حضور الشهر (العمال × الأيام) مخزنة في bytearray واحدة
+    كل خانة تحمل رمز الحالة من STATUS_CODES أو NO_RECORD
+    """
+
+    def __init__(self, worker_ids, names, days):
+        self.worker_ids = worker_ids
+        self.names = names
+        self.days = days
+        self.codes = bytearray(len(worker_ids) * days)
+
+    @property
+    def shape(self):
+        return len(self.worker_ids), self.days
+
+    def __getitem__(self, position):
+        row, day = position
+        return self.codes[row * self.days + day - 1]
+
+    def __setitem__(self, position, code):
+        row, day = position
+        self.codes[row * self.days + day - 1] = code
+
+    def row(self, row):
+        """رموز أيام الشهر لعامل واحد"""
+        start = row * self.days
+        return self.codes[start:start + self.days]
+
+    def count(self, row, code):
+        """عدد أيام العامل بحالة معينة"""
+        return self.row(row).count(code)
+
 class AttendanceReports:
     def __init__(self, db_path="database/workers.db"):
         self.db_path = db_path
 
     def get_db_connection(self):
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return get_connection(self.db_path)
         except sqlite3.Error as e:
             print(f"Database connection error: {str(e)}")
             return None
@@ -88,6 +181,95 @@ class AttendanceReports:
             print(f"Error generating monthly report: {str(e)}")
             return None
 
+    def get_month_bounds(self, year, month):
+        """أول وآخر يوم في الشهر بصيغة YYYY-MM-DD"""
+        num_days = calendar.monthrange(year, month)[1]
+        return f"{year}-{month:02d}-01", f"{year}-{month:02d}-{num_days}"
+
+    def generate_attendance_matrix(self, year, month):
+        """
+        مصفوفة الحضور اليومي لكل العمال النشطين خلال الشهر
+        Args:
+            year: السنة
+            month: الشهر
+        Returns:
+            AttendanceMatrix (صف لكل عامل وعمود لكل يوم) أو None عند حدوث خطأ
+        """
+        try:
+            conn = self.get_db_connection()
+            if not conn:
+                return None
+
+            try:
+                rows = conn.execute(
+                    ATTENDANCE_MATRIX_SQL, self.get_month_bounds(year, month)
+                ).fetchall()
+            finally:
+                conn.close()
+
+            # الصفوف مرتبة حسب العامل: ترقيم العمال ثم ملء الخانات
+            worker_ids = array('q')
+            names = []
+            positions = []
+            for row in rows:
+                if not worker_ids or worker_ids[-1] != row['worker_id']:
+                    worker_ids.append(row['worker_id'])
+                    names.append(row['name'])
+                if row['day'] is not None:
+                    positions.append((len(worker_ids) - 1, row['day'], row['status']))
+
+            matrix = AttendanceMatrix(worker_ids, names, calendar.monthrange(year, month)[1])
+            for index, day, status in positions:
+                matrix[index, day] = STATUS_CODES.get(status, NO_RECORD)
+            return matrix
+
+        except sqlite3.Error as e:
+            print(f"Error generating attendance matrix: {str(e)}")
+            return None
+
+    def calculate_payroll(self, year, month):
+        """
+        حساب رواتب كل العمال النشطين للشهر باستعلام واحد
+        Args:
+            year: السنة
+            month: الشهر
+        Returns:
+            قاموس أعمدة (worker_id, name, base_salary, absent_days, late_days,
+            absent_deduction, late_deduction, final_salary) كل عمود رقمي فيه
+            مصفوفة array بنفس ترتيب العمال، أو None عند حدوث خطأ
+        """
+        try:
+            conn = self.get_db_connection()
+            if not conn:
+                return None
+
+            try:
+                rows = conn.execute(PAYROLL_SQL, self.get_month_bounds(year, month)).fetchall()
+            finally:
+                conn.close()
+
+            payroll = {
+                name: array(typecode) if typecode else []
+                for name, typecode in PAYROLL_COLUMNS.items()
+            }
+            for row in rows:
+                payroll['worker_id'].append(row['worker_id'])
+                payroll['name'].append(row['name'])
+                payroll['base_salary'].append(row['base_salary'])
+                payroll['absent_days'].append(row['absent_days'])
+                payroll['late_days'].append(row['late_days'])
+                payroll['absent_deduction'].append(row['absent_deduction'])
+                payroll['late_deduction'].append(row['late_deduction'])
+                payroll['final_salary'].append(
+                    row['base_salary'] - row['absent_deduction'] - row['late_deduction']
+                )
+
+            return payroll
+
+        except sqlite3.Error as e:
+            print(f"Error calculating payroll: {str(e)}")
+            return None
+
     def calculate_salary(self, worker_id, year, month):
         """Calculate worker's salary for the month including deductions"""
         try:
@@ -122,9 +304,9 @@ class AttendanceReports:
             conn.close()
             
             # Calculate deductions
-            daily_rate = base_salary / 30  # Assuming 30 days per month
+            daily_rate = base_salary / DAYS_PER_MONTH
             absent_deduction = attendance['absent_days'] * daily_rate
-            late_deduction = attendance['late_days'] * (daily_rate * 0.25)  # 25% deduction for late days
+            late_deduction = attendance['late_days'] * (daily_rate * LATE_DEDUCTION_RATE)
             
             # Calculate final salary
             final_salary = base_salary - absent_deduction - late_deduction
@@ -1,11 +1,26 @@
+import random
+import time
 from datetime import datetime
-from database.models import Part, Sale
+from typing import Optional
+from sqlalchemy import func, select, update
+from database.models import Part, Sale, Invoice
 from database.db_setup import Session
-from sqlalchemy.exc import SQLAlchemyError
+from database.queries import PART_ROW_COLUMNS, PartRow
+from app.part_cache import part_cache
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
+
+# إعادة المحاولة عند انشغال قاعدة البيانات بكتابة من جهاز آخر
+MAX_RETRIES = 5
+RETRY_DELAY = 0.05
+
+def is_database_busy(error: OperationalError) -> bool:
+    """هل الخطأ ناتج عن قفل قاعدة البيانات (SQLITE_BUSY)"""
+    message = str(error.orig).lower()
+    return 'database is locked' in message or 'database table is locked' in message
 
 class SalesManager:
-    def __init__(self):
-        self.session = Session()
+    def __init__(self, session=None):
+        self.session = session or Session()
 
     def validate_sale(self, part: Part, quantity: int, selling_price: float):
         """التحقق من صحة عملية البيع"""
@@ -23,37 +38,230 @@ class SalesManager:
             
         return True, ""
 
+    def get_part(self, part_number: str, quantity: int):
+        """
+        سجل القطعة (PartRow) للتحقق من البيع فقط
+        الكمية في الذاكرة المؤقتة قد تكون قديمة، فتُعاد قراءتها قبل رفض البيع بسببها؛
+        الخصم وسعر التكلفة المستخدم في الربح يُقرآن داخل معاملة الكتابة (decrement_stock)
+        """
+        part = part_cache.get(self.session, part_number)
+        if part is not None and quantity > part.quantity:
+            part = part_cache.refresh(self.session, part_number)
+        return part
+
+    def decrement_stock(self, part_id: int, quantity: int) -> Optional[PartRow]:
+        """
+        خصم الكمية من المخزون بأمر UPDATE مشروط واحد
+        لا يتم الخصم إلا إذا كانت الكمية المتوفرة كافية لحظة الكتابة،
+        فلا يمكن لجهازي بيع أن يبيعا نفس المخزون مرتين
+        Returns:
+            سجل القطعة بعد الخصم مقروءاً داخل نفس معاملة الكتابة (سعر التكلفة
+            الحالي لحساب الربح والكمية الجديدة للذاكرة المؤقتة)، أو None إن لم يتم الخصم
+        """
+        statement = (
+            update(Part)
+            .where(Part.id == part_id, Part.quantity >= quantity)
+            .values(quantity=Part.quantity - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if self.session.get_bind().dialect.update_returning:
+            # SQLite 3.35+: السجل الجديد يعود مع أمر الخصم نفسه دون استعلام إضافي
+            row = self.session.execute(statement.returning(*PART_ROW_COLUMNS)).first()
+            return PartRow._make(row) if row is not None else None
+
+        if self.session.execute(statement).rowcount != 1:
+            return None
+        row = self.session.execute(
+            select(*PART_ROW_COLUMNS).where(Part.id == part_id)
+        ).first()
+        return PartRow._make(row)
+
+    def run_with_retry(self, operation):
+        """تنفيذ معاملة قصيرة مع إعادة المحاولة والانتظار المتزايد عند انشغال القاعدة"""
+        for attempt in range(MAX_RETRIES):
+            try:
+                return operation()
+            except OperationalError as e:
+                self.session.rollback()
+                if not is_database_busy(e) or attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(RETRY_DELAY * (2 ** attempt) * (0.5 + random.random()))
+
     def create_sale(self, part_number: str, quantity: int, selling_price: float):
         """تسجيل عملية بيع جديدة"""
         try:
-            # البحث عن القطعة
-            part = self.session.query(Part).filter_by(part_number=part_number).first()
-            
+            # سجل القطعة من الذاكرة المؤقتة (يُعاد قراءته إن بدا المخزون غير كافٍ)
+            part = self.get_part(part_number, quantity)
+
             # التحقق من صحة البيانات
             is_valid, message = self.validate_sale(part, quantity, selling_price)
             if not is_valid:
                 return False, message
 
-            # حساب الربح
-            profit = (selling_price - part.cost_price) * quantity
+            part_id = part.id
 
-            # إنشاء سجل البيع
-            new_sale = Sale(
-                part_id=part.id,
-                quantity=quantity,
-                selling_price=selling_price,
-                sale_date=datetime.now(),
-                profit=profit
-            )
+            def write_sale():
+                # تحديث المخزون وإنشاء سجل البيع في معاملة واحدة قصيرة
+                updated = self.decrement_stock(part_id, quantity)
+                if updated is None:
+                    self.session.rollback()
+                    part_cache.invalidate(self.session, part_number)
+                    return False, "الكمية المطلوبة غير متوفرة في المخزون"
 
-            # تحديث المخزون
-            part.quantity -= quantity
+                # الربح بسعر التكلفة الحالي (لا المحفوظ في الذاكرة المؤقتة)
+                profit = (selling_price - updated.cost_price) * quantity
+                self.session.add(Sale(
+                    part_id=part_id,
+                    quantity=quantity,
+                    selling_price=selling_price,
+                    sale_date=datetime.now(),
+                    profit=profit
+                ))
+                self.session.commit()
+                # تحديث السجل في الذاكرة المؤقتة بدل حذفه (القطع الأكثر بيعاً تبقى فيها)
+                part_cache.put(self.session, updated)
+                return True, "تم تسجيل عملية البيع بنجاح"
 
-            # حفظ التغييرات
-            self.session.add(new_sale)
-            self.session.commit()
-            
-            return True, "تم تسجيل عملية البيع بنجاح"
+            return self.run_with_retry(write_sale)
+
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            return False, f"خطأ في قاعدة البيانات: {str(e)}"
+
+    def create_invoice(self, lines):
+        """
+        تسجيل فاتورة تضم عدة قطع في معاملة واحدة
+        Args:
+            lines: قائمة (رقم القطعة, الكمية, سعر البيع)
+        Returns:
+            (نجاح العملية, رسالة النتيجة)
+        """
+        if not lines:
+            return False, "الفاتورة لا تحتوي على أي قطعة"
+
+        try:
+            # الكمية الإجمالية المطلوبة من كل قطعة ثم سجلاتها من الذاكرة المؤقتة
+            totals = {}
+            for part_number, quantity, _ in lines:
+                totals[part_number] = totals.get(part_number, 0) + quantity
+            # كل القطع باستعلام IN واحد (ما عدا الموجود في الذاكرة المؤقتة)، ولا تُعاد
+            # قراءة قطعة منفردة إلا إن بدا مخزونها المحفوظ غير كافٍ
+            parts = part_cache.get_many(self.session, totals)
+            for part_number, total in totals.items():
+                part = parts.get(part_number)
+                if part is not None and total > part.quantity:
+                    parts[part_number] = part_cache.refresh(self.session, part_number)
+
+            # التحقق من كل البنود ومن توفر الكمية الإجمالية لكل قطعة
+            requested = {}
+            for part_number, quantity, selling_price in lines:
+                part = parts.get(part_number)
+                requested[part_number] = requested.get(part_number, 0) + quantity
+                is_valid, message = self.validate_sale(part, quantity, selling_price)
+                if not is_valid:
+                    return False, f"{part_number}: {message}"
+                if requested[part_number] > part.quantity:
+                    return False, f"{part_number}: الكمية المطلوبة غير متوفرة في المخزون"
+
+            def write_invoice():
+                updated = {}
+                for part_number, quantity in requested.items():
+                    updated[part_number] = self.decrement_stock(parts[part_number].id, quantity)
+                    if updated[part_number] is None:
+                        self.session.rollback()
+                        part_cache.invalidate(self.session, part_number)
+                        return False, f"{part_number}: الكمية المطلوبة غير متوفرة في المخزون"
+
+                sale_date = datetime.now()
+                invoice = Invoice(invoice_date=sale_date, total_amount=0, total_profit=0)
+                for part_number, quantity, selling_price in lines:
+                    part = updated[part_number]
+                    profit = (selling_price - part.cost_price) * quantity
+                    invoice.sales.append(Sale(
+                        part_id=part.id,
+                        quantity=quantity,
+                        selling_price=selling_price,
+                        sale_date=sale_date,
+                        profit=profit
+                    ))
+                    invoice.total_amount += selling_price * quantity
+                    invoice.total_profit += profit
+
+                # كل البنود تكتب في flush واحد عند الحفظ
+                self.session.add(invoice)
+                self.session.commit()
+                for part in updated.values():
+                    part_cache.put(self.session, part)
+                return True, f"تم تسجيل الفاتورة رقم {invoice.id} بنجاح"
+
+            return self.run_with_retry(write_invoice)
+
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            return False, f"خطأ في قاعدة البيانات: {str(e)}"
+
+    def return_sale(self, sale_id: int, quantity: int = None):
+        """
+        إرجاع قطع من عملية بيع سابقة وإعادتها إلى المخزون
+        عملية البيع الأصلية لا تُعدل ولا تُحذف؛ المرتجع يُسجل كسطر بيع بكمية سالبة
+        مرتبط بها (return_of_id) فتطرحه التقارير والملخص اليومي في يوم الإرجاع
+        Args:
+            sale_id: رقم عملية البيع
+            quantity: الكمية المرتجعة (None لإرجاع المتبقي كاملاً)
+        Returns:
+            (نجاح العملية, رسالة النتيجة)
+        """
+        try:
+            sale = self.session.query(Sale).filter_by(id=sale_id).populate_existing().first()
+            if not sale:
+                return False, "لم يتم العثور على عملية البيع"
+            if sale.return_of_id is not None:
+                return False, "لا يمكن إرجاع سطر مرتجع"
+
+            # الكمية المتبقية بعد المرتجعات السابقة
+            returned = -(self.session.query(func.sum(Sale.quantity)).filter(
+                Sale.return_of_id == sale.id
+            ).scalar() or 0)
+            remaining = sale.quantity - returned
+
+            if quantity is None:
+                quantity = remaining
+            if quantity <= 0:
+                return False, "الكمية يجب أن تكون أكبر من صفر"
+            if quantity > remaining:
+                return False, "الكمية المرتجعة أكبر من الكمية المباعة"
+
+            def write_return():
+                # إعادة الكمية إلى المخزون وتسجيل المرتجع في معاملة واحدة
+                # (الملخص اليومي يُحدّث عبر مشغلات جدول المبيعات)
+                self.session.execute(
+                    update(Part)
+                    .where(Part.id == sale.part_id)
+                    .values(quantity=Part.quantity + quantity)
+                    .execution_options(synchronize_session=False)
+                )
+
+                part_number = sale.part.part_number
+                returned_profit = (sale.profit or 0) * quantity / sale.quantity
+                if sale.invoice is not None:
+                    sale.invoice.total_amount -= sale.selling_price * quantity
+                    sale.invoice.total_profit -= returned_profit
+
+                self.session.add(Sale(
+                    part_id=sale.part_id,
+                    invoice_id=sale.invoice_id,
+                    return_of_id=sale.id,
+                    quantity=-quantity,
+                    selling_price=sale.selling_price,
+                    sale_date=datetime.now(),
+                    profit=-returned_profit
+                ))
+
+                self.session.commit()
+                part_cache.invalidate(self.session, part_number)
+                return True, "تم تسجيل المرتجع بنجاح"
+
+            return self.run_with_retry(write_return)
 
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -66,7 +274,8 @@ class SalesManager:
                 Sale.sale_date.between(start_date, end_date)
             ).all()
             
-            total_sales = len(sales)
+            # المرتجعات أسطر مستقلة: تُطرح من الربح ولا تُعد كعمليات بيع
+            total_sales = sum(1 for sale in sales if sale.return_of_id is None)
             total_profit = sum(sale.profit for sale in sales)
             
             return {
@@ -84,4 +293,4 @@ class SalesManager:
 
     def close(self):
         """إغلاق جلسة قاعدة البيانات"""
-        self.session.close() 
\ No newline at end of file
+        self.session.close()
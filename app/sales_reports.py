@@ -1,57 +1,166 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select, text
 from sqlalchemy.exc import SQLAlchemyError
 from database.models import Sale, Part
-from database.db_setup import Session
+from database.db_setup import Session, DAILY_SALES_SUMMARY_REBUILD
+from database.queries import PART_ROW_COLUMNS, PartRow, SALE_ROW_COLUMNS, SaleRow
+
+# إجماليات فترة من جدول الملخص اليومي (sale_day بصيغة YYYY-MM-DD)
+PERIOD_TOTALS_SQL = text("""
+    SELECT
+        COALESCE(SUM(revenue), 0) AS total_sales,
+        COALESCE(SUM(profit), 0) AS total_profit,
+        COALESCE(SUM(quantity), 0) AS items_sold,
+        COUNT(DISTINCT part_id) AS unique_parts
+    FROM daily_sales_summary
+    WHERE sale_day >= :start_day AND sale_day < :end_day
+""")
+
+DAILY_TOTALS_SQL = text("""
+    SELECT
+        sale_day,
+        SUM(revenue) AS sales,
+        SUM(profit) AS profit,
+        SUM(quantity) AS items
+    FROM daily_sales_summary
+    WHERE sale_day >= :start_day AND sale_day < :end_day
+    GROUP BY sale_day
+    ORDER BY sale_day
+""")
+
+# أعمدة صفوف تفاصيل التقرير بالترتيب (انظر database.queries.SaleRow)
+REPORT_ROW_COLUMNS = SALE_ROW_COLUMNS
 
 class SalesReports:
-    def __init__(self):
-        self.session = Session()
+    def __init__(self, session=None):
+        self.session = session or Session()
+
+    def count_sales(self, start_date, end_date) -> int:
+        """عدد عمليات البيع في الفترة [start_date, end_date)"""
+        return self.session.query(func.count(Sale.id)).filter(
+            Sale.sale_date >= start_date,
+            Sale.sale_date < end_date
+        ).scalar()
+
+    def iter_report_rows(self, start_date, end_date, batch_size: int = 500):
+        """
+        قراءة تفاصيل مبيعات الفترة [start_date, end_date) على دفعات من المؤشر
+        مباشرة دون تحميل كل الصفوف في الذاكرة
+        Args:
+            start_date: بداية الفترة
+            end_date: نهاية الفترة (غير مشمولة)
+            batch_size: عدد الصفوف في كل دفعة
+        Returns:
+            مولد دفعات من صفوف SaleRow
+        """
+        result = self.session.execute(
+            select(*REPORT_ROW_COLUMNS)
+            .join(Part, Sale.part_id == Part.id)
+            .where(Sale.sale_date >= start_date, Sale.sale_date < end_date)
+            .order_by(Sale.sale_date)
+            .execution_options(yield_per=batch_size)
+        )
+        for batch in result.partitions(batch_size):
+            yield [SaleRow._make(row) for row in batch]
+
+    def get_sale_rows(self, start_date, end_date) -> List[SaleRow]:
+        """تفاصيل مبيعات الفترة [start_date, end_date) كصفوف SaleRow (بدون كائنات ORM)"""
+        return [
+            SaleRow._make(row) for row in self.session.execute(
+                select(*REPORT_ROW_COLUMNS)
+                .join(Part, Sale.part_id == Part.id)
+                .where(Sale.sale_date >= start_date, Sale.sale_date < end_date)
+                .order_by(Sale.sale_date)
+            )
+        ]
+
+    def get_period_totals(self, start_date, end_date) -> Dict:
+        """
+        إجماليات المبيعات لفترة من الملخص اليومي
+        Args:
+            start_date: أول يوم في الفترة
+            end_date: اليوم التالي لآخر يوم في الفترة (غير مشمول)
+        Returns:
+            إجمالي المبيعات والأرباح وعدد القطع المباعة وعدد القطع المختلفة
+        """
+        row = self.session.execute(PERIOD_TOTALS_SQL, {
+            'start_day': start_date.strftime("%Y-%m-%d"),
+            'end_day': end_date.strftime("%Y-%m-%d")
+        }).first()
+        return {
+            'total_sales': row.total_sales,
+            'total_profit': row.total_profit,
+            'items_sold': row.items_sold,
+            'unique_parts': row.unique_parts
+        }
+
+    def get_daily_totals(self, start_date, end_date) -> Dict:
+        """
+        إجماليات كل يوم في الفترة من الملخص اليومي
+        Returns:
+            قاموس {التاريخ: {'sales', 'profit', 'items'}}
+        """
+        rows = self.session.execute(DAILY_TOTALS_SQL, {
+            'start_day': start_date.strftime("%Y-%m-%d"),
+            'end_day': end_date.strftime("%Y-%m-%d")
+        })
+        return {
+            datetime.strptime(row.sale_day, "%Y-%m-%d").date(): {
+                'sales': row.sales,
+                'profit': row.profit,
+                'items': row.items
+            }
+            for row in rows
+        }
+
+    def rebuild_daily_summary(self) -> bool:
+        """إعادة حساب الملخص اليومي بالكامل من جدول المبيعات"""
+        try:
+            for statement in DAILY_SALES_SUMMARY_REBUILD:
+                self.session.execute(text(statement))
+            self.session.commit()
+            return True
+        except SQLAlchemyError:
+            self.session.rollback()
+            return False
 
-    def get_daily_report(self, date: datetime) -> Dict:
+    def get_daily_report(self, date: datetime, include_sales: bool = True) -> Dict:
         """
         إنشاء تقرير المبيعات اليومي
         Args:
             date: تاريخ التقرير
+            include_sales: تحميل تفاصيل عمليات البيع (الإحصائيات تقرأ من الملخص اليومي دائماً)
         Returns:
             تقرير يتضمن تفاصيل المبيعات والإحصائيات
         """
         try:
-            # الحصول على جميع مبيعات اليوم
-            sales = self.session.query(
-                Sale, Part
-            ).join(Part).filter(
-                func.date(Sale.sale_date) == date.date()
-            ).all()
+            day = date.date() if isinstance(date, datetime) else date
+            next_day = day + timedelta(days=1)
 
-            # حساب الإحصائيات
-            total_sales = sum(sale.selling_price * sale.quantity for sale, _ in sales)
-            total_profit = sum(sale.profit for sale, _ in sales)
-            items_sold = sum(sale.quantity for sale, _ in sales)
-            unique_parts = len(set(part.id for _, part in sales))
+            # الحصول على جميع مبيعات اليوم
+            sales = []
+            if include_sales:
+                day_start = datetime.combine(day, datetime.min.time())
+                sales = self.get_sale_rows(day_start, day_start + timedelta(days=1))
 
             return {
                 'sales': sales,
-                'statistics': {
-                    'total_sales': total_sales,
-                    'total_profit': total_profit,
-                    'items_sold': items_sold,
-                    'unique_parts': unique_parts
-                },
-                'date': date.strftime("%Y-%m-%d")
+                'statistics': self.get_period_totals(day, next_day),
+                'date': day.strftime("%Y-%m-%d")
             }
 
         except SQLAlchemyError as e:
             print(f"خطأ في قاعدة البيانات: {str(e)}")
             return self.get_empty_report()
 
-    def get_monthly_report(self, year: int, month: int) -> Dict:
+    def get_monthly_report(self, year: int, month: int, include_sales: bool = True) -> Dict:
         """
         إنشاء تقرير المبيعات الشهري
         Args:
             year: السنة
             month: الشهر
+            include_sales: تحميل تفاصيل عمليات البيع (الإحصائيات تقرأ من الملخص اليومي دائماً)
         Returns:
             تقرير يتضمن تفاصيل المبيعات والإحصائيات
         """
@@ -64,45 +173,21 @@ class SalesReports:
                 end_date = datetime(year, month + 1, 1)
 
             # الحصول على جميع مبيعات الشهر
-            sales = self.session.query(
-                Sale, Part
-            ).join(Part).filter(
-                and_(
-                    Sale.sale_date >= start_date,
-                    Sale.sale_date < end_date
-                )
-            ).all()
-
-            # تجميع البيانات حسب اليوم
-            daily_stats = {}
-            for sale, part in sales:
-                day = sale.sale_date.date()
-                if day not in daily_stats:
-                    daily_stats[day] = {
-                        'sales': 0,
-                        'profit': 0,
-                        'items': 0
-                    }
-                daily_stats[day]['sales'] += sale.selling_price * sale.quantity
-                daily_stats[day]['profit'] += sale.profit
-                daily_stats[day]['items'] += sale.quantity
-
-            # حساب الإحصائيات الإجمالية
-            total_sales = sum(sale.selling_price * sale.quantity for sale, _ in sales)
-            total_profit = sum(sale.profit for sale, _ in sales)
-            items_sold = sum(sale.quantity for sale, _ in sales)
-            unique_parts = len(set(part.id for _, part in sales))
+            sales = []
+            if include_sales:
+                sales = self.get_sale_rows(start_date, end_date)
+
+            # الإحصائيات اليومية والإجمالية من الملخص اليومي
+            daily_stats = self.get_daily_totals(start_date, end_date)
+            statistics = self.get_period_totals(start_date, end_date)
+            statistics['average_daily_sales'] = (
+                statistics['total_sales'] / len(daily_stats) if daily_stats else 0
+            )
 
             return {
                 'sales': sales,
                 'daily_stats': daily_stats,
-                'statistics': {
-                    'total_sales': total_sales,
-                    'total_profit': total_profit,
-                    'items_sold': items_sold,
-                    'unique_parts': unique_parts,
-                    'average_daily_sales': total_sales / len(daily_stats) if daily_stats else 0
-                },
+                'statistics': statistics,
                 'period': f"{year}-{month:02d}"
             }
 
@@ -118,11 +203,11 @@ class SalesReports:
             end_date: تاريخ النهاية
             limit: عدد القطع المراد عرضها
         Returns:
-            قائمة بأكثر القطع مبيعاً
+            قائمة (PartRow, إجمالي الكمية, إجمالي الربح) لأكثر القطع مبيعاً
         """
         try:
-            return self.session.query(
-                Part,
+            rows = self.session.query(
+                *PART_ROW_COLUMNS,
                 func.sum(Sale.quantity).label('total_quantity'),
                 func.sum(Sale.profit).label('total_profit')
             ).join(Sale).filter(
@@ -133,6 +218,8 @@ class SalesReports:
             ).group_by(Part.id).order_by(
                 func.sum(Sale.quantity).desc()
             ).limit(limit).all()
+            width = len(PART_ROW_COLUMNS)
+            return [(PartRow._make(row[:width]), row[width], row[width + 1]) for row in rows]
         except SQLAlchemyError:
             return []
 
@@ -146,25 +233,27 @@ class SalesReports:
             تحليل تفصيلي للأرباح
         """
         try:
-            sales = self.session.query(
-                Sale, Part
+            # التجميع داخل قاعدة البيانات بدل تحميل كل عملية بيع مع قطعتها
+            # أسطر المرتجعات تُطرح من المبالغ ولا تُعد كعمليات بيع
+            row = self.session.query(
+                func.count(Sale.id).filter(Sale.return_of_id.is_(None)),
+                func.coalesce(func.sum(Sale.selling_price * Sale.quantity), 0),
+                func.coalesce(func.sum(Part.cost_price * Sale.quantity), 0),
+                func.coalesce(func.sum(Sale.profit), 0)
             ).join(Part).filter(
                 and_(
                     Sale.sale_date >= start_date,
                     Sale.sale_date <= end_date
                 )
-            ).all()
-
-            total_revenue = sum(sale.selling_price * sale.quantity for sale, _ in sales)
-            total_cost = sum(part.cost_price * sale.quantity for sale, part in sales)
-            total_profit = sum(sale.profit for sale, _ in sales)
+            ).one()
+            sale_count, total_revenue, total_cost, total_profit = row
 
             return {
                 'total_revenue': total_revenue,
                 'total_cost': total_cost,
                 'total_profit': total_profit,
                 'profit_margin': (total_profit / total_revenue * 100) if total_revenue > 0 else 0,
-                'average_profit_per_sale': total_profit / len(sales) if sales else 0
+                'average_profit_per_sale': total_profit / sale_count if sale_count else 0
             }
         except SQLAlchemyError:
             return {
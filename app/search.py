@@ -0,0 +1,132 @@
+from typing import List, Optional
+from sqlalchemy import or_, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from database.models import Part
+from database.queries import PART_ROW_COLUMNS, PartRow
+from database.search_keys import normalize_search_key
+
+# أقل طول لكلمة البحث يمكن لفهرس trigram مطابقته
+MIN_INDEX_TERM_LENGTH = 3
+
+# أوزان الترتيب: رقم القطعة ثم الاسم ثم النوع
+FTS_SEARCH_TEMPLATE = """
+    SELECT {columns}
+    FROM parts_fts
+    JOIN parts ON parts.id = parts_fts.rowid
+    WHERE parts_fts MATCH :match
+    ORDER BY bm25(parts_fts, 10.0, 5.0, 1.0)
+    LIMIT :limit
+"""
+FTS_SEARCH_SQL = text(FTS_SEARCH_TEMPLATE.format(columns="parts.*"))
+
+# نفس البحث بأعمدة صف العرض فقط (PartRow)
+FTS_SEARCH_ROWS_SQL = text(FTS_SEARCH_TEMPLATE.format(
+    columns=", ".join(f"parts.{column.key}" for column in PART_ROW_COLUMNS)
+))
+
+class PartSearch:
+    """خدمة البحث عن القطع المشتركة بين المدراء والواجهات"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def search(self, search_term: str = "", limit: Optional[int] = None) -> List[Part]:
+        """
+        البحث عن القطع برقم القطعة أو الاسم أو النوع
+        (الاسم يُطابق بمفتاحه الموحد: أحمد = احمد، فاطمة = فاطمه، بدون تشكيل)
+        Args:
+            search_term: كلمة البحث
+            limit: الحد الأقصى لعدد النتائج (None لكل النتائج)
+        Returns:
+            قائمة بالقطع المطابقة مرتبة حسب الصلة
+        """
+        return self.run_search(search_term, limit, rows=False)
+
+    def search_rows(self, search_term: str = "", limit: Optional[int] = None) -> List[PartRow]:
+        """
+        نفس search لكن تعيد صفوف PartRow للعرض دون بناء كائنات ORM
+        (تُستخدم لجداول العرض؛ تعديل القطعة يتم بجلب كائن Part برقمها)
+        """
+        return self.run_search(search_term, limit, rows=True)
+
+    def run_search(self, search_term, limit, rows):
+        """تنفيذ البحث وإرجاع كائنات Part أو صفوف PartRow حسب rows"""
+        search_term = (search_term or "").strip()
+        try:
+            if not search_term:
+                query = self.base_query(rows)
+                if limit:
+                    query = query.limit(limit)
+                return self.results(query.all(), rows)
+
+            # توحيد كلمة البحث مرة واحدة لكل طرق البحث
+            key = normalize_search_key(search_term)
+            if len(key) >= MIN_INDEX_TERM_LENGTH:
+                try:
+                    return self.search_index(search_term, limit, rows, key)
+                except OperationalError as e:
+                    # الفهرس غير متوفر - الرجوع للبحث العادي
+                    if not self.is_index_missing(e):
+                        raise
+
+            return self.search_like(search_term, limit, rows, key)
+        except SQLAlchemyError:
+            return []
+
+    def base_query(self, rows=False):
+        """استعلام القطع: أعمدة صف العرض فقط أو كائنات Part كاملة"""
+        return self.session.query(*PART_ROW_COLUMNS) if rows else self.session.query(Part)
+
+    @staticmethod
+    def results(found, rows):
+        """تحويل نتائج الاستعلام إلى PartRow عند طلب الصفوف"""
+        return [PartRow._make(row) for row in found] if rows else found
+
+    def search_index(self, search_term: str, limit: Optional[int] = None, rows=False,
+                     key: Optional[str] = None):
+        """البحث عبر فهرس FTS5 مع ترتيب النتائج حسب الصلة"""
+        params = {
+            'match': self.build_match_expression(search_term, key),
+            'limit': limit if limit else -1
+        }
+        if rows:
+            return self.results(self.session.execute(FTS_SEARCH_ROWS_SQL, params), rows)
+        return self.session.query(Part).from_statement(FTS_SEARCH_SQL).params(**params).all()
+
+    def search_like(self, search_term: str, limit: Optional[int] = None, rows=False,
+                    key: Optional[str] = None):
+        """
+        البحث الجزئي العادي للكلمات القصيرة
+        (رقم القطعة يُطابق كما كُتب، والاسم بمفتاحه الموحد)
+        """
+        if key is None:
+            key = normalize_search_key(search_term)
+        query = self.base_query(rows).filter(
+            or_(
+                Part.name_key.contains(key, autoescape=True),
+                Part.part_number.ilike(f"%{search_term}%")
+            )
+        )
+        if limit:
+            query = query.limit(limit)
+        return self.results(query.all(), rows)
+
+    @staticmethod
+    def is_index_missing(error: OperationalError) -> bool:
+        """هل الخطأ ناتج عن غياب فهرس FTS5 (وليس عن إيقاف الاستعلام مثلاً)"""
+        message = str(error.orig).lower()
+        return 'parts_fts' in message or 'fts5' in message
+
+    @staticmethod
+    def build_match_expression(search_term: str, key: Optional[str] = None) -> str:
+        """
+        تحويل كلمة البحث إلى عبارة FTS5 حرفية (تطابق جزئي كامل)
+        الفهرس يحفظ الاسم موحداً فتُطابق الكلمة بمفتاحها، وتُضاف كما كُتبت
+        إن اختلفت عنه حتى يبقى النوع ورقم القطعة قابلين للمطابقة
+        """
+        if key is None:
+            key = normalize_search_key(search_term)
+        phrases = [key]
+        if search_term.lower() != key and len(search_term) >= MIN_INDEX_TERM_LENGTH:
+            phrases.append(search_term)
+        return ' OR '.join('"' + phrase.replace('"', '""') + '"' for phrase in phrases)
@@ -1,10 +1,10 @@
-import sqlite3
 from contextlib import closing
+from database.connection import get_connection
 
 DATABASE = 'company.db'
 
 def connect_db():
-    return sqlite3.connect(DATABASE)
+    return get_connection(DATABASE, row_factory=None)
 
 def add_worker(name, phone, salary):
     with closing(connect_db()) as conn, conn:
@@ -42,7 +42,7 @@ def list_workers():
         return cursor.fetchall()
 
 def update_attendance(worker_id, date, status):
-    with connect_db() as conn:
+    with closing(connect_db()) as conn, conn:
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO Attendance (worker_id, date, status)
@@ -51,7 +51,6 @@ def update_attendance(worker_id, date, status):
         ''', (worker_id, date, status))
 
 def delete_all_workers():
-    with connect_db() as conn:
+    with closing(connect_db()) as conn, conn:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM Workers')
-        conn.commit()
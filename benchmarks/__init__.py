@@ -0,0 +1 @@
+"""قياسات أداء قاعدة البيانات (تُشغل يدوياً، انظر كل وحدة)"""
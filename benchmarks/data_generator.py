@@ -0,0 +1,209 @@
+"""
+توليد بيانات تجريبية ثابتة (نفس البذرة تعطي نفس البيانات دائماً)
+
+ينشئ قاعدة بيانات كاملة المخطط تحتوي على:
+- N قطعة غيار بأسماء وأنواع وأسعار واقعية
+- M عملية بيع موزعة على عدة سنوات تنتهي في --end-date
+- W عامل مع سجل حضور يومي لآخر --attendance-days يوماً
+
+الاستخدام:
+    python -m benchmarks.data_generator bench.db --parts 10000 --sales 100000 --workers 50
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from database.connection import ConnectionPool, close_pool
+from database.db_setup import setup_database
+from database.models import Base
+
+DEFAULT_SEED = 2024
+DEFAULT_END_DATE = date(2024, 12, 31)
+
+# عدد الصفوف في كل أمر executemany
+INSERT_BATCH_SIZE = 5000
+
+PART_NAMES = (
+    'فلتر زيت', 'فلتر هواء', 'فلتر بنزين', 'بواجي', 'تيل فرامل', 'ديسك فرامل',
+    'مساعد أمامي', 'مساعد خلفي', 'رديتر', 'طرمبة ماء', 'سير مكينة', 'بطارية',
+    'دينمو', 'سلف', 'كلتش', 'جوزة', 'مقص', 'بلف', 'حساس أكسجين', 'لمبة أمامية',
+)
+CAR_MODELS = (
+    'تويوتا كامري', 'تويوتا هايلكس', 'هيونداي النترا', 'كيا سيراتو', 'نيسان صني',
+    'شيفروليه كابتيفا', 'فورد رينجر', 'ميتسوبيشي لانسر', 'هوندا سيفيك', 'مازدا 3',
+)
+PART_TYPES = ('محرك', 'فرامل', 'تعليق', 'كهرباء', 'تبريد', 'فلاتر', 'ناقل حركة')
+WORKER_NAMES = (
+    'أحمد', 'محمد', 'علي', 'حسن', 'حسين', 'عمر', 'يوسف', 'إبراهيم', 'خالد', 'سعيد',
+    'مصطفى', 'عبدالله', 'كريم', 'سامي', 'ماجد', 'نبيل', 'وليد', 'طارق', 'زياد', 'فادي',
+)
+# الحالة اليومية ووزن احتمالها
+ATTENDANCE_STATUSES = (('حاضر', 85), ('متأخر', 7), ('غائب', 5), ('إجازة', 3))
+
+
+def batches(rows, size=INSERT_BATCH_SIZE):
+    """تقسيم مولد الصفوف إلى قوائم بحجم ثابت"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_parts(rng, count):
+    """صفوف القطع: (رقم القطعة, الاسم, النوع, الكمية, سعر التكلفة, سعر البيع)"""
+    for index in range(count):
+        cost_price = round(rng.uniform(5, 500), 2)
+        yield (
+            f"P{index:06d}",
+            f"{rng.choice(PART_NAMES)} {rng.choice(CAR_MODELS)}",
+            rng.choice(PART_TYPES),
+            rng.randint(0, 200),
+            cost_price,
+            round(cost_price * rng.uniform(1.1, 1.6), 2),
+        )
+
+
+def generate_sales(rng, count, part_prices, start, end):
+    """صفوف المبيعات: (رقم القطعة الداخلي, الكمية, سعر البيع, التاريخ, الربح) مرتبة زمنياً"""
+    span = (end - start).total_seconds()
+    offsets = sorted(rng.random() * span for _ in range(count))
+    for offset in offsets:
+        part_id = rng.randrange(len(part_prices)) + 1
+        cost_price, selling_price = part_prices[part_id - 1]
+        quantity = rng.randint(1, 4)
+        sale_date = start + timedelta(seconds=offset)
+        yield (
+            part_id,
+            quantity,
+            selling_price,
+            sale_date.strftime('%Y-%m-%d %H:%M:%S.%f'),
+            round((selling_price - cost_price) * quantity, 2),
+        )
+
+
+def generate_attendance(rng, worker_ids, start, days):
+    """صفوف الحضور اليومي لكل عامل (بدون أيام الجمعة)"""
+    statuses = [status for status, _ in ATTENDANCE_STATUSES]
+    weights = [weight for _, weight in ATTENDANCE_STATUSES]
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day.weekday() == 4:
+            continue
+        for worker_id in worker_ids:
+            status = rng.choices(statuses, weights)[0]
+            time_in = None
+            if status in ('حاضر', 'متأخر'):
+                hour = 8 if status == 'حاضر' else 9
+                time_in = f"{day} {hour:02d}:{rng.randint(0, 59):02d}:00"
+            yield (worker_id, day.isoformat(), time_in, status, f"{day} 08:00:00")
+
+
+def generate(path, parts=1000, sales=10000, workers=20, years=2,
+             attendance_days=365, seed=DEFAULT_SEED, end_date=DEFAULT_END_DATE):
+    """
+    إنشاء قاعدة بيانات تجريبية جديدة
+    Args:
+        path: مسار ملف قاعدة البيانات (يُستبدل إن كان موجوداً)
+        parts, sales, workers: أحجام البيانات
+        years: عدد السنوات التي تتوزع عليها المبيعات
+        attendance_days: عدد أيام سجل الحضور
+        seed: بذرة المولد العشوائي
+        end_date: آخر يوم في البيانات
+    Returns:
+        عدد الصفوف المنشأة في كل جدول
+    """
+    close_pool(path)
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(seed)
+
+    # المخطط الكامل: جداول SQLAlchemy (مع الفهارس والمشغلات) وجداول العمال
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    setup_database(path)
+    close_pool(path)
+
+    pool = ConnectionPool(path, profile='bulk-load')
+    conn = pool.acquire(row_factory=None)
+    try:
+        with conn:
+            part_rows = list(generate_parts(rng, parts))
+            conn.executemany(
+                "INSERT INTO parts (part_number, name, type, quantity, cost_price, selling_price) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                part_rows
+            )
+
+            end = datetime.combine(end_date, datetime.max.time())
+            start = datetime.combine(end_date - timedelta(days=365 * years), datetime.min.time())
+            part_prices = [(row[4], row[5]) for row in part_rows]
+            for batch in batches(generate_sales(rng, sales, part_prices, start, end)):
+                conn.executemany(
+                    "INSERT INTO sales (part_id, quantity, selling_price, sale_date, profit) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    batch
+                )
+
+            created = f"{end_date - timedelta(days=attendance_days)} 08:00:00"
+            conn.executemany(
+                "INSERT INTO workers (name, phone, salary, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (f"{rng.choice(WORKER_NAMES)} {rng.choice(WORKER_NAMES)} {index}",
+                     f"07{rng.randint(700000000, 799999999)}",
+                     rng.randrange(300, 1500, 50) * 1000,
+                     'نشط' if rng.random() < 0.9 else 'غير نشط',
+                     created, created)
+                    for index in range(1, workers + 1)
+                ]
+            )
+            worker_ids = [row[0] for row in conn.execute("SELECT id FROM workers ORDER BY id")]
+            first_day = end_date - timedelta(days=attendance_days - 1)
+            attendance = 0
+            for batch in batches(generate_attendance(rng, worker_ids, first_day, attendance_days)):
+                conn.executemany(
+                    "INSERT INTO attendance (worker_id, date, time_in, status, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    batch
+                )
+                attendance += len(batch)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+        pool.close()
+
+    return {'parts': parts, 'sales': sales, 'workers': workers, 'attendance': attendance}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="توليد بيانات تجريبية لقياس الأداء")
+    parser.add_argument('path', help="ملف قاعدة البيانات الناتج")
+    parser.add_argument('--parts', type=int, default=1000)
+    parser.add_argument('--sales', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=20)
+    parser.add_argument('--years', type=int, default=2, help="عدد سنوات المبيعات")
+    parser.add_argument('--attendance-days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--end-date', type=date.fromisoformat, default=DEFAULT_END_DATE,
+                        help="آخر يوم في البيانات (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    # الإدراج بالجملة أبطأ من حد الاستعلام البطيء؛ لا يطبع في الطرفية
+    logging.getLogger('mahalli').addHandler(logging.NullHandler())
+
+    counts = generate(args.path, args.parts, args.sales, args.workers, args.years,
+                      args.attendance_days, args.seed, args.end_date)
+    print(", ".join(f"{table}: {count}" for table, count in counts.items()), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+مقارنة كائنات ORM بصفوف العرض المضغوطة (PartRow / SaleRow)
+
+لكل قائمة تُقاس طريقتان على نفس قاعدة البيانات المولدة:
+- orm: كائنات Part أو أزواج (Sale, Part) كما كانت الواجهات تستلمها سابقاً
+- rows: أعمدة محددة فقط تعاد كـ namedtuple (database/queries.py)
+
+يُسجل الزمن والذاكرة التي تحجزها النتائج (tracemalloc) بجلسة جديدة في كل مرة.
+
+الاستخدام:
+    python -m benchmarks.row_projection --parts 100000 --sales 100000
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.sales_reports import SalesReports
+from benchmarks.data_generator import generate, DEFAULT_END_DATE, DEFAULT_SEED
+from database.connection import close_pool
+from database.models import Part, Sale
+from database.queries import PART_ROW_COLUMNS, PartRow
+
+DEFAULT_REPEAT = 3
+
+
+def listings(start, end):
+    """القوائم المقاسة: (الاسم, الطريقة) -> دالة تأخذ الجلسة وتعيد النتائج"""
+    return {
+        ('parts', 'orm'): lambda session: session.query(Part).all(),
+        ('parts', 'rows'): lambda session: [
+            PartRow._make(row) for row in session.query(*PART_ROW_COLUMNS)
+        ],
+        ('sales_report', 'orm'): lambda session: session.query(Sale, Part).join(Part).filter(
+            Sale.sale_date >= start, Sale.sale_date < end
+        ).all(),
+        ('sales_report', 'rows'): lambda session: SalesReports(session).get_sale_rows(start, end),
+    }
+
+
+def measure(session_factory, listing, repeat):
+    """زمن بناء القائمة وذاكرة النتائج المحتفظ بها (بالميلي ثانية والكيلوبايت)"""
+    samples = []
+    memory = []
+    count = 0
+    for _ in range(repeat):
+        session = session_factory()
+        try:
+            gc.collect()
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = listing(session)
+            samples.append(time.perf_counter() - start)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory.append(current)
+            count = len(result)
+            del result
+        finally:
+            session.close()
+    return {
+        'rows': count,
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'memory_kb': round(statistics.median(memory) / 1024, 1),
+    }
+
+
+def run(parts=100000, sales=100000, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED):
+    """
+    توليد قاعدة بيانات وقياس كل قائمة بالطريقتين
+    Returns:
+        النتائج كقاموس قابل للتحويل إلى JSON
+    """
+    directory = tempfile.mkdtemp(prefix='mahalli-rows-')
+    path = os.path.join(directory, 'rows.db')
+    try:
+        generate(path, parts=parts, sales=sales, workers=1, years=1,
+                 attendance_days=1, seed=seed)
+        engine = create_engine(f"sqlite:///{path}")
+        session_factory = sessionmaker(bind=engine)
+        # تقرير يغطي سنة المبيعات المولدة كاملة
+        end = datetime.combine(DEFAULT_END_DATE + timedelta(days=1), datetime.min.time())
+        start = end - timedelta(days=367)
+
+        results = {}
+        try:
+            for (name, mode), listing in listings(start, end).items():
+                results.setdefault(name, {})[mode] = measure(session_factory, listing, repeat)
+        finally:
+            engine.dispose()
+            close_pool(path)
+
+        for modes in results.values():
+            orm, rows = modes['orm'], modes['rows']
+            modes['time_ratio'] = round(orm['median_ms'] / rows['median_ms'], 2) if rows['median_ms'] else None
+            modes['memory_ratio'] = round(orm['memory_kb'] / rows['memory_kb'], 2) if rows['memory_kb'] else None
+        return {'parts': parts, 'sales': sales, 'repeat': repeat, 'listings': results}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="مقارنة كائنات ORM بصفوف العرض المضغوطة")
+    parser.add_argument('--parts', type=int, default=100000)
+    parser.add_argument('--sales', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    logging.getLogger('mahalli').addHandler(logging.NullHandler())
+
+    print(json.dumps(run(args.parts, args.sales, args.repeat, args.seed),
+                     ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
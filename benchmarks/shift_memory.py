@@ -0,0 +1,184 @@
+"""
+قياس الذاكرة خلال وردية عمل محاكاة (8 ساعات افتراضياً)
+
+تُنفذ نفس سلسلة عمليات المستخدم (بحث، تصفح، بيع، إحصائيات، تعديل قطعة) بطريقتين:
+- long-lived: جلسة واحدة تبقى مفتوحة طوال الوردية كما كانت النوافذ تفعل سابقاً
+- unit-of-work: جلسة قصيرة لكل عملية عبر session_scope
+
+بعد كل ساعة محاكاة تُسجل الذاكرة المحجوزة (tracemalloc) وحجم خريطة الهوية.
+
+الاستخدام:
+    python -m benchmarks.shift_memory --parts 10000 --sales 50000 --actions-per-hour 600
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from contextlib import nullcontext
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.inventory_stats import InventoryStats
+from app.sales import SalesManager
+from app.search import PartSearch
+from benchmarks.data_generator import generate, PART_NAMES, CAR_MODELS, DEFAULT_SEED
+from database.connection import close_pool
+from database.db_setup import session_scope
+from database.models import Part
+from database.queries import part_to_row, fetch_part_rows
+
+MODES = ('long-lived', 'unit-of-work')
+
+SHIFT_HOURS = 8
+
+# عملية كل 15 ثانية تقريباً على جهاز بيع مشغول
+ACTIONS_PER_HOUR = 240
+
+# العمليات ووزن تكرارها خلال الوردية
+ACTIONS = (('search', 40), ('browse', 20), ('sale', 25), ('stats', 10), ('edit', 5))
+
+SEARCH_LIMIT = 100
+PAGE_SIZE = 500
+
+
+def shift_actions(rng, part_count):
+    """دوال العمليات (تأخذ الجلسة) مع معاملاتها العشوائية الثابتة"""
+    terms = PART_NAMES + CAR_MODELS
+
+    def search(session):
+        return [part_to_row(part) for part in
+                PartSearch(session).search(rng.choice(terms), SEARCH_LIMIT)]
+
+    def browse(session):
+        return fetch_part_rows(session, rng.randrange(part_count), PAGE_SIZE)
+
+    def sale(session):
+        part_number = f"P{rng.randrange(part_count):06d}"
+        return SalesManager(session).create_sale(part_number, 1, 1000.0)
+
+    def stats(session):
+        return InventoryStats(session).get_stats()
+
+    def edit(session):
+        part = session.query(Part).filter_by(
+            part_number=f"P{rng.randrange(part_count):06d}"
+        ).first()
+        if part:
+            part.selling_price = round(part.selling_price * 1.01, 2)
+        session.commit()
+
+    return {'search': search, 'browse': browse, 'sale': sale, 'stats': stats, 'edit': edit}
+
+
+def simulate_shift(path, mode, part_count, hours=SHIFT_HOURS,
+                   actions_per_hour=ACTIONS_PER_HOUR, seed=DEFAULT_SEED):
+    """
+    تشغيل وردية محاكاة على قاعدة بيانات مولدة
+    Args:
+        path: مسار قاعدة البيانات
+        mode: long-lived أو unit-of-work
+        part_count: عدد القطع في القاعدة
+    Returns:
+        الذاكرة وحجم خريطة الهوية بعد كل ساعة
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+
+    engine = create_engine(f"sqlite:///{path}")
+    session_factory = sessionmaker(bind=engine)
+    rng = random.Random(seed)
+    actions = shift_actions(rng, part_count)
+    names = [name for name, _ in ACTIONS]
+    weights = [weight for _, weight in ACTIONS]
+
+    long_lived = session_factory() if mode == 'long-lived' else None
+
+    def scope():
+        if long_lived is not None:
+            return nullcontext(long_lived)
+        return session_scope(session_factory)
+
+    samples = []
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    try:
+        for hour in range(1, hours + 1):
+            for _ in range(actions_per_hour):
+                action = rng.choices(names, weights)[0]
+                with scope() as session:
+                    actions[action](session)
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append({
+                'hour': hour,
+                'memory_kb': round((current - baseline) / 1024, 1),
+                'identity_map': len(long_lived.identity_map) if long_lived is not None else 0,
+            })
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        if long_lived is not None:
+            long_lived.close()
+        engine.dispose()
+        close_pool(path)
+
+    return {
+        'hours': samples,
+        'peak_kb': round((peak - baseline) / 1024, 1),
+        'growth_kb': round(samples[-1]['memory_kb'] - samples[0]['memory_kb'], 1),
+        'duration_s': round(time.perf_counter() - start, 3),
+    }
+
+
+def run(parts=10000, sales=50000, hours=SHIFT_HOURS, actions_per_hour=ACTIONS_PER_HOUR,
+        modes=MODES, seed=DEFAULT_SEED):
+    """
+    توليد قاعدة بيانات ومحاكاة الوردية بكل طريقة على نسخة مستقلة منها
+    Returns:
+        النتائج كقاموس قابل للتحويل إلى JSON
+    """
+    directory = tempfile.mkdtemp(prefix='mahalli-shift-')
+    try:
+        source = os.path.join(directory, 'source.db')
+        generate(source, parts=parts, sales=sales, workers=1, years=1,
+                 attendance_days=1, seed=seed)
+        results = {}
+        for mode in modes:
+            path = os.path.join(directory, f"{mode}.db")
+            shutil.copyfile(source, path)
+            results[mode] = simulate_shift(path, mode, parts, hours, actions_per_hour, seed)
+        return {
+            'parts': parts, 'sales': sales, 'hours': hours,
+            'actions_per_hour': actions_per_hour, 'modes': results,
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="قياس الذاكرة خلال وردية محاكاة")
+    parser.add_argument('--parts', type=int, default=10000)
+    parser.add_argument('--sales', type=int, default=50000)
+    parser.add_argument('--hours', type=int, default=SHIFT_HOURS)
+    parser.add_argument('--actions-per-hour', type=int, default=ACTIONS_PER_HOUR)
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=MODES)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    logging.getLogger('mahalli').addHandler(logging.NullHandler())
+
+    results = run(args.parts, args.sales, args.hours, args.actions_per_hour,
+                  args.modes, args.seed)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
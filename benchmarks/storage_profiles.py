@@ -0,0 +1,150 @@
+"""
+مقارنة ملفات التخزين (انظر database/connection.py)
+
+لكل ملف تخزين تُنشأ قاعدة بيانات مؤقتة ويقاس:
+- bulk_insert: إدراج عدد كبير من القطع في معاملة واحدة
+- counter_sales: تسجيل مبيعات متتالية كما يفعل جهاز البيع
+- contended_sales: تسجيل المبيعات أثناء قراءة تقرير طويل من جهاز آخر
+
+الاستخدام:
+    python -m benchmarks.storage_profiles --parts 20000 --sales 300
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from database.connection import STORAGE_PROFILES, ConnectionPool, configure_connection
+from database.models import Base
+from app.sales import SalesManager
+
+# مدة احتفاظ القارئ بمعاملة القراءة في كل دورة (ثوانٍ)
+REPORT_HOLD = 0.02
+
+
+def latency_stats(samples):
+    """ملخص أزمنة العمليات بالميلي ثانية"""
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 3) if ordered else 0.0,
+        'p95_ms': round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 3) if ordered else 0.0,
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def create_engine_for(path, profile):
+    """محرك SQLAlchemy يطبق ملف التخزين على كل اتصال"""
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(
+        engine, 'connect',
+        lambda dbapi_connection, record: configure_connection(dbapi_connection, profile)
+    )
+    return engine
+
+
+def bulk_insert(pool, parts):
+    """إدراج القطع دفعة واحدة عبر اتصال SQLite خام"""
+    rows = [
+        (f"P{i:06d}", f"Part {i}", "Engine", 1000000, 10.0, 15.0)
+        for i in range(parts)
+    ]
+    conn = pool.acquire()
+    try:
+        start = time.perf_counter()
+        with conn:
+            conn.executemany(
+                "INSERT INTO parts (part_number, name, type, quantity, cost_price, selling_price) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return time.perf_counter() - start
+    finally:
+        conn.close()
+
+
+def sell(session_factory, sales):
+    """تسجيل المبيعات واحدة تلو الأخرى وإرجاع زمن كل عملية"""
+    manager = SalesManager(session_factory())
+    samples = []
+    try:
+        for i in range(sales):
+            start = time.perf_counter()
+            success, message = manager.create_sale(f"P{i % 100:06d}", 1, 15.0)
+            samples.append(time.perf_counter() - start)
+            if not success:
+                raise RuntimeError(message)
+    finally:
+        manager.close()
+    return samples
+
+
+def read_reports(pool, stop):
+    """قارئ يحتفظ بمعاملة قراءة مفتوحة أثناء حساب إجمالي المبيعات"""
+    conn = pool.acquire()
+    try:
+        while not stop.is_set():
+            conn.execute("BEGIN")
+            conn.execute("SELECT COUNT(*), SUM(selling_price * quantity) FROM sales").fetchone()
+            time.sleep(REPORT_HOLD)
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def run_profile(profile, parts, sales, directory):
+    """قياس ملف تخزين واحد على قاعدة بيانات جديدة"""
+    path = os.path.join(directory, f"{profile}.db")
+    engine = create_engine_for(path, profile)
+    Base.metadata.create_all(engine)
+    pool = ConnectionPool(path, profile=profile)
+    session_factory = sessionmaker(bind=engine)
+
+    try:
+        result = {'bulk_insert_s': round(bulk_insert(pool, parts), 4)}
+        result['counter_sales'] = latency_stats(sell(session_factory, sales))
+
+        stop = threading.Event()
+        reader = threading.Thread(target=read_reports, args=(pool, stop))
+        reader.start()
+        try:
+            result['contended_sales'] = latency_stats(sell(session_factory, sales))
+        finally:
+            stop.set()
+            reader.join()
+        return result
+    finally:
+        pool.close()
+        engine.dispose()
+
+
+def run(parts=20000, sales=300, profiles=None):
+    """تشغيل المقارنة لكل ملفات التخزين المطلوبة"""
+    directory = tempfile.mkdtemp(prefix='mahalli-bench-')
+    try:
+        return {
+            profile: run_profile(profile, parts, sales, directory)
+            for profile in (profiles or STORAGE_PROFILES)
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="مقارنة ملفات تخزين SQLite")
+    parser.add_argument('--parts', type=int, default=20000, help="عدد القطع في الإدراج بالجملة")
+    parser.add_argument('--sales', type=int, default=300, help="عدد المبيعات في كل قياس")
+    parser.add_argument('--profile', action='append', choices=sorted(STORAGE_PROFILES),
+                        help="ملف تخزين محدد (يمكن تكراره)")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.parts, args.sales, args.profile), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+قياس أداء طبقة المدراء على عدة أحجام من البيانات
+
+لكل حجم تُولد قاعدة بيانات ثابتة (benchmarks/data_generator.py) ثم تُقاس العمليات:
+InventoryManager.search_parts, SalesManager.create_sale, SalesReports.get_monthly_report,
+SalesReports.get_best_selling_parts, AttendanceReports.generate_monthly_report,
+AttendanceReports.calculate_salary
+
+النتائج تُكتب بصيغة JSON، ويمكن مقارنتها بنتائج نسخة سابقة:
+    python -m benchmarks.suite --scales small medium --output results.json
+    python -m benchmarks.suite --scales small --compare results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.inventory import InventoryManager
+from app.sales import SalesManager
+from app.sales_reports import SalesReports
+from app.reports import AttendanceReports
+from benchmarks.data_generator import generate, DEFAULT_END_DATE, DEFAULT_SEED
+from database.connection import close_pool
+from database.models import Part
+
+# أحجام البيانات: القطع والمبيعات والعمال
+SCALES = {
+    'small': {'parts': 1000, 'sales': 10000, 'workers': 20},
+    'medium': {'parts': 10000, 'sales': 100000, 'workers': 50},
+    'large': {'parts': 100000, 'sales': 1000000, 'workers': 200},
+}
+
+DEFAULT_REPEAT = 5
+
+# نسبة التباطؤ التي تعتبر تراجعاً عند المقارنة
+REGRESSION_RATIO = 1.2
+
+
+def measure(operation, repeat):
+    """تشغيل العملية عدة مرات وإرجاع ملخص أزمنتها بالميلي ثانية"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'max_ms': round(max(samples), 3),
+        'repeat': repeat,
+    }
+
+
+def benchmark_operations(path):
+    """العمليات المقاسة على قاعدة بيانات مولدة"""
+    engine = create_engine(f"sqlite:///{path}")
+    session_factory = sessionmaker(bind=engine)
+    inventory = InventoryManager(session_factory())
+    sales = SalesManager(session_factory())
+    reports = SalesReports(session_factory())
+    attendance = AttendanceReports(db_path=path)
+
+    year, month = DEFAULT_END_DATE.year, DEFAULT_END_DATE.month
+    year_start = datetime(year, 1, 1)
+    year_end = datetime(year + 1, 1, 1)
+    # القطعة ذات أكبر مخزون حتى لا ينفد أثناء تكرار البيع
+    part_number = inventory.session.query(Part.part_number).order_by(
+        Part.quantity.desc()
+    ).limit(1).scalar()
+
+    def sell():
+        success, message = sales.create_sale(part_number, 1, 1000.0)
+        if not success:
+            raise RuntimeError(message)
+
+    operations = {
+        'InventoryManager.search_parts': lambda: inventory.search_parts('فلتر'),
+        'SalesManager.create_sale': sell,
+        'SalesReports.get_monthly_report': lambda: reports.get_monthly_report(year, month),
+        'SalesReports.get_best_selling_parts':
+            lambda: reports.get_best_selling_parts(year_start, year_end, limit=10),
+        'AttendanceReports.generate_monthly_report':
+            lambda: attendance.generate_monthly_report(year, month),
+        'AttendanceReports.calculate_salary': lambda: attendance.calculate_salary(1, year, month),
+    }
+
+    def close():
+        for manager in (inventory, sales, reports):
+            manager.session.close()
+        engine.dispose()
+        close_pool(path)
+
+    return operations, close
+
+
+def run_scale(name, sizes, directory, repeat, seed):
+    """توليد بيانات حجم واحد وقياس كل العمليات عليها"""
+    path = os.path.join(directory, f"{name}.db")
+    start = time.perf_counter()
+    counts = generate(path, seed=seed, **sizes)
+    result = {
+        'rows': counts,
+        'generate_s': round(time.perf_counter() - start, 3),
+        'operations': {},
+    }
+
+    operations, close = benchmark_operations(path)
+    try:
+        for operation_name, operation in operations.items():
+            operation()  # تسخين الذاكرة المؤقتة قبل القياس
+            result['operations'][operation_name] = measure(operation, repeat)
+    finally:
+        close()
+    return result
+
+
+def environment():
+    """معلومات النسخة والبيئة المرفقة بالنتائج"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+    }
+
+
+def run(scales=('small',), repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED, directory=None):
+    """
+    تشغيل القياسات
+    Args:
+        scales: أسماء الأحجام من SCALES أو قواميس أحجام مخصصة {الاسم: الأحجام}
+        repeat: عدد مرات تشغيل كل عملية
+        seed: بذرة توليد البيانات
+        directory: مجلد قواعد البيانات المولدة (مؤقت إن لم يحدد)
+    Returns:
+        النتائج كقاموس قابل للتحويل إلى JSON
+    """
+    if isinstance(scales, dict):
+        sizes_by_scale = scales
+    else:
+        sizes_by_scale = {name: SCALES[name] for name in scales}
+
+    work_directory = directory or tempfile.mkdtemp(prefix='mahalli-bench-')
+    try:
+        results = {}
+        for name, sizes in sizes_by_scale.items():
+            results[name] = run_scale(name, sizes, work_directory, repeat, seed)
+        return {'environment': environment(), 'scales': results}
+    finally:
+        if directory is None:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+
+def compare(baseline, current, ratio=REGRESSION_RATIO):
+    """
+    مقارنة نتيجتين (الوسيط لكل عملية في كل حجم)
+    Returns:
+        قائمة (الحجم, العملية, الوسيط السابق, الوسيط الحالي, النسبة, تراجع؟)
+    """
+    rows = []
+    for scale, result in current['scales'].items():
+        previous = baseline.get('scales', {}).get(scale)
+        if not previous:
+            continue
+        for operation, timing in result['operations'].items():
+            before = previous['operations'].get(operation)
+            if not before:
+                continue
+            change = timing['median_ms'] / before['median_ms'] if before['median_ms'] else 1.0
+            rows.append((scale, operation, before['median_ms'], timing['median_ms'],
+                         round(change, 3), change >= ratio))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="قياس أداء طبقة المدراء")
+    parser.add_argument('--scales', nargs='+', default=['small'], choices=sorted(SCALES))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--data-dir', help="الاحتفاظ بقواعد البيانات المولدة في هذا المجلد")
+    parser.add_argument('--output', help="ملف JSON للنتائج (الافتراضي الطباعة)")
+    parser.add_argument('--compare', help="ملف نتائج سابق للمقارنة")
+    args = parser.parse_args(argv)
+
+    # الاستعلامات البطيئة متوقعة أثناء القياس؛ لا تطبع في الطرفية
+    logging.getLogger('mahalli').addHandler(logging.NullHandler())
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+    results = run(args.scales, args.repeat, args.seed, args.data_dir)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as results_file:
+            results_file.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = 0
+        for scale, operation, before, after, change, regressed in compare(baseline, results):
+            marker = "REGRESSION" if regressed else ""
+            regressions += regressed
+            print(f"{scale:8} {operation:45} {before:10.3f} -> {after:10.3f} ms  x{change} {marker}",
+                  file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
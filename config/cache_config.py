@@ -0,0 +1,19 @@
+import os
+
+# ذاكرة القطع المؤقتة حسب رقم القطعة (انظر app/part_cache.py)
+DEFAULT_PART_CACHE_SIZE = 512
+
+# أقصى عمر للسجل بالثواني: تعديلات الأجهزة الأخرى لا تُلغي ذاكرة هذا الجهاز
+DEFAULT_PART_CACHE_TTL = 30
+
+def is_part_cache_enabled():
+    """تفعيل الذاكرة المؤقتة (يمكن إيقافها بمتغير البيئة MAHALLI_PART_CACHE=0)"""
+    return os.environ.get('MAHALLI_PART_CACHE', '1') != '0'
+
+def get_part_cache_size():
+    """أقصى عدد قطع في الذاكرة المؤقتة (MAHALLI_PART_CACHE_SIZE)"""
+    return int(os.environ.get('MAHALLI_PART_CACHE_SIZE', DEFAULT_PART_CACHE_SIZE))
+
+def get_part_cache_ttl():
+    """عمر سجل القطعة في الذاكرة المؤقتة بالثواني (MAHALLI_PART_CACHE_TTL)"""
+    return float(os.environ.get('MAHALLI_PART_CACHE_TTL', DEFAULT_PART_CACHE_TTL))
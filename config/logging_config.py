@@ -2,7 +2,6 @@ import os
 import logging
 from logging.handlers import RotatingFileHandler
 import sys
-import appdirs
 
 def setup_logging():
     # Create logger
@@ -13,6 +12,7 @@ def setup_logging():
         # Use appdirs to get the appropriate user data directory
         if getattr(sys, 'frozen', False):
             # Running as compiled executable
+            import appdirs
             log_dir = os.path.join(appdirs.user_log_dir('mahalli', appauthor=False))
         else:
             # Running from source
@@ -0,0 +1,13 @@
+import os
+
+# ملف إعدادات التخزين المستخدم لكل اتصالات قاعدة البيانات (انظر database/connection.py)
+# single-terminal: جهاز واحد، أقصى أمان للبيانات (الافتراضي، نفس سلوك SQLite الأصلي)
+# multi-terminal: عدة أجهزة بيع مع تقارير متزامنة (WAL) - يُفعّل صراحة فقط لأن WAL
+#   يُحفظ في ملف القاعدة نفسه و synchronous=NORMAL أقل أماناً عند انقطاع الكهرباء
+# bulk-load: استيراد كميات كبيرة من البيانات، أسرع كتابة وأقل أماناً عند انقطاع الكهرباء
+#   (يستخدمه استيراد القطع ومولد بيانات الاختبار مؤقتاً، لا يصلح كملف دائم)
+DEFAULT_STORAGE_PROFILE = 'single-terminal'
+
+def get_storage_profile_name():
+    """اسم ملف التخزين المختار (يمكن تغييره بمتغير البيئة MAHALLI_STORAGE_PROFILE)"""
+    return os.environ.get('MAHALLI_STORAGE_PROFILE', DEFAULT_STORAGE_PROFILE)
@@ -0,0 +1,17 @@
+import os
+
+# قياس زمن الاستعلامات وعمليات الواجهة (انظر database/query_timing.py)
+DEFAULT_SLOW_QUERY_MS = 200
+DEFAULT_SLOW_ACTION_MS = 1000
+
+def is_timing_enabled():
+    """تفعيل القياس (يمكن إيقافه بمتغير البيئة MAHALLI_TIMING=0)"""
+    return os.environ.get('MAHALLI_TIMING', '1') != '0'
+
+def get_slow_query_ms():
+    """الحد الذي يُسجل بعده الاستعلام كاستعلام بطيء (MAHALLI_SLOW_QUERY_MS)"""
+    return float(os.environ.get('MAHALLI_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS))
+
+def get_slow_action_ms():
+    """الحد الذي تُسجل بعده عملية الواجهة كعملية بطيئة (MAHALLI_SLOW_ACTION_MS)"""
+    return float(os.environ.get('MAHALLI_SLOW_ACTION_MS', DEFAULT_SLOW_ACTION_MS))
@@ -0,0 +1,301 @@
+"""
+إدارة اتصالات SQLite الخام
+
+كل الوحدات التي تنفذ SQL مباشرة تأخذ اتصالاتها من هنا بدلاً من sqlite3.connect:
+- مجمع محدود الحجم لكل ملف قاعدة بيانات يعيد استخدام الاتصالات بدلاً من فتحها وإغلاقها
+- كل طلب يأخذ اتصالاً خاصاً به حتى لو كان متداخلاً في نفس الخيط، فلا يمكن
+  لنطاق داخلي أن يثبت أو يلغي معاملة النطاق الخارجي
+- نفس إعدادات PRAGMA (حسب ملف التخزين المختار) ونفس row_factory على كل اتصال
+
+close() على الاتصال يعيده للمجمع. الاتصال الذي يُنسى إغلاقه يُسترد مكانه
+في المجمع تلقائياً عند تحريره من الذاكرة.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from .query_timing import record_query
+
+DEFAULT_DB_PATH = 'database/workers.db'
+
+# أقصى عدد اتصالات مفتوحة في نفس الوقت لكل ملف قاعدة بيانات
+POOL_SIZE = 5
+
+# مدة انتظار اتصال متاح (بالثواني) قبل إظهار خطأ
+CHECKOUT_TIMEOUT = 30
+
+# ملفات التخزين: إعدادات PRAGMA تطبق على كل اتصال جديد (SQLite الخام ومحرك SQLAlchemy)
+# busy_timeout أولاً حتى ينتظر تغيير journal_mode بدلاً من أن يفشل
+STORAGE_PROFILES = {
+    # جهاز واحد: سجل استرجاع تقليدي ومزامنة كاملة
+    'single-terminal': (
+        ('busy_timeout', 5000),
+        ('journal_mode', 'DELETE'),
+        ('synchronous', 'FULL'),
+        ('cache_size', -16000),
+        ('mmap_size', 0),
+        ('temp_store', 'DEFAULT'),
+    ),
+    # عدة أجهزة: WAL يسمح بقراءة التقارير أثناء تسجيل المبيعات
+    'multi-terminal': (
+        ('busy_timeout', 5000),
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -32000),
+        ('mmap_size', 268435456),
+        ('temp_store', 'MEMORY'),
+    ),
+    # استيراد بالجملة: بدون مزامنة مع القرص، يستخدم مؤقتاً أثناء الاستيراد فقط
+    'bulk-load': (
+        ('busy_timeout', 30000),
+        ('journal_mode', 'MEMORY'),
+        ('synchronous', 'OFF'),
+        ('cache_size', -131072),
+        ('mmap_size', 268435456),
+        ('temp_store', 'MEMORY'),
+    ),
+}
+
+_storage_profile = None
+
+
+def get_storage_profile():
+    """اسم ملف التخزين الحالي (من config/storage_config.py عند أول استخدام)"""
+    global _storage_profile
+    if _storage_profile is None:
+        from config.storage_config import get_storage_profile_name
+        name = get_storage_profile_name()
+        if name not in STORAGE_PROFILES:
+            print(f"Unknown storage profile '{name}', using 'single-terminal'")
+            name = 'single-terminal'
+        _storage_profile = name
+    return _storage_profile
+
+
+def set_storage_profile(name):
+    """
+    تغيير ملف التخزين للاتصالات الجديدة
+    الاتصالات الخاملة في المجمعات تُغلق حتى تُفتح من جديد بالإعدادات الجديدة
+    """
+    global _storage_profile
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"ملف تخزين غير معروف: {name}")
+    _storage_profile = name
+    close_all()
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """لا يوجد اتصال متاح في المجمع خلال مدة الانتظار"""
+
+
+def configure_connection(dbapi_connection, profile=None, journal_mode=True):
+    """
+    تطبيق إعدادات ملف التخزين على اتصال DBAPI جديد
+    Args:
+        dbapi_connection: اتصال sqlite3
+        profile: اسم ملف التخزين (الافتراضي الملف الحالي)
+        journal_mode: تغيير journal_mode أيضاً (يُحفظ في ملف القاعدة ويؤثر على كل
+            الاتصالات، فلا يُغير عند تبديل الملف مؤقتاً على اتصال قائم)
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in STORAGE_PROFILES[profile or get_storage_profile()]:
+            if name == 'journal_mode' and not journal_mode:
+                continue
+            try:
+                cursor.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.OperationalError as e:
+                # لا يمكن تغيير journal_mode أثناء وجود اتصالات أخرى تستخدم الملف
+                if name != 'journal_mode':
+                    raise
+                print(f"Could not set journal_mode={value}: {str(e)}")
+    finally:
+        cursor.close()
+
+
+class TimedCursor(sqlite3.Cursor):
+    """مؤشر يسجل زمن كل استعلام (انظر database/query_timing.py)"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_query(sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record_query(sql, seq_of_parameters, time.perf_counter() - start, executemany=True)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            record_query(sql_script, None, time.perf_counter() - start)
+
+
+class PooledConnection(sqlite3.Connection):
+    """اتصال SQLite يعود إلى مجمعه عند close() بدلاً من أن يُغلق"""
+
+    pool = None
+    owner = None
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+    def dispose(self):
+        """إغلاق الاتصال فعلياً"""
+        sqlite3.Connection.close(self)
+
+
+class ConnectionPool:
+    """مجمع اتصالات محدود لملف قاعدة بيانات واحد"""
+
+    def __init__(self, path, size=POOL_SIZE, timeout=CHECKOUT_TIMEOUT, profile=None):
+        self.path = path
+        self.profile = profile
+        self.size = size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def connect(self):
+        """فتح اتصال جديد بالإعدادات الموحدة"""
+        connection = sqlite3.connect(
+            self.path, factory=PooledConnection, check_same_thread=False
+        )
+        try:
+            configure_connection(connection, self.profile)
+        except sqlite3.Error:
+            connection.dispose()
+            raise
+        connection.pool = self
+        return connection
+
+    def acquire(self, row_factory=sqlite3.Row):
+        """
+        الحصول على اتصال من المجمع
+        Args:
+            row_factory: شكل الصفوف المرجعة (sqlite3.Row أو None للصفوف العادية)
+        Returns:
+            اتصال يعود للمجمع عند close()
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"لا يوجد اتصال متاح بقاعدة البيانات: {self.path}")
+        try:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = self.connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        connection.row_factory = row_factory
+        connection.owner = threading.get_ident()
+        # استرداد المكان إذا حُرر الاتصال من الذاكرة دون close()
+        connection.finalizer = weakref.finalize(connection, self._slots.release)
+        connection.finalizer.atexit = False
+        return connection
+
+    def release(self, connection):
+        """إعادة الاتصال للمجمع"""
+        if connection.owner is None:
+            # أُعيد مسبقاً
+            return
+
+        connection.owner = None
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            connection.row_factory = None
+            reusable = not self._closed
+        except sqlite3.Error:
+            reusable = False
+
+        connection.finalizer.detach()
+        if reusable:
+            with self._lock:
+                self._idle.append(connection)
+        else:
+            connection.dispose()
+        self._slots.release()
+
+    def close(self):
+        """إغلاق الاتصالات الخاملة؛ المستخدمة حالياً تُغلق عند إعادتها"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.dispose()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_key(path):
+    """مفتاح المجمع: المسار المطلق للملف (أو :memory: كما هو)"""
+    return path if path == ':memory:' else os.path.abspath(path)
+
+
+def get_pool(path=None):
+    """مجمع الاتصالات الخاص بملف قاعدة البيانات (يُنشأ عند أول طلب)"""
+    key = pool_key(path or DEFAULT_DB_PATH)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(path or DEFAULT_DB_PATH)
+        return pool
+
+
+def get_connection(path=None, row_factory=sqlite3.Row):
+    """
+    الحصول على اتصال SQLite من المجمع المشترك
+    Args:
+        path: مسار قاعدة البيانات (الافتراضي database/workers.db)
+        row_factory: sqlite3.Row افتراضياً، أو None للصفوف العادية
+    Returns:
+        اتصال يُعاد للمجمع باستدعاء close()
+    """
+    return get_pool(path).acquire(row_factory)
+
+
+def close_pool(path):
+    """إغلاق مجمع ملف واحد (قبل حذف الملف أو استبداله)"""
+    with _pools_lock:
+        pool = _pools.pop(pool_key(path), None)
+    if pool is not None:
+        pool.close()
+
+
+def close_all():
+    """إغلاق كل المجمعات (عند إغلاق البرنامج أو قبل حذف ملف قاعدة البيانات)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
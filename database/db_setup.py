@@ -1,16 +1,19 @@
-import sqlite3
 import os
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from .connection import get_connection, configure_connection
+from .query_timing import instrument_engine
+from .search_keys import search_key_sql
 
 # SQLite setup
-def setup_database():
+def setup_database(db_path='database/workers.db'):
     # Ensure the database directory exists
-    os.makedirs('database', exist_ok=True)
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
     
     # Connect to database
-    conn = sqlite3.connect('database/workers.db')
+    conn = get_connection(db_path, row_factory=None)
     cursor = conn.cursor()
 
     # Create workers table
@@ -22,9 +25,10 @@ def setup_database():
         salary INTEGER NOT NULL,
         status TEXT NOT NULL,
         created_at TIMESTAMP NOT NULL,
-        updated_at TIMESTAMP NOT NULL
+        updated_at TIMESTAMP NOT NULL,
+        name_key TEXT GENERATED ALWAYS AS ({name_key}) VIRTUAL
     )
-    ''')
+    '''.format(name_key=search_key_sql('name')))
 
     # Create attendance table
     cursor.execute('''
@@ -56,6 +60,7 @@ def setup_database():
     # Create indexes
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_worker_name ON workers(name)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_worker_phone ON workers(phone)')
+    add_name_key(cursor.execute, 'workers')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_worker ON attendance(worker_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_username ON users(username)')
@@ -63,9 +68,302 @@ def setup_database():
     conn.commit()
     conn.close()
 
+def add_name_key(execute, table):
+    """
+    عمود مفتاح البحث name_key (مولد من name) مع فهرسه، للجداول المنشأة قبل إضافته
+    Args:
+        execute: دالة تنفيذ SQL (cursor.execute أو connection.exec_driver_sql)
+        table: اسم الجدول
+    """
+    # table_xinfo تعرض الأعمدة المولدة أيضاً بخلاف table_info
+    columns = {row[1] for row in execute(f"PRAGMA table_xinfo({table})")}
+    if not columns:
+        return
+    if 'name_key' not in columns:
+        execute(
+            f"ALTER TABLE {table} ADD COLUMN name_key TEXT "
+            f"GENERATED ALWAYS AS ({search_key_sql('name')}) VIRTUAL"
+        )
+    execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_name_key ON {table}(name_key)")
+
+# فهرس البحث النصي للقطع (FTS5)
+# جدول ظل خارجي المحتوى مرتبط بجدول parts، مقسم بطريقة trigram ليطابق
+# البحث الجزئي داخل رقم القطعة أو اسمها كما كان يفعل ilike('%term%')
+# الاسم مفهرس بمفتاحه الموحد name_key (انظر database/search_keys.py)
+PARTS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts USING fts5(
+        part_number, name_key, type,
+        content='parts', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS parts_fts_ai AFTER INSERT ON parts BEGIN
+        INSERT INTO parts_fts(rowid, part_number, name_key, type)
+        VALUES (new.id, new.part_number, new.name_key, new.type);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS parts_fts_ad AFTER DELETE ON parts BEGIN
+        INSERT INTO parts_fts(parts_fts, rowid, part_number, name_key, type)
+        VALUES ('delete', old.id, old.part_number, old.name_key, old.type);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS parts_fts_au AFTER UPDATE OF part_number, name, type ON parts BEGIN
+        INSERT INTO parts_fts(parts_fts, rowid, part_number, name_key, type)
+        VALUES ('delete', old.id, old.part_number, old.name_key, old.type);
+        INSERT INTO parts_fts(rowid, part_number, name_key, type)
+        VALUES (new.id, new.part_number, new.name_key, new.type);
+    END
+    """,
+]
+
+def fts5_available(connection) -> bool:
+    """هل نسخة SQLite مبنية مع FTS5"""
+    return bool(connection.exec_driver_sql(
+        "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+    ).scalar())
+
+def setup_search_index(connection):
+    """إنشاء فهرس البحث النصي للقطع ومشغلات المزامنة إن لم تكن موجودة"""
+    if connection.dialect.name != 'sqlite':
+        return
+
+    # الفهرس يقرأ name_key من جدول القطع
+    add_name_key(connection.exec_driver_sql, 'parts')
+
+    if not fts5_available(connection):
+        # نسخة SQLite بدون FTS5 - يستمر البحث بالطريقة العادية
+        print("SQLite built without FTS5: parts search index skipped")
+        return
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'parts_fts'"
+    ).first()
+
+    for statement in PARTS_FTS_DDL:
+        connection.exec_driver_sql(statement)
+
+    # بناء الفهرس من البيانات الموجودة عند إنشائه لأول مرة
+    if not exists:
+        connection.exec_driver_sql("INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')")
+
+def rebuild_search_index(connection):
+    """حذف فهرس البحث ومشغلاته وإعادة إنشائه (عند تغيير أعمدته)"""
+    if connection.dialect.name != 'sqlite':
+        return
+
+    for trigger in ('parts_fts_ai', 'parts_fts_ad', 'parts_fts_au'):
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    connection.exec_driver_sql("DROP TABLE IF EXISTS parts_fts")
+    setup_search_index(connection)
+
+# ملخص إحصائيات المخزون (صف واحد) تحدثه المشغلات عند كل تعديل على parts
+LOW_STOCK_THRESHOLD = 5
+
+INVENTORY_STATS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS inventory_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        part_count INTEGER NOT NULL DEFAULT 0,
+        total_quantity INTEGER NOT NULL DEFAULT 0,
+        low_stock_count INTEGER NOT NULL DEFAULT 0,
+        total_value REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_stats_ai AFTER INSERT ON parts BEGIN
+        UPDATE inventory_stats SET
+            part_count = part_count + 1,
+            total_quantity = total_quantity + COALESCE(new.quantity, 0),
+            low_stock_count = low_stock_count
+                + (CASE WHEN new.quantity <= {threshold} THEN 1 ELSE 0 END),
+            total_value = total_value + COALESCE(new.cost_price * new.quantity, 0)
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_stats_ad AFTER DELETE ON parts BEGIN
+        UPDATE inventory_stats SET
+            part_count = part_count - 1,
+            total_quantity = total_quantity - COALESCE(old.quantity, 0),
+            low_stock_count = low_stock_count
+                - (CASE WHEN old.quantity <= {threshold} THEN 1 ELSE 0 END),
+            total_value = total_value - COALESCE(old.cost_price * old.quantity, 0)
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_stats_au AFTER UPDATE OF quantity, cost_price ON parts BEGIN
+        UPDATE inventory_stats SET
+            total_quantity = total_quantity
+                - COALESCE(old.quantity, 0) + COALESCE(new.quantity, 0),
+            low_stock_count = low_stock_count
+                - (CASE WHEN old.quantity <= {threshold} THEN 1 ELSE 0 END)
+                + (CASE WHEN new.quantity <= {threshold} THEN 1 ELSE 0 END),
+            total_value = total_value
+                - COALESCE(old.cost_price * old.quantity, 0)
+                + COALESCE(new.cost_price * new.quantity, 0)
+        WHERE id = 1;
+    END
+    """,
+]
+
+# إعادة حساب الملخص بالكامل من جدول القطع
+INVENTORY_STATS_REBUILD = """
+    INSERT OR REPLACE INTO inventory_stats
+        (id, part_count, total_quantity, low_stock_count, total_value)
+    SELECT
+        1,
+        COUNT(*),
+        COALESCE(SUM(quantity), 0),
+        COALESCE(SUM(CASE WHEN quantity <= {threshold} THEN 1 ELSE 0 END), 0),
+        COALESCE(SUM(cost_price * quantity), 0)
+    FROM parts
+"""
+
+def setup_inventory_stats(connection):
+    """إنشاء جدول ملخص المخزون ومشغلات تحديثه إن لم تكن موجودة"""
+    if connection.dialect.name != 'sqlite':
+        return
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'inventory_stats'"
+    ).first()
+
+    for statement in INVENTORY_STATS_DDL:
+        connection.exec_driver_sql(statement.format(threshold=LOW_STOCK_THRESHOLD))
+
+    # حساب القيم الابتدائية من البيانات الموجودة
+    if not exists:
+        connection.exec_driver_sql(
+            INVENTORY_STATS_REBUILD.format(threshold=LOW_STOCK_THRESHOLD)
+        )
+
+# ملخص المبيعات اليومي لكل قطعة - تحدثه المشغلات داخل نفس معاملة البيع أو الإرجاع
+DAILY_SALES_SUMMARY_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS daily_sales_summary (
+        sale_day TEXT NOT NULL,
+        part_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        profit REAL NOT NULL DEFAULT 0,
+        sale_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (sale_day, part_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS daily_sales_summary_ai AFTER INSERT ON sales BEGIN
+        INSERT INTO daily_sales_summary
+            (sale_day, part_id, quantity, revenue, profit, sale_count)
+        VALUES (
+            date(new.sale_date), new.part_id, COALESCE(new.quantity, 0),
+            COALESCE(new.selling_price * new.quantity, 0), COALESCE(new.profit, 0), 1
+        )
+        ON CONFLICT (sale_day, part_id) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue,
+            profit = profit + excluded.profit,
+            sale_count = sale_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS daily_sales_summary_ad AFTER DELETE ON sales BEGIN
+        UPDATE daily_sales_summary SET
+            quantity = quantity - COALESCE(old.quantity, 0),
+            revenue = revenue - COALESCE(old.selling_price * old.quantity, 0),
+            profit = profit - COALESCE(old.profit, 0),
+            sale_count = sale_count - 1
+        WHERE sale_day = date(old.sale_date) AND part_id = old.part_id;
+        DELETE FROM daily_sales_summary
+        WHERE sale_day = date(old.sale_date) AND part_id = old.part_id AND sale_count <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS daily_sales_summary_au
+    AFTER UPDATE OF part_id, quantity, selling_price, sale_date, profit ON sales BEGIN
+        UPDATE daily_sales_summary SET
+            quantity = quantity - COALESCE(old.quantity, 0),
+            revenue = revenue - COALESCE(old.selling_price * old.quantity, 0),
+            profit = profit - COALESCE(old.profit, 0),
+            sale_count = sale_count - 1
+        WHERE sale_day = date(old.sale_date) AND part_id = old.part_id;
+        DELETE FROM daily_sales_summary
+        WHERE sale_day = date(old.sale_date) AND part_id = old.part_id AND sale_count <= 0;
+        INSERT INTO daily_sales_summary
+            (sale_day, part_id, quantity, revenue, profit, sale_count)
+        VALUES (
+            date(new.sale_date), new.part_id, COALESCE(new.quantity, 0),
+            COALESCE(new.selling_price * new.quantity, 0), COALESCE(new.profit, 0), 1
+        )
+        ON CONFLICT (sale_day, part_id) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            revenue = revenue + excluded.revenue,
+            profit = profit + excluded.profit,
+            sale_count = sale_count + 1;
+    END
+    """,
+]
+
+# إعادة حساب الملخص اليومي بالكامل من جدول المبيعات
+DAILY_SALES_SUMMARY_REBUILD = [
+    "DELETE FROM daily_sales_summary",
+    """
+    INSERT INTO daily_sales_summary
+        (sale_day, part_id, quantity, revenue, profit, sale_count)
+    SELECT
+        date(sale_date),
+        part_id,
+        COALESCE(SUM(quantity), 0),
+        COALESCE(SUM(selling_price * quantity), 0),
+        COALESCE(SUM(profit), 0),
+        COUNT(*)
+    FROM sales
+    GROUP BY date(sale_date), part_id
+    """,
+]
+
+def setup_daily_sales_summary(connection):
+    """إنشاء جدول الملخص اليومي للمبيعات ومشغلات تحديثه إن لم تكن موجودة"""
+    if connection.dialect.name != 'sqlite':
+        return
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_sales_summary'"
+    ).first()
+
+    for statement in DAILY_SALES_SUMMARY_DDL:
+        connection.exec_driver_sql(statement)
+
+    # حساب القيم الابتدائية من المبيعات الموجودة
+    if not exists:
+        for statement in DAILY_SALES_SUMMARY_REBUILD:
+            connection.exec_driver_sql(statement)
+
+def add_missing_columns(connection):
+    """إضافة الأعمدة الجديدة إلى الجداول الموجودة مسبقاً"""
+    if connection.dialect.name != 'sqlite':
+        return
+
+    sales_columns = {
+        row[1] for row in connection.exec_driver_sql("PRAGMA table_info(sales)")
+    }
+    if sales_columns and 'invoice_id' not in sales_columns:
+        connection.exec_driver_sql(
+            "ALTER TABLE sales ADD COLUMN invoice_id INTEGER REFERENCES invoices(id)"
+        )
+
 # SQLAlchemy setup
 DATABASE_URL = "sqlite:///database/workers.db"
 engine = create_engine(DATABASE_URL)
+
+# نفس إعدادات PRAGMA التي تطبقها مجمعات الاتصالات الخام
+event.listen(engine, 'connect', lambda dbapi_connection, record: configure_connection(dbapi_connection))
+# قياس زمن الاستعلامات وتسجيل البطيء منها (انظر database/query_timing.py)
+instrument_engine(engine)
 Base = declarative_base()
 
 # Create Session class
@@ -82,6 +380,11 @@ def init_db():
     # Import models and create SQLAlchemy tables
     from . import models
     Base.metadata.create_all(bind=engine)
+
+    # ترقية القواعد الموجودة مسبقاً (create_all لا يعدل الجداول الموجودة)
+    from .migrations import migrate
+    with engine.begin() as connection:
+        migrate(connection)
     
     # Create a session and initialize any required data
     session = Session()
@@ -96,11 +399,57 @@ def init_db():
 
 def get_db():
     """Return SQLite database connection"""
-    return sqlite3.connect('database/workers.db')
+    return get_connection('database/workers.db', row_factory=None)
 
 def get_session():
     """Return SQLAlchemy session"""
     return Session()
 
+@contextmanager
+def session_scope(session_factory=None):
+    """
+    جلسة قصيرة العمر لعملية مستخدم واحدة (unit of work)
+    تُثبت التغييرات عند النجاح وتُلغى عند الخطأ وتُغلق دائماً، فلا تبقى كائنات
+    العملية في خريطة الهوية بعد انتهائها مهما طال بقاء النافذة مفتوحة
+    Args:
+        session_factory: مصنع الجلسات (الافتراضي Session)
+    """
+    session = (session_factory or Session)()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+@contextmanager
+def bulk_load(session):
+    """
+    إعدادات bulk-load (بدون مزامنة مع القرص، ذاكرة مؤقتة كبيرة) على اتصالات الجلسة
+    أثناء استيراد كبير، ثم إعادة ملف التخزين الحالي لها
+    journal_mode لا يتغير لأنه مشترك بين كل الاتصالات بالملف
+    """
+    if session.get_bind().dialect.name != 'sqlite':
+        yield session
+        return
+
+    configured = []
+
+    def apply_profile(session, transaction, connection):
+        dbapi_connection = connection.connection.dbapi_connection
+        if not any(existing is dbapi_connection for existing in configured):
+            configure_connection(dbapi_connection, 'bulk-load', journal_mode=False)
+            configured.append(dbapi_connection)
+
+    event.listen(session, 'after_begin', apply_profile)
+    try:
+        yield session
+    finally:
+        event.remove(session, 'after_begin', apply_profile)
+        for dbapi_connection in configured:
+            configure_connection(dbapi_connection, journal_mode=False)
+
 if __name__ == "__main__":
     setup_database()
@@ -0,0 +1,131 @@
+"""
+ترقية مخطط قاعدة البيانات حسب رقم الإصدار
+يُحفظ رقم آخر ترقية منفذة في PRAGMA user_version، وعند التشغيل تُنفذ
+الترقيات الأحدث فقط بالترتيب داخل معاملة واحدة
+
+الوحدة لا تستورد SQLAlchemy عند تحميلها حتى يبقى فحص الإصدار عند بدء
+التشغيل (ensure_database) سريعاً
+"""
+import os
+from .connection import get_connection
+
+DEFAULT_DB_PATH = 'database/workers.db'
+
+def db_setup_step(name):
+    """ترقية معرفة في db_setup (تُستورد الوحدة عند التنفيذ فقط)"""
+    def migration(connection):
+        from . import db_setup
+        return getattr(db_setup, name)(connection)
+    migration.__name__ = name
+    return migration
+
+SALES_INDEXES_DDL = [
+    "CREATE INDEX IF NOT EXISTS idx_sales_sale_date ON sales(sale_date)",
+    "CREATE INDEX IF NOT EXISTS idx_sales_part_id ON sales(part_id)",
+    "CREATE INDEX IF NOT EXISTS idx_sales_invoice_id ON sales(invoice_id)",
+]
+
+def add_sales_indexes(connection):
+    """فهارس تاريخ البيع ورقم القطعة ورقم الفاتورة في جدول المبيعات"""
+    for statement in SALES_INDEXES_DDL:
+        connection.exec_driver_sql(statement)
+
+def add_part_barcode(connection):
+    """عمود الباركود في جدول القطع مع فهرس فريد للبحث المباشر عند المسح"""
+    columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(parts)")}
+    if not columns:
+        return
+    if 'barcode' not in columns:
+        connection.exec_driver_sql("ALTER TABLE parts ADD COLUMN barcode VARCHAR(64)")
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_parts_barcode ON parts(barcode)"
+    )
+
+def add_name_search_keys(connection):
+    """مفاتيح البحث الموحدة لأسماء القطع والعمال، وإعادة بناء فهرس البحث عليها"""
+    from .db_setup import add_name_key, rebuild_search_index
+    for table in ('parts', 'workers'):
+        add_name_key(connection.exec_driver_sql, table)
+    rebuild_search_index(connection)
+
+def add_sale_returns(connection):
+    """ربط أسطر المرتجعات بعملية البيع الأصلية بدل حذفها أو تعديلها"""
+    columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(sales)")}
+    if not columns:
+        return
+    if 'return_of_id' not in columns:
+        connection.exec_driver_sql(
+            "ALTER TABLE sales ADD COLUMN return_of_id INTEGER REFERENCES sales(id)"
+        )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_sales_return_of_id ON sales(return_of_id)"
+    )
+
+# (رقم الإصدار, الترقية) - تضاف الترقيات الجديدة في النهاية فقط
+MIGRATIONS = [
+    (1, db_setup_step('add_missing_columns')),
+    (2, db_setup_step('setup_search_index')),
+    (3, db_setup_step('setup_inventory_stats')),
+    (4, db_setup_step('setup_daily_sales_summary')),
+    (5, add_sales_indexes),
+    (6, add_part_barcode),
+    (7, add_name_search_keys),
+    (8, add_sale_returns),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(connection) -> int:
+    """رقم إصدار مخطط القاعدة الحالي"""
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+def migrate(connection) -> int:
+    """
+    تنفيذ الترقيات غير المنفذة بعد
+    Args:
+        connection: اتصال SQLAlchemy داخل معاملة (engine.begin())
+    Returns:
+        رقم الإصدار بعد الترقية
+    """
+    if connection.dialect.name != 'sqlite':
+        return 0
+
+    version = get_schema_version(connection)
+    for target, migration in MIGRATIONS:
+        if target <= version:
+            continue
+        # كل ترقية ورفع رقم إصدارها معاً: عند الخطأ يُلغى الاثنان ويظهر الخطأ
+        # (pysqlite لا يبدأ معاملة قبل أوامر DDL فتُفتح صراحة بنقطة حفظ)
+        connection.exec_driver_sql("SAVEPOINT schema_migration")
+        try:
+            migration(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {int(target)}")
+        except Exception:
+            connection.exec_driver_sql("ROLLBACK TO schema_migration")
+            connection.exec_driver_sql("RELEASE schema_migration")
+            raise
+        connection.exec_driver_sql("RELEASE schema_migration")
+        version = target
+    return version
+
+def is_up_to_date(db_path: str = DEFAULT_DB_PATH) -> bool:
+    """فحص سريع لإصدار المخطط عبر اتصال SQLite خام (دون SQLAlchemy)"""
+    if not os.path.exists(db_path):
+        return False
+    conn = get_connection(db_path, row_factory=None)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] >= LATEST_VERSION
+    finally:
+        conn.close()
+
+def ensure_database(db_path: str = DEFAULT_DB_PATH) -> bool:
+    """
+    تهيئة قاعدة البيانات عند أول تشغيل أو بعد إضافة ترقيات جديدة فقط
+    Returns:
+        True إذا نُفذت التهيئة، False إذا كانت القاعدة محدثة
+    """
+    if is_up_to_date(db_path):
+        return False
+    from .db_setup import init_db
+    init_db()
+    return True
@@ -1,9 +1,11 @@
-import sqlite3
 from contextlib import closing
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, Computed, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from .db_setup import Base  # Import Base from db_setup instead of creating a new one
+from .connection import get_connection
+from .search_keys import search_key_sql
+from .db_setup import (Base, setup_search_index, setup_inventory_stats,
+                       setup_daily_sales_summary)  # Import Base from db_setup instead of creating a new one
 
 class Part(Base):
     """نموذج قطع الغيار"""
@@ -16,13 +18,49 @@ class Part(Base):
     quantity = Column(Integer, default=0)
     cost_price = Column(Float, nullable=False)
     selling_price = Column(Float)
+    barcode = Column(String(64))
+    # مفتاح البحث الموحد للاسم (عمود مولد تحسبه SQLite عند كل كتابة)
+    name_key = Column(String(100), Computed(search_key_sql('name')))
     
     # العلاقة مع جدول المبيعات مع إضافة cascade
     sales = relationship("Sale", back_populates="part", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # بحث مباشر بالباركود عند المسح في شاشة البيع
+        Index('idx_parts_barcode', 'barcode', unique=True),
+        # بحث الأسماء القصيرة بالبادئة دون مسح الجدول
+        Index('idx_parts_name_key', 'name_key'),
+    )
+
     def __repr__(self):
         return f"<Part(name='{self.name}', part_number='{self.part_number}')>"
 
+# إنشاء فهرس البحث وملخص المخزون مع جدول القطع
+event.listen(
+    Part.__table__, 'after_create',
+    lambda target, connection, **kw: setup_search_index(connection)
+)
+event.listen(
+    Part.__table__, 'after_create',
+    lambda target, connection, **kw: setup_inventory_stats(connection)
+)
+
+
+class Invoice(Base):
+    """نموذج الفواتير (عملية بيع تضم عدة قطع)"""
+    __tablename__ = 'invoices'
+
+    id = Column(Integer, primary_key=True)
+    invoice_date = Column(DateTime, default=datetime.now)
+    total_amount = Column(Float, nullable=False, default=0)
+    total_profit = Column(Float, nullable=False, default=0)
+
+    # بنود الفاتورة
+    sales = relationship("Sale", back_populates="invoice")
+
+    def __repr__(self):
+        return f"<Invoice(id={self.id}, total_amount={self.total_amount}, date='{self.invoice_date}')>"
+
 
 class Sale(Base):
     """نموذج المبيعات"""
@@ -30,6 +68,9 @@ class Sale(Base):
 
     id = Column(Integer, primary_key=True)
     part_id = Column(Integer, ForeignKey('parts.id'), nullable=False)
+    invoice_id = Column(Integer, ForeignKey('invoices.id'))
+    # عملية البيع الأصلية لسطر المرتجع (كميته وربحه سالبان)
+    return_of_id = Column(Integer, ForeignKey('sales.id'))
     quantity = Column(Integer, nullable=False)
     selling_price = Column(Float, nullable=False)
     sale_date = Column(DateTime, default=datetime.now)
@@ -38,12 +79,29 @@ class Sale(Base):
     # العلاقة مع جدول القطع
     part = relationship("Part", back_populates="sales")
 
+    # الفاتورة التي يتبع لها البند (فارغة لعمليات البيع المفردة)
+    invoice = relationship("Invoice", back_populates="sales")
+
+    # فهارس التقارير (تضاف للقواعد الموجودة عبر database/migrations.py)
+    __table_args__ = (
+        Index('idx_sales_sale_date', 'sale_date'),
+        Index('idx_sales_part_id', 'part_id'),
+        Index('idx_sales_invoice_id', 'invoice_id'),
+        Index('idx_sales_return_of_id', 'return_of_id'),
+    )
+
     def __repr__(self):
         return f"<Sale(part_id={self.part_id}, quantity={self.quantity}, date='{self.sale_date}')>"
 
+# إنشاء الملخص اليومي للمبيعات مع جدول المبيعات
+event.listen(
+    Sale.__table__, 'after_create',
+    lambda target, connection, **kw: setup_daily_sales_summary(connection)
+)
+
 # Keep the existing SQLite functions below if needed
 def connect_db():
-    return sqlite3.connect('company.db')
+    return get_connection('company.db', row_factory=None)
 
 # Workers Table Functions
 def add_worker(name, phone, salary):
@@ -0,0 +1,58 @@
+from collections import namedtuple
+from .models import Part, Sale
+
+# أعمدة صف القطعة المضغوط المستخدم في جداول العرض (بنفس هذا الترتيب)
+PART_ROW_COLUMNS = (
+    Part.id,
+    Part.part_number,
+    Part.name,
+    Part.type,
+    Part.quantity,
+    Part.cost_price,
+    Part.selling_price,
+)
+
+# صف قطعة للعرض فقط: tuple بلا قاموس خصائص ولا حالة ORM (تعديل القطعة يتم عبر كائن Part)
+PartRow = namedtuple('PartRow', [column.key for column in PART_ROW_COLUMNS])
+
+# أعمدة صف تفاصيل المبيعات في التقارير والتصدير (بنفس هذا الترتيب)
+SALE_ROW_COLUMNS = (
+    Part.part_number,
+    Part.name,
+    Part.type,
+    Sale.quantity,
+    Sale.selling_price,
+    Sale.profit,
+    Sale.sale_date,
+)
+
+SaleRow = namedtuple('SaleRow', [
+    'part_number', 'name', 'type', 'quantity', 'selling_price', 'profit', 'sale_date'
+])
+
+def part_to_row(part):
+    """تحويل كائن قطعة إلى صف مضغوط (PartRow)"""
+    return PartRow(
+        part.id,
+        part.part_number,
+        part.name,
+        part.type,
+        part.quantity,
+        part.cost_price,
+        part.selling_price,
+    )
+
+def fetch_part_rows(session, after_id=0, limit=500):
+    """
+    جلب صفحة من صفوف القطع المضغوطة بترقيم المفتاح (keyset)
+    Args:
+        session: جلسة قاعدة البيانات
+        after_id: آخر معرف تم جلبه (0 للبداية)
+        limit: حجم الصفحة
+    Returns:
+        قائمة صفوف PartRow
+    """
+    rows = session.query(*PART_ROW_COLUMNS).filter(
+        Part.id > after_id
+    ).order_by(Part.id).limit(limit).all()
+    return [PartRow._make(row) for row in rows]
@@ -0,0 +1,244 @@
+"""
+قياس زمن الاستعلامات وعمليات الواجهة
+
+- محرك SQLAlchemy يُقاس عبر before/after_cursor_execute (instrument_engine)
+- اتصالات SQLite الخام تُقاس عبر TimedCursor في database/connection.py
+- عمليات الواجهة تُعلّم بـ timed_action فيُنسب إليها كل استعلام يُنفذ أثناءها
+
+كل استعلام أو عملية أبطأ من الحد المضبوط في config/timing_config.py يُسجل في
+سجل 'mahalli'، ويُحتفظ لكل استعلام بمدرج تكراري للأزمنة يمكن تفريغه بـ dump_timings().
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from config.timing_config import is_timing_enabled, get_slow_query_ms, get_slow_action_ms
+
+logger = logging.getLogger('mahalli')
+
+# حدود خانات المدرج التكراري بالميلي ثانية (الخانة الأخيرة لما يزيد عن 5 ثوانٍ)
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# أقصى طول لنص الاستعلام في المفاتيح والسجل
+MAX_STATEMENT_LENGTH = 300
+
+# عملية الواجهة الجارية في الخيط الحالي
+_current_action = contextvars.ContextVar('mahalli_action', default=None)
+
+
+class LatencyHistogram:
+    """مدرج تكراري لأزمنة عملية واحدة"""
+
+    __slots__ = ('buckets', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms):
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def percentile(self, fraction):
+        """الحد الأعلى للخانة التي تقع فيها النسبة المطلوبة (تقريبي)"""
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return 0.0
+
+    def to_dict(self):
+        labels = [f"<={bound}ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}ms"]
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': {label: count for label, count in zip(labels, self.buckets) if count},
+        }
+
+
+class TimingStats:
+    """مدرجات الأزمنة لكل استعلام ولكل عملية واجهة"""
+
+    def __init__(self):
+        self.enabled = is_timing_enabled()
+        self.slow_query_ms = get_slow_query_ms()
+        self.slow_action_ms = get_slow_action_ms()
+        self.queries = {}
+        self.actions = {}
+        self._lock = threading.Lock()
+
+    def record_query(self, statement, parameters, duration, executemany=False):
+        """تسجيل زمن تنفيذ استعلام (بالثواني)"""
+        if not self.enabled:
+            return
+        duration_ms = duration * 1000
+        key = normalize_statement(statement)
+        action = _current_action.get()
+        with self._lock:
+            histogram = self.queries.get(key)
+            if histogram is None:
+                histogram = self.queries[key] = LatencyHistogram()
+            histogram.add(duration_ms)
+
+        if duration_ms >= self.slow_query_ms:
+            logger.warning(
+                "Slow query %.1f ms (action=%s, params=%s): %s",
+                duration_ms, action or '-', parameters_shape(parameters, executemany), key
+            )
+
+    def record_action(self, name, duration):
+        """تسجيل زمن عملية واجهة (بالثواني)"""
+        if not self.enabled:
+            return
+        duration_ms = duration * 1000
+        with self._lock:
+            histogram = self.actions.get(name)
+            if histogram is None:
+                histogram = self.actions[name] = LatencyHistogram()
+            histogram.add(duration_ms)
+
+        if duration_ms >= self.slow_action_ms:
+            logger.warning("Slow action %.1f ms: %s", duration_ms, name)
+
+    def snapshot(self):
+        """نسخة من كل المدرجات مرتبة من الأبطأ إجمالاً"""
+        with self._lock:
+            queries = {key: histogram.to_dict() for key, histogram in self.queries.items()}
+            actions = {key: histogram.to_dict() for key, histogram in self.actions.items()}
+
+        def by_total(items):
+            return dict(sorted(items.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+        return {'queries': by_total(queries), 'actions': by_total(actions)}
+
+    def reset(self):
+        with self._lock:
+            self.queries.clear()
+            self.actions.clear()
+
+
+stats = TimingStats()
+
+
+def normalize_statement(statement):
+    """نص الاستعلام في سطر واحد (مفتاح المدرج)"""
+    return ' '.join(str(statement).split())[:MAX_STATEMENT_LENGTH]
+
+
+def parameters_shape(parameters, executemany=False):
+    """وصف شكل المعاملات دون قيمها (لا تُكتب البيانات في السجل)"""
+    if executemany:
+        try:
+            return f"{len(parameters)} rows"
+        except TypeError:
+            return "rows"
+    if not parameters:
+        return "none"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(sorted(str(key) for key in parameters)) + "}"
+    try:
+        return f"{len(parameters)} values"
+    except TypeError:
+        return type(parameters).__name__
+
+
+def current_action():
+    """اسم عملية الواجهة الجارية (أو None)"""
+    return _current_action.get()
+
+
+class timed_action:
+    """
+    تعليم عملية واجهة وقياس زمنها
+    يستخدم كمزخرف لدوال الواجهة أو داخل with
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append((_current_action.set(self.name), time.perf_counter()))
+        return self
+
+    def __exit__(self, *exc_info):
+        token, start = self._tokens.pop()
+        _current_action.reset(token)
+        stats.record_action(self.name, time.perf_counter() - start)
+        return False
+
+    def __call__(self, func):
+        # إشارات Qt قد تمرر معاملات إضافية (مثل checked)؛ تُمرر فقط ما تقبله الدالة
+        code = func.__code__
+        accepts_varargs = bool(code.co_flags & 0x04)
+        argcount = code.co_argcount
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not accepts_varargs:
+                args = args[:argcount]
+            with timed_action(self.name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def instrument_engine(engine):
+    """قياس كل استعلامات محرك SQLAlchemy"""
+    if not stats.enabled:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info['query_start'].pop()
+        stats.record_query(statement, parameters, time.perf_counter() - start, executemany)
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(exception_context):
+        # الاستعلام الفاشل لا يصل إلى after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('query_start'):
+            conn.info['query_start'].pop()
+
+
+def record_query(statement, parameters, duration, executemany=False):
+    stats.record_query(statement, parameters, duration, executemany)
+
+
+def dump_timings(path=None, extra=None):
+    """
+    تفريغ مدرجات الأزمنة الحالية
+    Args:
+        path: ملف JSON للكتابة فيه (اختياري)
+        extra: أقسام إضافية تُكتب مع المدرجات (مثل عدادات الذاكرة المؤقتة)
+    Returns:
+        المدرجات كقاموس
+    """
+    snapshot = stats.snapshot()
+    if extra:
+        snapshot.update(extra)
+    if path:
+        with open(path, 'w', encoding='utf-8') as timings_file:
+            json.dump(snapshot, timings_file, ensure_ascii=False, indent=2)
+    logger.info("Timing snapshot: %d queries, %d actions",
+                len(snapshot['queries']), len(snapshot['actions']))
+    return snapshot
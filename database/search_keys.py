@@ -0,0 +1,59 @@
+"""
+مفاتيح البحث الموحدة للأسماء العربية
+
+الاسم يُحفظ كما كتبه المستخدم، ومعه عمود name_key محسوب منه (عمود SQLite مولد
+ومفهرس) تتوحد فيه أشكال الحرف الواحد:
+- أ إ آ -> ا
+- ى -> ي
+- ة -> ه
+- حذف التطويل والتشكيل
+- أحرف لاتينية صغيرة
+
+نفس الجدول يُستخدم لتوحيد كلمة البحث في بايثون ولبناء تعبير SQL للعمود،
+فلا يختلف المفتاح المحفوظ عن مفتاح كلمة البحث. الوحدة لا تستورد SQLAlchemy
+حتى تستخدمها الواجهات التي تتصل بـ SQLite مباشرة.
+"""
+
+# (الحرف, بديله) بالترتيب
+ARABIC_FOLDS = (
+    ('أ', 'ا'),
+    ('إ', 'ا'),
+    ('آ', 'ا'),
+    ('ى', 'ي'),
+    ('ة', 'ه'),
+    ('ـ', ''),  # التطويل
+    # التشكيل: تنوين الفتح والضم والكسر، فتحة، ضمة، كسرة، شدة، سكون، ألف خنجرية
+    ('ً', ''), ('ٌ', ''), ('ٍ', ''), ('َ', ''),
+    ('ُ', ''), ('ِ', ''), ('ّ', ''), ('ْ', ''),
+    ('ٰ', ''),
+)
+
+# lower() في SQLite لا تغير إلا الأحرف اللاتينية
+ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+# أكبر حرف يونيكود: كل مفتاح يبدأ بالبادئة أصغر من البادئة متبوعة به
+PREFIX_END = '\U0010ffff'
+
+
+def normalize_search_key(text) -> str:
+    """مفتاح البحث للنص (نفس نتيجة search_key_sql داخل SQLite)"""
+    key = str(text or '')
+    for char, replacement in ARABIC_FOLDS:
+        key = key.replace(char, replacement)
+    return key.translate(ASCII_LOWER).strip(' ')
+
+
+def search_key_sql(column: str) -> str:
+    """تعبير SQL يحسب مفتاح البحث من العمود (للأعمدة المولدة)"""
+    expression = column
+    for char, replacement in ARABIC_FOLDS:
+        expression = f"replace({expression}, '{char}', '{replacement}')"
+    return f"trim(lower({expression}), ' ')"
+
+
+def prefix_bounds(key: str):
+    """
+    حدا المقارنة لمطابقة بادئة المفتاح عبر الفهرس
+    (name_key >= low AND name_key < high بدلاً من LIKE الذي لا يستخدم الفهرس)
+    """
+    return key, key + PREFIX_END
@@ -1,22 +1,24 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QPushButton, QLabel, QComboBox, QDateEdit, QMessageBox, QHeaderView,
-    QGroupBox, QSpinBox, QWidget, QFrame, QFormLayout, QLineEdit, QCompleter
+    QGroupBox, QSpinBox, QWidget, QFrame, QFormLayout, QLineEdit, QCompleter,
+    QListWidget, QListWidgetItem, QCheckBox, QDialogButtonBox
 )
 from PyQt5.QtCore import Qt, QDate, QStringListModel, QSize
 from PyQt5.QtGui import QFont, QIcon
 import sqlite3
 from datetime import datetime
 from app.reports import AttendanceReports
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-from PyQt5.QtGui import QTextDocument
-import calendar
-from .report_windows import DailyReportWindow, MonthlyReportWindow
+from app.attendance import AttendanceManager
+from database.connection import get_connection
+from database.query_timing import timed_action
+from database.search_keys import normalize_search_key
 
 class AttendanceUI(QDialog):
     def __init__(self):
         super().__init__()
         self.db_path = "database/workers.db"
+        self.attendance_manager = AttendanceManager(self.db_path)
         self.init_ui()
         self.setup_table_behavior()
         self.load_workers()
@@ -216,6 +218,7 @@ class AttendanceUI(QDialog):
         self.completer.setCompletionMode(QCompleter.PopupCompletion)
         self.completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.search_input.setCompleter(self.completer)
+        self.search_input.textChanged.connect(self.filter_workers)
         
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(search_label)
@@ -269,15 +272,19 @@ class AttendanceUI(QDialog):
         self.mark_leave_btn.setIcon(QIcon("icons/check-out.png"))
         self.edit_attendance_btn = QPushButton("تعديل الحضور")
         self.edit_attendance_btn.setIcon(QIcon("icons/edit.png"))
+        self.batch_attendance_btn = QPushButton("تسجيل جماعي")
+        self.batch_attendance_btn.setIcon(QIcon("icons/check-in.png"))
         self.refresh_btn = QPushButton("تحديث")
         self.refresh_btn.setIcon(QIcon("icons/refresh.png"))
 
         self.mark_attendance_btn.clicked.connect(self.mark_attendance)
         self.mark_leave_btn.clicked.connect(self.mark_leave)
         self.edit_attendance_btn.clicked.connect(self.edit_attendance)
+        self.batch_attendance_btn.clicked.connect(self.mark_attendance_batch)
         self.refresh_btn.clicked.connect(self.refresh_attendance)
 
         button_layout.addWidget(self.mark_attendance_btn)
+        button_layout.addWidget(self.batch_attendance_btn)
         button_layout.addWidget(self.mark_leave_btn)
         button_layout.addWidget(self.edit_attendance_btn)
         button_layout.addWidget(self.refresh_btn)
@@ -324,13 +331,12 @@ class AttendanceUI(QDialog):
 
     def get_db_connection(self):
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return get_connection(self.db_path)
         except sqlite3.Error as e:
             QMessageBox.critical(self, "خطأ", f"فشل الاتصال بقاعدة البيانات: {str(e)}")
             return None
 
+    @timed_action('attendance.load_workers')
     def load_workers(self):
         conn = self.get_db_connection()
         if not conn:
@@ -339,7 +345,7 @@ class AttendanceUI(QDialog):
         try:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT id, name, phone 
+                SELECT id, name, phone, name_key 
                 FROM workers 
                 WHERE status = 'نشط' 
                 ORDER BY name
@@ -358,7 +364,8 @@ class AttendanceUI(QDialog):
                 self.worker_combo.addItem(worker_name)
                 self.workers_data[worker_name] = {
                     'id': worker['id'],
-                    'phone': worker['phone']
+                    'phone': worker['phone'],
+                    'key': worker['name_key'] or ''
                 }
                 worker_names.append(worker_name)
             
@@ -374,6 +381,7 @@ class AttendanceUI(QDialog):
         except sqlite3.Error as e:
             QMessageBox.critical(self, "خطأ", f"خطأ في تحميل بيانات العمال: {str(e)}")
 
+    @timed_action('attendance.refresh_attendance')
     def refresh_attendance(self):
         """Refresh the attendance table with current day's data"""
         conn = self.get_db_connection()
@@ -474,6 +482,26 @@ class AttendanceUI(QDialog):
             if conn:
                 conn.rollback()
 
+    def mark_attendance_batch(self):
+        """تسجيل حالة واحدة لعدة عمال (أو لكل العمال النشطين) دفعة واحدة"""
+        dialog = BatchAttendanceDialog(
+            self.workers_data, self.status_combo.currentText(), self
+        )
+        if dialog.exec_() != QDialog.Accepted:
+            return
+
+        success, message = self.attendance_manager.mark_attendance_batch(
+            dialog.selected_worker_ids(),
+            self.date_edit.date().toPyDate(),
+            dialog.status_combo.currentText()
+        )
+        if not success:
+            QMessageBox.warning(self, "تنبيه", message)
+            return
+
+        self.refresh_attendance()
+        QMessageBox.information(self, "نجاح", message)
+
     def mark_leave(self):
         selected_items = self.attendance_table.selectedItems()
         if not selected_items:
@@ -505,10 +533,12 @@ class AttendanceUI(QDialog):
             QMessageBox.critical(self, "خطأ", f"خطأ في تسجيل الانصراف: {str(e)}")
 
     def show_daily_report(self):
+        from .report_windows import DailyReportWindow
         daily_report = DailyReportWindow()
         daily_report.exec_()
 
     def show_monthly_report(self):
+        from .report_windows import MonthlyReportWindow
         monthly_report = MonthlyReportWindow()
         monthly_report.exec_()
 
@@ -672,25 +702,16 @@ class AttendanceUI(QDialog):
 
     def filter_workers(self, text):
         """Filter workers in combo box based on search text"""
-        if not text:  # If search is empty, show all workers
-            self.worker_combo.clear()
-            self.worker_combo.addItem("-- اختر عامل --")
-            for worker_name in self.workers_data.keys():
-                self.worker_combo.addItem(worker_name)
-            return
+        # Normalize once and match the start of the keys stored in the workers table
+        # (same rule as the workers screen search)
+        search_key = normalize_search_key(text)
 
         self.worker_combo.clear()
-        search_text = text.lower()
-        
-        # Add matching workers
-        for worker_name in self.workers_data.keys():
-            if search_text in worker_name.lower():
+        # Keep the placeholder first so a match is never selected automatically
+        self.worker_combo.addItem("-- اختر عامل --")
+        for worker_name, worker in self.workers_data.items():
+            if worker['key'].startswith(search_key):
                 self.worker_combo.addItem(worker_name)
-        
-        # If we have exactly one match and it's complete, select it
-        if self.worker_combo.count() == 1 and \
-           self.worker_combo.itemText(0).lower().startswith(search_text):
-            self.worker_combo.setCurrentIndex(0)
 
     def setup_table_behavior(self):
         """Setup enhanced table behavior"""
@@ -721,3 +742,56 @@ class AttendanceUI(QDialog):
 
     def go_back_home(self):
         self.accept()  # This will close the dialog and return to main window
+
+
+class BatchAttendanceDialog(QDialog):
+    """اختيار مجموعة من العمال وحالة واحدة لتسجيلهم معاً"""
+
+    def __init__(self, workers_data, status, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("تسجيل جماعي")
+        self.setLayoutDirection(Qt.RightToLeft)
+        self.setMinimumSize(400, 500)
+
+        layout = QVBoxLayout(self)
+
+        form_layout = QFormLayout()
+        self.status_combo = QComboBox()
+        self.status_combo.addItems(["حاضر", "غائب", "متأخر", "إجازة"])
+        self.status_combo.setCurrentText(status)
+        form_layout.addRow("الحالة:", self.status_combo)
+        layout.addLayout(form_layout)
+
+        self.select_all = QCheckBox("كل العمال النشطين")
+        self.select_all.setChecked(True)
+        self.select_all.toggled.connect(self.set_all_checked)
+        layout.addWidget(self.select_all)
+
+        self.workers_list = QListWidget()
+        for worker_name, worker in workers_data.items():
+            item = QListWidgetItem(worker_name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            item.setData(Qt.UserRole, worker['id'])
+            self.workers_list.addItem(item)
+        layout.addWidget(self.workers_list)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Ok).setText("تسجيل")
+        buttons.button(QDialogButtonBox.Cancel).setText("إلغاء")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def set_all_checked(self, checked):
+        state = Qt.Checked if checked else Qt.Unchecked
+        for row in range(self.workers_list.count()):
+            self.workers_list.item(row).setCheckState(state)
+
+    def selected_worker_ids(self):
+        """أرقام العمال المحددين"""
+        return [
+            self.workers_list.item(row).data(Qt.UserRole)
+            for row in range(self.workers_list.count())
+            if self.workers_list.item(row).checkState() == Qt.Checked
+        ]
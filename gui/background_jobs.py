@@ -0,0 +1,221 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+import threading
+
+class JobCancelled(Exception):
+    """تم إلغاء المهمة أو تجاوزها طلب أحدث"""
+
+class JobSignals(QObject):
+    """إشارات المهمة (QRunnable لا يملك إشارات)، أول معامل فيها هو المهمة نفسها"""
+    progress = pyqtSignal(object, int)
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, str)
+    cancelled = pyqtSignal(object)
+
+class BackgroundTask(QRunnable):
+    """
+    مهمة قابلة للإلغاء تعمل في خيط منفصل بجلسة قاعدة بيانات خاصة بها
+    الأصناف الفرعية تنفذ execute(session) وتعيد نتيجتها
+    """
+
+    # الاستثناء الذي ترفعه check_cancelled
+    cancelled_error = JobCancelled
+
+    def __init__(self, owner):
+        super().__init__()
+        self.owner = owner
+        self.generation = None
+        self.signals = JobSignals()
+        self.cancel_event = threading.Event()
+        self.dbapi_connection = None
+
+    def execute(self, session):
+        raise NotImplementedError
+
+    def run(self):
+        # أُلغيت المهمة أو طُلبت مهمة أحدث قبل بدء التنفيذ
+        if self.is_cancelled():
+            self.owner.unregister_task(self)
+            self.signals.cancelled.emit(self)
+            return
+
+        session = self.owner.session_factory()
+        try:
+            fairy = session.connection().connection
+            self.dbapi_connection = getattr(fairy, 'dbapi_connection', None) or fairy.connection
+            result = self.execute(session)
+        except Exception as e:
+            # أي خطأ بعد الإلغاء (ومنه مقاطعة الاستعلام) يعني الإلغاء لا الفشل
+            if self.is_cancelled():
+                self.on_cancelled()
+                self.signals.cancelled.emit(self)
+            else:
+                self.on_failed(e)
+                self.signals.failed.emit(self, str(e))
+            return
+        finally:
+            self.owner.unregister_task(self)
+            self.dbapi_connection = None
+            session.close()
+
+        if self.is_cancelled():
+            self.signals.cancelled.emit(self)
+        else:
+            self.signals.finished.emit(self, result)
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set() or self.owner.is_stale(self.generation)
+
+    def check_cancelled(self):
+        """إيقاف التنفيذ بين الدفعات إذا أُلغيت المهمة"""
+        if self.is_cancelled():
+            raise self.cancelled_error()
+
+    def report_progress(self, done, total):
+        """إرسال نسبة التقدم بعد كل دفعة (ويتوقف التنفيذ هنا عند الإلغاء)"""
+        self.check_cancelled()
+        if total:
+            self.signals.progress.emit(self, min(100, done * 100 // total))
+
+    def on_cancelled(self):
+        """تنظيف بعد الإلغاء (مثل حذف ملف غير مكتمل)"""
+
+    def on_failed(self, error):
+        """تنظيف بعد الفشل"""
+
+    def cancel(self):
+        """إلغاء المهمة وإيقاف الاستعلام الجاري في SQLite"""
+        self.cancel_event.set()
+        try:
+            if self.dbapi_connection is not None:
+                self.dbapi_connection.interrupt()
+        except Exception:
+            pass
+
+class BackgroundJobs(QObject):
+    """
+    تشغيل المهام الخلفية من نوع واحد
+    - تأجيل اختياري (delay) يدمج الطلبات المتتالية فلا يُنفذ إلا آخرها
+    - الطلب الجديد يلغي المهام السابقة ويتجاهل نتائجها (supersede)
+    - نتائج المهام تصل للأصناف الفرعية عبر task_progress / task_finished /
+      task_failed / task_cancelled في خيط الواجهة
+    """
+
+    # هل يلغي الطلب الجديد المهام السابقة
+    supersede = True
+    # مدة انتظار المهام الجارية عند إغلاق النافذة (بالملي ثانية)
+    shutdown_timeout = 1000
+
+    def __init__(self, parent=None, session_factory=None, delay=None, max_threads=1):
+        super().__init__(parent)
+        self.session_factory = session_factory
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.running_tasks = set()
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+
+        self.timer = None
+        if delay is not None:
+            self.timer = QTimer(self)
+            self.timer.setSingleShot(True)
+            self.timer.setInterval(delay)
+            self.timer.timeout.connect(self.start_pending)
+
+    def schedule(self):
+        """تنفيذ الطلب المعلق بعد انتهاء مهلة الانتظار"""
+        self.timer.start()
+
+    def start_now(self):
+        """تنفيذ الطلب المعلق فوراً دون انتظار"""
+        if self.timer is not None:
+            self.timer.stop()
+        self.start_pending()
+
+    def start_pending(self):
+        task = self.create_task()
+        if task is not None:
+            self.start_task(task)
+
+    def create_task(self):
+        """مهمة الطلب المعلق (أو None إن لم يوجد طلب)"""
+        raise NotImplementedError
+
+    def start_task(self, task):
+        """تشغيل المهمة في الخلفية"""
+        with self.lock:
+            if self.supersede:
+                self.generation += 1
+            task.generation = self.generation
+            stale_tasks = list(self.running_tasks) if self.supersede else []
+            self.running_tasks.add(task)
+
+        for stale in stale_tasks:
+            stale.cancel()
+
+        task.signals.progress.connect(self.on_task_progress)
+        task.signals.finished.connect(self.on_task_finished)
+        task.signals.failed.connect(self.on_task_failed)
+        task.signals.cancelled.connect(self.on_task_cancelled)
+        self.pool.start(task)
+
+    # إشارات المهام التي تجاوزها طلب أحدث يتم تجاهلها
+    def on_task_progress(self, task, percent):
+        if not self.is_stale(task.generation):
+            self.task_progress(task, percent)
+
+    def on_task_finished(self, task, result):
+        if not self.is_stale(task.generation):
+            self.task_finished(task, result)
+
+    def on_task_failed(self, task, message):
+        if not self.is_stale(task.generation):
+            self.task_failed(task, message)
+
+    def on_task_cancelled(self, task):
+        if not self.is_stale(task.generation):
+            self.task_cancelled(task)
+
+    def task_progress(self, task, percent):
+        pass
+
+    def task_finished(self, task, result):
+        pass
+
+    def task_failed(self, task, message):
+        pass
+
+    def task_cancelled(self, task):
+        pass
+
+    def is_stale(self, generation):
+        with self.lock:
+            return generation != self.generation
+
+    def unregister_task(self, task):
+        with self.lock:
+            self.running_tasks.discard(task)
+
+    def is_running(self):
+        with self.lock:
+            return bool(self.running_tasks)
+
+    def cancel_running(self):
+        """إلغاء المهام الجارية أو المنتظرة (تصل إشارة الإلغاء لكل منها)"""
+        with self.lock:
+            tasks = list(self.running_tasks)
+        for task in tasks:
+            task.cancel()
+
+    def cancel(self):
+        """إلغاء أي طلب معلق أو جارٍ وتجاهل نتائجه"""
+        if self.timer is not None:
+            self.timer.stop()
+        with self.lock:
+            self.generation += 1
+        self.cancel_running()
+
+    def shutdown(self):
+        """إيقاف المهام عند إغلاق النافذة"""
+        self.cancel()
+        self.pool.waitForDone(self.shutdown_timeout)
@@ -0,0 +1,81 @@
+import os
+from PyQt5.QtCore import pyqtSignal
+from database.db_setup import Session
+from app.report_export import ReportExporter, ExportCancelled
+from .background_jobs import BackgroundJobs, BackgroundTask
+
+class ExportTask(BackgroundTask):
+    """تصدير تقرير إلى ملف في خيط منفصل بجلسة قاعدة بيانات خاصة به"""
+
+    cancelled_error = ExportCancelled
+
+    def __init__(self, file_format, path, start_date, end_date, title, owner):
+        super().__init__(owner)
+        self.file_format = file_format
+        self.path = path
+        self.start_date = start_date
+        self.end_date = end_date
+        self.title = title
+
+    def execute(self, session):
+        exporter = ReportExporter(session)
+        if self.file_format == 'xlsx':
+            written = exporter.export_xlsx(
+                self.path, self.start_date, self.end_date, self.title, self.report_progress
+            )
+        else:
+            written = exporter.export_csv(
+                self.path, self.start_date, self.end_date, self.report_progress
+            )
+        self.report_progress(1, 1)
+        return written
+
+    def on_cancelled(self):
+        self.remove_partial_file()
+
+    def on_failed(self, error):
+        self.remove_partial_file()
+
+    def remove_partial_file(self):
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError:
+            pass
+
+class ReportExport(BackgroundJobs):
+    """تشغيل تصدير التقارير في الخلفية مع إرسال نسبة التقدم"""
+    progress_changed = pyqtSignal(int)
+    export_finished = pyqtSignal(int)
+    export_failed = pyqtSignal(str)
+    export_cancelled = pyqtSignal()
+
+    shutdown_timeout = 5000
+
+    def __init__(self, parent=None, session_factory=None):
+        super().__init__(parent, session_factory or Session)
+
+    def start(self, file_format, path, start_date, end_date, title=""):
+        """
+        بدء تصدير الفترة [start_date, end_date)
+        Args:
+            file_format: 'csv' أو 'xlsx'
+        """
+        self.progress_changed.emit(0)
+        self.start_task(ExportTask(file_format, path, start_date, end_date, title, self))
+
+    def task_progress(self, task, percent):
+        self.progress_changed.emit(percent)
+
+    def task_finished(self, task, written):
+        self.export_finished.emit(written)
+
+    def task_failed(self, task, message):
+        self.export_failed.emit(message)
+
+    def task_cancelled(self, task):
+        self.export_cancelled.emit()
+
+    def cancel(self):
+        """إيقاف التصدير الجاري (يُحذف الملف غير المكتمل وتصل export_cancelled)"""
+        self.cancel_running()
@@ -1,19 +1,28 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                           QLineEdit, QPushButton, QTableWidget, 
-                           QTableWidgetItem, QMessageBox, QComboBox,
+                           QLineEdit, QPushButton, QTableView,
+                           QMessageBox, QComboBox,
                            QFrame, QHeaderView, QSpacerItem, QSizePolicy,
-                           QDialog, QFormLayout)
+                           QDialog, QFormLayout, QFileDialog, QApplication)
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont, QIcon
 from database.models import Part
-from database.db_setup import Session
+from database.db_setup import Session, session_scope
+from database.queries import PART_ROW_COLUMNS, PartRow
+from app.inventory_stats import InventoryStats
+from app.part_import import PartImporter
+from app.part_cache import part_cache
+from app.barcode_index import invalidate_codes
+from database.query_timing import timed_action
+from .search_worker import DebouncedSearch
+from .parts_table_model import (PartsTableModel, PART_NUMBER, NAME, TYPE,
+                                QUANTITY, COST_PRICE, SELLING_PRICE)
 from datetime import datetime
-from sqlalchemy import func
 
 class AddPartDialog(QDialog):
-    def __init__(self, parent=None, part=None):
+    def __init__(self, parent=None, part=None, barcode=None):
         super().__init__(parent)
         self.part = part
+        self.part_barcode = barcode
         self.init_ui()
         if part:
             self.setWindowTitle("تعديل بيانات القطعة")
@@ -35,6 +44,7 @@ class AddPartDialog(QDialog):
         self.quantity = QLineEdit()
         self.cost_price = QLineEdit()
         self.selling_price = QLineEdit()
+        self.barcode = QLineEdit()
         
         # إضافة التلميحات
         self.part_number.setPlaceholderText("مثال: P12345")
@@ -42,6 +52,7 @@ class AddPartDialog(QDialog):
         self.quantity.setPlaceholderText("الكمية المتوفرة")
         self.cost_price.setPlaceholderText("سعر الشراء")
         self.selling_price.setPlaceholderText("سعر البيع")
+        self.barcode.setPlaceholderText("اختياري - امسح باركود القطعة")
         
         # تعطيل تعديل رقم القطعة في حالة التعديل
         if self.part:
@@ -54,6 +65,7 @@ class AddPartDialog(QDialog):
         layout.addRow("الكمية:", self.quantity)
         layout.addRow("سعر التكلفة:", self.cost_price)
         layout.addRow("سعر البيع:", self.selling_price)
+        layout.addRow("الباركود:", self.barcode)
         
         # أزرار الحفظ والإلغاء
         btn_layout = QHBoxLayout()
@@ -77,6 +89,7 @@ class AddPartDialog(QDialog):
         self.quantity.setText(str(self.part.quantity))
         self.cost_price.setText(str(self.part.cost_price))
         self.selling_price.setText(str(self.part.selling_price))
+        self.barcode.setText(self.part_barcode or "")
 
     def validate_and_accept(self):
         """التحقق من صحة البيانات قبل الحفظ"""
@@ -107,7 +120,8 @@ class AddPartDialog(QDialog):
 class InventoryUI(QWidget):
     def __init__(self):
         super().__init__()
-        self.session = Session()
+        # كل عملية تفتح جلسة قصيرة خاصة بها (انظر session_scope)
+        self.session_factory = Session
         self.init_ui()
         self.load_parts()
         self.setStyleSheet("""
@@ -160,22 +174,28 @@ class InventoryUI(QWidget):
             QPushButton#refreshButton:hover {
                 background-color: #f39c12;
             }
+            QPushButton#importButton {
+                background-color: #9b59b6;
+            }
+            QPushButton#importButton:hover {
+                background-color: #8e44ad;
+            }
             QPushButton#backButton {
                 background-color: #95a5a6;
             }
             QPushButton#backButton:hover {
                 background-color: #7f8c8d;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 1px solid #bdc3c7;
                 border-radius: 5px;
                 gridline-color: #ecf0f1;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
@@ -231,6 +251,10 @@ class InventoryUI(QWidget):
         search_label.setPixmap(QIcon("icons/search.png").pixmap(20, 20))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("ابحث عن قطعة...")
+
+        # البحث المؤجل في الخلفية حتى لا تتجمد الواجهة أثناء الكتابة
+        self.part_search = DebouncedSearch(self)
+        self.part_search.results_ready.connect(self.update_table)
         self.search_input.textChanged.connect(self.search_parts)
         
         search_layout.addWidget(search_label)
@@ -256,8 +280,14 @@ class InventoryUI(QWidget):
         delete_button.setIcon(QIcon("icons/delete.png"))
         delete_button.clicked.connect(self.delete_part)
 
+        import_button = QPushButton("استيراد قطع")
+        import_button.setObjectName("importButton")
+        import_button.setIcon(QIcon("icons/import.png"))
+        import_button.clicked.connect(self.import_parts)
+
         button_layout.addWidget(refresh_button)
         button_layout.addWidget(add_button)
+        button_layout.addWidget(import_button)
         button_layout.addWidget(delete_button)
 
         # إضافة كل شيء إلى شريط الأدوات
@@ -302,18 +332,27 @@ class InventoryUI(QWidget):
         stats_layout.addLayout(low_stock)
         stats_layout.addLayout(total_value)
 
-        # جدول القطع
-        self.parts_table = QTableWidget()
-        self.parts_table.setColumnCount(7)
-        headers = ["رقم القطعة", "الاسم", "النوع", "الكمية", "سعر التكلفة", "سعر البيع", "آخر تحديث"]
-        self.parts_table.setHorizontalHeaderLabels(headers)
+        # جدول القطع (نموذج افتراضي يجلب الصفوف على صفحات)
+        self.parts_model = PartsTableModel([
+            ("رقم القطعة", lambda row: row[PART_NUMBER]),
+            ("الاسم", lambda row: row[NAME]),
+            ("النوع", lambda row: row[TYPE] or ""),
+            ("الكمية", lambda row: str(row[QUANTITY])),
+            ("سعر التكلفة", lambda row: str(row[COST_PRICE])),
+            ("سعر البيع", lambda row: str(row[SELLING_PRICE])),
+            ("آخر تحديث", lambda row: datetime.now().strftime("%Y-%m-%d")),
+        ], self)
+        self.parts_table = QTableView()
+        self.parts_table.setModel(self.parts_model)
         self.parts_table.setLayoutDirection(Qt.RightToLeft)
         
         # تنسيق الجدول
         self.parts_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.parts_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.parts_table.setSelectionBehavior(QTableView.SelectRows)
         self.parts_table.setAlternatingRowColors(True)
         self.parts_table.verticalHeader().setVisible(False)
-        self.parts_table.itemDoubleClicked.connect(self.edit_part)
+        self.parts_table.doubleClicked.connect(self.edit_part)
 
         # إضافة كل شيء إلى التخطيط الرئيسي
         main_layout.addWidget(tool_frame)
@@ -325,12 +364,11 @@ class InventoryUI(QWidget):
     def update_stats(self):
         """تحديث الإحصائيات"""
         try:
-            # إجمالي أنواع القطع (عدد القطع المختلفة)
-            unique_parts = self.session.query(Part).count()
-            
-            # إجمالي الكمية (مجموع كميات جميع القطع)
-            total_quantity = self.session.query(func.sum(Part.quantity)).scalar() or 0
-            
+            # قراءة صف الملخص الذي تحدثه مشغلات قاعدة البيانات
+            with session_scope(self.session_factory) as session:
+                stats = InventoryStats(session).get_stats()
+            unique_parts = stats['part_count']
+            total_quantity = stats['total_quantity']
             
             # تنسيق العرض بشكل أوضح
             if unique_parts == 0:
@@ -341,134 +379,172 @@ class InventoryUI(QWidget):
                 self.total_parts_value.setText(f" نوع - {total_quantity} قطعة")
                 
                 # القطع منخفضة المخزون
-                low_stock = self.session.query(Part).filter(Part.quantity <= 5).count()
+                low_stock = stats['low_stock_count']
                 self.low_stock_value.setText(str(low_stock) if low_stock > 0 else "لا يوجد")
 
             # القيمة الإجمالية
-            total_value = sum(part.cost_price * part.quantity 
-                            for part in self.session.query(Part).all())
+            total_value = stats['total_value']
             self.total_value_amount.setText(f"{total_value:,.2f} دينار")
 
         except Exception as e:
             self.show_message("خطأ", f"حدث خطأ أثناء تحديث الإحصائيات: {str(e)}", QMessageBox.Critical)
 
+    @timed_action('inventory.load_parts')
     def load_parts(self):
         """تحميل جميع القطع من قاعدة البيانات"""
-        parts = self.session.query(Part).all()
-        self.update_table(parts)
+        self.parts_model.load_from_factory(self.session_factory)
         self.update_stats()
 
     def refresh_inventory(self):
         """تحديث عرض المخزون"""
         try:
-            self.session.expire_all()
             self.load_parts()
             self.show_message("نجاح", "تم تحديث المخزون بنجاح", QMessageBox.Information)
         except Exception as e:
             self.show_message("خطأ", f"حدث خطأ أثناء تحديث المخزون: {str(e)}", QMessageBox.Critical)
 
-    def update_table(self, parts):
-        """تحديث جدول القطع"""
-        self.parts_table.setRowCount(len(parts))
-        for row, part in enumerate(parts):
-            items = [
-                part.part_number,
-                part.name,
-                part.type,
-                str(part.quantity),
-                str(part.cost_price),
-                str(part.selling_price),
-                datetime.now().strftime("%Y-%m-%d")
-            ]
-            for col, item in enumerate(items):
-                table_item = QTableWidgetItem(item)
-                table_item.setTextAlignment(Qt.AlignCenter)
-                self.parts_table.setItem(row, col, table_item)
+    def update_table(self, rows):
+        """تحديث جدول القطع بصفوف نتائج البحث"""
+        self.parts_model.set_rows(rows)
 
+    @timed_action('inventory.search_parts')
     def search_parts(self):
         """البحث عن القطع"""
         search_text = self.search_input.text().strip()
         if search_text:
-            parts = self.session.query(Part).filter(
-                (Part.name.ilike(f'%{search_text}%')) |
-                (Part.part_number.ilike(f'%{search_text}%'))
-            ).all()
+            self.part_search.request(search_text)
         else:
-            parts = self.session.query(Part).all()
-        self.update_table(parts)
+            # عرض كامل المخزون على صفحات بدلاً من تحميل كل القطع دفعة واحدة
+            self.part_search.cancel()
+            self.parts_model.load_from_factory(self.session_factory)
 
     def add_part(self):
         """إضافة قطعة جديدة"""
         dialog = AddPartDialog(self)
         if dialog.exec_() == QDialog.Accepted:
             try:
-                # التحقق من عدم وجود رقم القطعة مسبقاً
-                existing_part = self.session.query(Part).filter_by(
-                    part_number=dialog.part_number.text()
-                ).first()
-                
-                if existing_part:
-                    self.show_message("خأ", "رقم القطعة موجود مسبقاً", QMessageBox.Warning)
-                    return
-
-                new_part = Part(
-                    part_number=dialog.part_number.text(),
-                    name=dialog.name.text(),
-                    type=dialog.type.currentText(),
-                    quantity=int(dialog.quantity.text()),
-                    cost_price=float(dialog.cost_price.text()),
-                    selling_price=float(dialog.selling_price.text())
-                )
-                self.session.add(new_part)
-                self.session.commit()
+                with session_scope(self.session_factory) as session:
+                    # التحقق من عدم وجود رقم القطعة مسبقاً
+                    existing_part = session.query(Part).filter_by(
+                        part_number=dialog.part_number.text()
+                    ).first()
+
+                    if existing_part:
+                        self.show_message("خأ", "رقم القطعة موجود مسبقاً", QMessageBox.Warning)
+                        return
+
+                    session.add(Part(
+                        part_number=dialog.part_number.text(),
+                        name=dialog.name.text(),
+                        type=dialog.type.currentText(),
+                        quantity=int(dialog.quantity.text()),
+                        cost_price=float(dialog.cost_price.text()),
+                        selling_price=float(dialog.selling_price.text()),
+                        barcode=dialog.barcode.text().strip() or None
+                    ))
+                part_cache.invalidate(session, dialog.part_number.text())
+                invalidate_codes()
                 self.load_parts()
                 self.show_message("نجاح", "تمت إضافة القطعة بنجاح", QMessageBox.Information)
             except Exception as e:
-                self.session.rollback()
                 self.show_message("خطأ", f"حدث خطأ أثناء إضافة القطعة: {str(e)}", QMessageBox.Critical)
 
-    def edit_part(self, item):
-        """تعديل بيانات قطعة"""
-        row = item.row()
-        part_number = self.parts_table.item(row, 0).text()
-        part = self.session.query(Part).filter_by(part_number=part_number).first()
-        
-        if not part:
+    def import_parts(self):
+        """استيراد القطع بالجملة من ملف مورد (CSV أو Excel)"""
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "استيراد قطع", "", "Parts Files (*.csv *.xlsx)"
+        )
+        if not filename:
             return
-            
-        dialog = AddPartDialog(self, part)
-        
-        if dialog.exec_() == QDialog.Accepted:
-            try:
-                # تحديث بيانات القطعة
-                part.name = dialog.name.text()
-                part.type = dialog.type.currentText()
-                part.quantity = int(dialog.quantity.text())
-                part.cost_price = float(dialog.cost_price.text())
-                part.selling_price = float(dialog.selling_price.text())
-                
-                self.session.commit()
-                self.load_parts()
-                self.show_message("نجاح", "تم تحديث بيانات القطعة بنجاح", QMessageBox.Information)
-            except Exception as e:
-                self.session.rollback()
-                self.show_message("خطأ", f"حدث خطأ أثناء تحديث البيانات: {str(e)}", QMessageBox.Critical)
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            with session_scope(self.session_factory) as session:
+                result = PartImporter(session).import_file(filename)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            self.show_message("خطأ", f"حدث خطأ أثناء استيراد الملف: {str(e)}", QMessageBox.Critical)
+            return
+        QApplication.restoreOverrideCursor()
+
+        if result['imported']:
+            invalidate_codes()
+        self.load_parts()
+
+        rejected = result['rejected']
+        message = f"تم استيراد {result['imported']} قطعة"
+        if rejected:
+            message += f"\nتم رفض {len(rejected)} سطر:\n"
+            message += "\n".join(
+                f"السطر {line} ({part_number}): {error}"
+                for line, part_number, error in rejected[:10]
+            )
+            if len(rejected) > 10:
+                message += "\n..."
+        self.show_message(
+            "نتيجة الاستيراد", message,
+            QMessageBox.Warning if rejected else QMessageBox.Information
+        )
+
+    def edit_part(self, index):
+        """تعديل بيانات قطعة"""
+        part_number = self.parts_model.part_number_at(index.row())
+        try:
+            # قراءة القطعة في جلسة قصيرة تُغلق قبل فتح النافذة
+            with session_scope(self.session_factory) as session:
+                found = session.query(*PART_ROW_COLUMNS, Part.barcode).filter_by(
+                    part_number=part_number).first()
+            if not found:
+                return
+            part, barcode = PartRow._make(found[:-1]), found[-1]
+
+            dialog = AddPartDialog(self, part, barcode)
+            if dialog.exec_() != QDialog.Accepted:
+                return
+
+            # تطبيق التعديل في جلسة جديدة
+            with session_scope(self.session_factory) as session:
+                current = session.query(Part).filter_by(part_number=part_number).first()
+                if not current:
+                    raise ValueError("القطعة لم تعد موجودة")
+
+                current.name = dialog.name.text()
+                current.type = dialog.type.currentText()
+                current.cost_price = float(dialog.cost_price.text())
+                current.selling_price = float(dialog.selling_price.text())
+                current.barcode = dialog.barcode.text().strip() or None
+
+                # الكمية تتغير بمقدار ما عدله المستخدم فقط، فلا تضيع المبيعات
+                # التي سُجلت أثناء فتح النافذة
+                quantity_change = int(dialog.quantity.text()) - part.quantity
+                if quantity_change:
+                    current.quantity = Part.quantity + quantity_change
+                    session.flush()
+                    if current.quantity < 0:
+                        raise ValueError("الكمية يجب أن تكون أكبر من أو تساوي صفر")
+            part_cache.invalidate(session, part_number)
+            invalidate_codes()
+            self.load_parts()
+            self.show_message("نجاح", "تم تحديث بيانات القطعة بنجاح", QMessageBox.Information)
+        except Exception as e:
+            self.show_message("خطأ", f"حدث خطأ أثناء تحديث البيانات: {str(e)}", QMessageBox.Critical)
 
     def delete_part(self):
         """حذف قطعة"""
-        current_row = self.parts_table.currentRow()
+        current_row = self.parts_table.currentIndex().row()
         if current_row < 0:
             self.show_message("تنبيه", "الرجاء اختيار قطعة للحذف", QMessageBox.Warning)
             return
             
-        part_number = self.parts_table.item(current_row, 0).text()
-        part = self.session.query(Part).filter_by(part_number=part_number).first()
-        
-        if not part:
-            return
+        part_number = self.parts_model.part_number_at(current_row)
+        with session_scope(self.session_factory) as session:
+            part = session.query(Part).filter_by(part_number=part_number).first()
+            if not part:
+                return
+            has_sales = bool(part.sales)
 
         # Check if part has any sales records
-        if part.sales:
+        if has_sales:
             self.show_message(
                 "تعذر الحذف",
                 "لا يمكن حذف هذه القطعة لأنها مرتبطة بسجلات مبيعات. "
@@ -487,12 +563,13 @@ class InventoryUI(QWidget):
         
         if reply == QMessageBox.Yes:
             try:
-                self.session.delete(part)
-                self.session.commit()
+                with session_scope(self.session_factory) as session:
+                    session.delete(session.query(Part).filter_by(part_number=part_number).one())
+                part_cache.invalidate(session, part_number)
+                invalidate_codes()
                 self.load_parts()
                 self.show_message("نجاح", "تم حذف القطعة بنجاح", QMessageBox.Information)
             except Exception as e:
-                self.session.rollback()
                 self.show_message(
                     "خطأ",
                     "لا يمكن حذف هذه القطعة لأنها مرتبطة بسجلات أخرى",
@@ -508,7 +585,7 @@ class InventoryUI(QWidget):
         msg.exec_()
 
     def closeEvent(self, event):
-        """إغلاق جلسة قاعدة البيانات عند إغلاق النافذة"""
-        self.session.close()
+        """إيقاف خيط البحث عند إغلاق النافذة"""
+        self.part_search.shutdown()
         super().closeEvent(event)
  
\ No newline at end of file
@@ -7,6 +7,7 @@ from PyQt5.QtGui import QFont, QIcon
 import sqlite3
 from datetime import datetime
 import hashlib
+from database.connection import get_connection
 
 class LoginUI(QDialog):
     def __init__(self):
@@ -114,7 +115,7 @@ class LoginUI(QDialog):
             return
 
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path, row_factory=None)
             cursor = conn.cursor()
             
             # Hash the password
@@ -145,7 +146,7 @@ class LoginUI(QDialog):
     def ensure_database(self):
         """Ensure database and tables exist"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path, row_factory=None)
             cursor = conn.cursor()
             
             # Create users table if it doesn't exist
@@ -268,7 +269,7 @@ class RegisterUI(QDialog):
             return
 
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path, row_factory=None)
             cursor = conn.cursor()
             
             # Check if username exists
@@ -1,11 +1,10 @@
-from PyQt5.QtWidgets import QMainWindow, QPushButton, QVBoxLayout, QWidget, QMessageBox, QHBoxLayout
+from PyQt5.QtWidgets import (QMainWindow, QPushButton, QVBoxLayout, QWidget, QMessageBox, QHBoxLayout,
+                             QShortcut)
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon
-from .workers_ui import WorkerManagementUI
-from .attendance_ui import AttendanceUI
-from .sales_ui import SalesUI
-from .inventory_ui import InventoryUI
-from .reporting_ui import ReportingUI
+from PyQt5.QtGui import QIcon, QKeySequence
+import os
+from datetime import datetime
+from database.query_timing import timed_action, dump_timings
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -104,6 +103,7 @@ class MainWindow(QMainWindow):
 
         main_layout.addLayout(buttons_layout)
 
+        # النوافذ تُنشأ (وتُستورد وحداتها) عند أول فتح فقط
         # Store window references
         self.inventory_window = None
         self.sales_window = None
@@ -111,24 +111,33 @@ class MainWindow(QMainWindow):
         self.worker_management_ui = None
         self.attendance_ui = None
 
+        # حفظ أزمنة الاستعلامات والعمليات عند الطلب
+        QShortcut(QKeySequence("Ctrl+Shift+T"), self, activated=self.save_timings)
+
+    @timed_action('main.open_inventory')
     def open_inventory_management(self):
         """فتح نافذة إدارة المخزون"""
         if not self.inventory_window:
+            from .inventory_ui import InventoryUI
             self.inventory_window = InventoryUI()
         self.inventory_window.show()
 
+    @timed_action('main.open_sales')
     def open_sales_management(self):
         """فتح نافذة إدارة المبيعات"""
         if not self.sales_window:
+            from .sales_ui import SalesUI
             self.sales_window = SalesUI()
             # Connect to reports window if it exists
             if self.reports_window:
                 self.sales_window.sale_completed.connect(self.reports_window.refresh_report)
         self.sales_window.show()
 
+    @timed_action('main.open_reports')
     def open_reports(self):
         """فتح نافذة التقارير"""
         if not self.reports_window:
+            from .reporting_ui import ReportingUI
             self.reports_window = ReportingUI()
             # Connect to sales window if it exists
             if self.sales_window:
@@ -136,13 +145,26 @@ class MainWindow(QMainWindow):
         self.reports_window.show()
 
     def open_worker_management(self):
+        from .workers_ui import WorkerManagementUI
         self.worker_management_ui = WorkerManagementUI()
         self.worker_management_ui.exec_()
 
     def open_attendance_management(self):
+        from .attendance_ui import AttendanceUI
         self.attendance_ui = AttendanceUI()
         self.attendance_ui.exec_()
 
+    def save_timings(self):
+        """حفظ مدرجات أزمنة الاستعلامات وعمليات الواجهة وعدادات ذاكرة القطع في مجلد السجلات"""
+        try:
+            os.makedirs('logs', exist_ok=True)
+            path = os.path.join('logs', f"timings-{datetime.now():%Y%m%d-%H%M%S}.json")
+            from app.part_cache import part_cache
+            dump_timings(path, extra={'part_cache': part_cache.stats()})
+            QMessageBox.information(self, "قياس الأداء", f"تم حفظ أزمنة الاستعلامات في:\n{path}")
+        except OSError as e:
+            QMessageBox.critical(self, "خطأ", f"تعذر حفظ ملف الأزمنة: {str(e)}")
+
     def logout(self):
         reply = QMessageBox.question(
             self, 
@@ -0,0 +1,120 @@
+from itertools import islice
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from database.db_setup import session_scope
+from database.queries import part_to_row, fetch_part_rows
+
+# مواقع الحقول داخل صف القطعة المضغوط (انظر database.queries.PART_ROW_COLUMNS)
+ID, PART_NUMBER, NAME, TYPE, QUANTITY, COST_PRICE, SELLING_PRICE = range(7)
+
+PAGE_SIZE = 500
+
+class PartsTableModel(QAbstractTableModel):
+    """
+    نموذج جدول القطع الافتراضي
+    يحتفظ بالصفوف كـ tuples مضغوطة ولا ينسق النص إلا للخلايا الظاهرة،
+    ويجلب البيانات على صفحات عند التمرير (fetchMore)
+    """
+
+    def __init__(self, columns, parent=None, page_size=PAGE_SIZE):
+        """
+        Args:
+            columns: قائمة (عنوان العمود, دالة تنسيق تأخذ الصف وتعيد النص)
+            page_size: عدد الصفوف في كل صفحة
+        """
+        super().__init__(parent)
+        self.columns = columns
+        self.page_size = page_size
+        self.rows = []
+        self.fetch_page = None
+        self.exhausted = True
+
+    def load(self, fetch_page):
+        """
+        إعادة تحميل النموذج من مصدر صفحات
+        Args:
+            fetch_page: دالة (آخر صف, حجم الصفحة) تعيد الصفحة التالية
+        """
+        self.beginResetModel()
+        self.rows = []
+        self.fetch_page = fetch_page
+        self.exhausted = False
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def load_from_session(self, session):
+        """تحميل كل القطع من قاعدة البيانات على صفحات"""
+        self.load(lambda last_row, limit: fetch_part_rows(
+            session, last_row[ID] if last_row else 0, limit
+        ))
+
+    def load_from_factory(self, session_factory=None):
+        """
+        تحميل كل القطع على صفحات، كل صفحة بجلسة قصيرة خاصة بها
+        (للنوافذ التي تبقى مفتوحة طوال الوردية)
+        """
+        def fetch_page(last_row, limit):
+            with session_scope(session_factory) as session:
+                return fetch_part_rows(session, last_row[ID] if last_row else 0, limit)
+        self.load(fetch_page)
+
+    def set_rows(self, rows):
+        """تحميل قائمة صفوف جاهزة (تعرض على صفحات أيضاً)"""
+        iterator = iter(rows)
+        self.load(lambda last_row, limit: list(islice(iterator, limit)))
+
+    def set_parts(self, parts):
+        """تحميل قائمة كائنات قطع (نتائج البحث) بعد تحويلها لصفوف مضغوطة"""
+        self.set_rows([part_to_row(part) for part in parts])
+
+    def row_at(self, row):
+        """الصف المضغوط في موقع معين أو None"""
+        if 0 <= row < len(self.rows):
+            return self.rows[row]
+        return None
+
+    def part_number_at(self, row):
+        """رقم القطعة في الصف المحدد أو None"""
+        data = self.row_at(row)
+        return data[PART_NUMBER] if data else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+
+        if role == Qt.DisplayRole:
+            _, formatter = self.columns[index.column()]
+            return formatter(self.rows[index.row()])
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return QVariant()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+
+        last_row = self.rows[-1] if self.rows else None
+        page = self.fetch_page(last_row, self.page_size)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if not page:
+            return
+
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
@@ -4,13 +4,20 @@ from PyQt5.QtWidgets import (
     QGroupBox, QSpinBox
 )
 from PyQt5.QtCore import Qt, QDate, QSize
-from PyQt5.QtGui import QFont, QIcon
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
+from PyQt5.QtGui import QFont, QIcon, QColor
 from PyQt5.QtGui import QTextDocument
-from app.reports import AttendanceReports
+from app.reports import AttendanceReports, STATUS_CODES, NO_RECORD
 import calendar
 from datetime import datetime
 
+# عرض حالات الحضور في جدول الشهر: (الرمز المختصر, لون الخلفية)
+STATUS_CELLS = {
+    STATUS_CODES['حاضر']: ("ح", "#d5f5e3"),
+    STATUS_CODES['غائب']: ("غ", "#fadbd8"),
+    STATUS_CODES['متأخر']: ("ت", "#fdebd0"),
+    STATUS_CODES['إجازة']: ("إ", "#d6eaf8"),
+}
+
 class DailyReportWindow(QDialog):
     def __init__(self):
         super().__init__()
@@ -221,6 +228,8 @@ class DailyReportWindow(QDialog):
             QMessageBox.warning(self, "تنبيه", "لا يوجد بيانات للطباعة")
             return
 
+        # وحدة الطباعة تُحمّل عند أول طباعة فقط
+        from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
         printer = QPrinter(QPrinter.HighResolution)
         dialog = QPrintDialog(printer, self)
         if dialog.exec_() == QPrintDialog.Accepted:
@@ -433,6 +442,17 @@ class MonthlyReportWindow(QDialog):
         self.report_table.setAlternatingRowColors(True)
         layout.addWidget(self.report_table)
 
+        # Calendar grid (worker × day)
+        matrix_title = QLabel("جدول الحضور اليومي")
+        layout.addWidget(matrix_title)
+
+        self.matrix_table = QTableWidget()
+        self.matrix_table.setLayoutDirection(Qt.RightToLeft)
+        self.matrix_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.matrix_table.horizontalHeader().setMinimumSectionSize(28)
+        self.matrix_table.verticalHeader().setDefaultSectionSize(32)
+        layout.addWidget(self.matrix_table)
+
         # Print Button
         button_layout = QHBoxLayout()
         self.print_btn = QPushButton("طباعة التقرير")
@@ -459,9 +479,34 @@ class MonthlyReportWindow(QDialog):
         # Set alternating row colors
         self.report_table.setAlternatingRowColors(True)
 
+    def render_attendance_matrix(self, year, month):
+        """عرض مصفوفة الحضور (عامل × يوم) كجدول تقويم ملون"""
+        matrix = self.reports.generate_attendance_matrix(year, month)
+        if matrix is None:
+            return
+
+        workers, days = matrix.shape
+        self.matrix_table.clear()
+        self.matrix_table.setRowCount(workers)
+        self.matrix_table.setColumnCount(days)
+        self.matrix_table.setHorizontalHeaderLabels([str(day) for day in range(1, days + 1)])
+        self.matrix_table.setVerticalHeaderLabels(matrix.names)
+        self.matrix_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+        for row in range(workers):
+            for day, code in enumerate(matrix.row(row), start=1):
+                if code == NO_RECORD:
+                    continue
+                text, color = STATUS_CELLS[code]
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignCenter)
+                item.setBackground(QColor(color))
+                self.matrix_table.setItem(row, day - 1, item)
+
     def generate_report(self):
         year = self.year_spin.value()
         month = self.month_combo.currentIndex() + 1
+        self.render_attendance_matrix(year, month)
         report_data = self.reports.generate_monthly_report(year, month)
         
         if report_data:
@@ -493,6 +538,8 @@ class MonthlyReportWindow(QDialog):
             QMessageBox.warning(self, "تنبيه", "لا يوجد بيانات للطباعة")
             return
 
+        # وحدة الطباعة تُحمّل عند أول طباعة فقط
+        from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
         printer = QPrinter(QPrinter.HighResolution)
         dialog = QPrintDialog(printer, self)
         if dialog.exec_() == QPrintDialog.Accepted:
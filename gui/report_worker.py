@@ -0,0 +1,90 @@
+from PyQt5.QtCore import pyqtSignal
+from database.db_setup import Session
+from app.sales_reports import SalesReports
+from .background_jobs import BackgroundJobs, BackgroundTask
+
+class ReportTask(BackgroundTask):
+    """بناء تقرير المبيعات في خيط منفصل بجلسة قاعدة بيانات خاصة به"""
+
+    def __init__(self, start_date, end_date, batch_size, owner):
+        super().__init__(owner)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.batch_size = batch_size
+
+    def execute(self, session):
+        """قراءة الإجماليات ثم صفوف التفاصيل على دفعات مع إرسال نسبة التقدم"""
+        sales_reports = SalesReports(session)
+        totals = sales_reports.get_period_totals(self.start_date, self.end_date)
+        total_rows = sales_reports.count_sales(self.start_date, self.end_date)
+        self.report_progress(0, total_rows)
+
+        rows = []
+        for batch in sales_reports.iter_report_rows(self.start_date, self.end_date, self.batch_size):
+            rows.extend(batch)
+            self.report_progress(len(rows), total_rows)
+
+        self.report_progress(1, 1)
+        return {
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'rows': rows,
+            'totals': totals
+        }
+
+class ReportJobs(BackgroundJobs):
+    """
+    تنفيذ طلبات التقارير في الخلفية
+    تُدمج الطلبات المتتالية (مثل التنقل السريع بين التواريخ) فلا يُبنى إلا
+    آخر تقرير مطلوب، وتُلغى المهام التي تجاوزها طلب أحدث
+    """
+    report_ready = pyqtSignal(object)
+    report_failed = pyqtSignal(str)
+    progress_changed = pyqtSignal(int)
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, delay=150, batch_size=500, session_factory=None):
+        super().__init__(parent, session_factory or Session, delay=delay)
+        self.batch_size = batch_size
+        self.pending_period = None
+        self.busy = False
+
+    def request(self, start_date, end_date):
+        """طلب تقرير للفترة [start_date, end_date) بعد انتهاء مهلة الانتظار"""
+        self.pending_period = (start_date, end_date)
+        self.set_busy(True)
+        self.schedule()
+
+    def request_now(self, start_date, end_date):
+        """بناء التقرير فوراً دون انتظار"""
+        self.pending_period = (start_date, end_date)
+        self.start_now()
+
+    def create_task(self):
+        if self.pending_period is None:
+            return None
+        start_date, end_date = self.pending_period
+        self.set_busy(True)
+        self.progress_changed.emit(0)
+        return ReportTask(start_date, end_date, self.batch_size, self)
+
+    def task_progress(self, task, percent):
+        self.progress_changed.emit(percent)
+
+    def task_finished(self, task, report):
+        self.set_busy(False)
+        self.report_ready.emit(report)
+
+    def task_failed(self, task, message):
+        self.set_busy(False)
+        self.report_failed.emit(message)
+
+    def set_busy(self, busy):
+        if busy != self.busy:
+            self.busy = busy
+            self.busy_changed.emit(busy)
+
+    def cancel(self):
+        """إلغاء أي تقرير معلق أو جارٍ وتجاهل نتائجه"""
+        super().cancel()
+        self.set_busy(False)
@@ -1,27 +1,28 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                            QPushButton, QTableWidget, QTableWidgetItem, 
                            QMessageBox, QFrame, QHeaderView, QComboBox,
-                           QDateEdit, QFileDialog)
+                           QDateEdit, QFileDialog, QProgressBar, QProgressDialog)
 from PyQt5.QtCore import Qt, QSize, QDate
 from PyQt5.QtGui import QFont, QIcon
-from database.models import Sale, Part
-from database.db_setup import Session
+from .report_worker import ReportJobs
+from .export_worker import ReportExport
 from datetime import datetime, timedelta
-import pandas as pd
-from sqlalchemy import func
-import arabic_reshaper
-from bidi.algorithm import get_display
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase.pdfmetrics import registerFontFamily
-import xlsxwriter
 
 class ReportingUI(QWidget):
     def __init__(self):
         super().__init__()
-        self.session = Session()
+        # بناء التقارير في الخلفية (يُنفذ آخر طلب فقط)
+        self.report_jobs = ReportJobs(self)
+        self.report_jobs.report_ready.connect(self.on_report_ready)
+        self.report_jobs.report_failed.connect(self.on_report_failed)
+
+        # تصدير التقارير في الخلفية
+        self.export_progress = None
+        self.report_export = ReportExport(self)
+        self.report_export.progress_changed.connect(self.on_export_progress)
+        self.report_export.export_finished.connect(self.on_export_finished)
+        self.report_export.export_failed.connect(self.on_export_failed)
+        self.report_export.export_cancelled.connect(self.close_export_progress)
         
         # Add the new styling here
         self.setStyleSheet("""
@@ -41,6 +42,16 @@ class ReportingUI(QWidget):
                 background-color: white;
                 min-width: 200px;
             }
+            QProgressBar {
+                border: 1px solid #bdc3c7;
+                border-radius: 5px;
+                text-align: center;
+                max-height: 16px;
+            }
+            QProgressBar::chunk {
+                background-color: #3498db;
+                border-radius: 4px;
+            }
             QComboBox:focus, QDateEdit:focus {
                 border-color: #3498db;
             }
@@ -153,11 +164,20 @@ class ReportingUI(QWidget):
         self.export_pdf_btn.setIcon(QIcon("icons/excel.png"))
         self.export_pdf_btn.clicked.connect(self.export_to_pdf)
 
+        # Progress indicator (visible while a report is being built)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedWidth(160)
+        self.progress_bar.hide()
+        self.report_jobs.progress_changed.connect(self.progress_bar.setValue)
+        self.report_jobs.busy_changed.connect(self.progress_bar.setVisible)
+
         # Add controls to layout
         control_layout.addWidget(report_type_label)
         control_layout.addWidget(self.report_type)
         control_layout.addWidget(date_label)
         control_layout.addWidget(self.date_select)
+        control_layout.addWidget(self.progress_bar)
         control_layout.addStretch()
         control_layout.addWidget(self.export_csv_btn)
         control_layout.addWidget(self.export_pdf_btn)
@@ -223,57 +243,52 @@ class ReportingUI(QWidget):
         self.generate_report()
 
     def generate_report(self):
-        """Generate the report based on selected type and date"""
-        try:
-            selected_date = self.date_select.date().toPyDate()
-            
-            if self.report_type.currentText() == "تقرير يومي":
-                sales = self.get_daily_sales(selected_date)
-            else:
-                sales = self.get_monthly_sales(selected_date)
-                
-            self.update_table(sales)
-            self.update_summary(sales)
-            
-        except Exception as e:
-            self.show_message("خطأ", f"حدث خطأ أثناء إنشاء التقرير: {str(e)}", QMessageBox.Critical)
-
-    def get_daily_sales(self, date):
-        """Get sales for specific day"""
-        return self.session.query(
-            Sale, Part
-        ).join(Part).filter(
-            func.date(Sale.sale_date) == date
-        ).all()
-
-    def get_monthly_sales(self, date):
-        """Get sales for specific month"""
+        """Request the report for the selected type and date (built in the background)"""
+        start_date, end_date = self.get_report_period()
+        self.report_jobs.request(start_date, end_date)
+
+    def get_report_period(self):
+        """Return the selected period as a half-open range [start, end)"""
+        selected_date = self.date_select.date().toPyDate()
+
+        if self.report_type.currentText() == "تقرير يومي":
+            start_date, end_date = selected_date, selected_date + timedelta(days=1)
+        else:
+            start_date, end_date = self.get_month_range(selected_date)
+
+        return (datetime.combine(start_date, datetime.min.time()),
+                datetime.combine(end_date, datetime.min.time()))
+
+    def on_report_ready(self, report):
+        """Show a report built by the background job"""
+        self.update_table(report['rows'])
+        self.update_summary(report['totals'])
+
+    def on_report_failed(self, message):
+        self.show_message("خطأ", f"حدث خطأ أثناء إنشاء التقرير: {message}", QMessageBox.Critical)
+
+    def get_month_range(self, date):
+        """Return the first day of the month and the first day of the next month"""
         start_date = date.replace(day=1)
         if date.month == 12:
             end_date = date.replace(year=date.year + 1, month=1, day=1)
         else:
             end_date = date.replace(month=date.month + 1, day=1)
+        return start_date, end_date
+
+    def update_table(self, rows):
+        """Update the report table with sales rows"""
+        self.report_table.setRowCount(len(rows))
         
-        return self.session.query(
-            Sale, Part
-        ).join(Part).filter(
-            Sale.sale_date >= start_date,
-            Sale.sale_date < end_date
-        ).all()
-
-    def update_table(self, sales):
-        """Update the report table with sales data"""
-        self.report_table.setRowCount(len(sales))
-        
-        for row, (sale, part) in enumerate(sales):
+        for row, (part_number, name, part_type, quantity, selling_price, profit, sale_date) in enumerate(rows):
             items = [
-                part.part_number,
-                part.name,
-                part.type,
-                str(sale.quantity),
-                f"{sale.selling_price:,.2f}",
-                f"{sale.profit:,.2f}",
-                sale.sale_date.strftime("%Y-%m-%d %H:%M")
+                part_number,
+                name,
+                part_type,
+                str(quantity),
+                f"{selling_price:,.2f}",
+                f"{profit or 0:,.2f}",
+                sale_date.strftime("%Y-%m-%d %H:%M")
             ]
             
             for col, item in enumerate(items):
@@ -285,11 +300,11 @@ class ReportingUI(QWidget):
                     table_item.setTextAlignment(Qt.AlignCenter)
                 self.report_table.setItem(row, col, table_item)
 
-    def update_summary(self, sales):
-        """Update summary statistics"""
-        total_sales = sum(sale.selling_price * sale.quantity for sale, _ in sales)
-        total_profit = sum(sale.profit for sale, _ in sales)
-        total_items = sum(sale.quantity for sale, _ in sales)
+    def update_summary(self, totals):
+        """Update summary statistics (read from the daily sales summary table)"""
+        total_sales = totals['total_sales']
+        total_profit = totals['total_profit']
+        total_items = totals['items_sold']
         
         # Format numbers with right alignment
         self.total_sales_value.setText(f"{total_sales:,.2f}")
@@ -302,119 +317,54 @@ class ReportingUI(QWidget):
         self.items_sold_value.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
 
     def export_to_csv(self):
-        """Export report to CSV file"""
-        try:
-            filename, _ = QFileDialog.getSaveFileName(
-                self, "حفظ التقرير", "", "CSV Files (*.csv)"
-            )
-            
-            if filename:
-                data = []
-                for row in range(self.report_table.rowCount()):
-                    row_data = []
-                    for col in range(self.report_table.columnCount()):
-                        item = self.report_table.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    data.append(row_data)
-                
-                df = pd.DataFrame(
-                    data, 
-                    columns=["رقم القطعة", "اسم القطعة", "النوع", "الكمية", 
-                            "سعر البيع", "الربح", "التاريخ"]
-                )
-                df.to_csv(filename, index=False, encoding='utf-8-sig')
-                self.show_message("نجاح", "تم تصدير التقرير بنجح", QMessageBox.Information)
-                
-        except Exception as e:
-            self.show_message("خطأ", f"حدث خطأ أثناء تصدير التقرير: {str(e)}", QMessageBox.Critical)
+        """Export the selected report period to a CSV file, streamed from the database"""
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "حفظ التقرير", "", "CSV Files (*.csv)"
+        )
+        if filename:
+            self.start_export('csv', filename)
 
     def export_to_pdf(self):
-        """Export report to Excel file"""
-        try:
-            filename, _ = QFileDialog.getSaveFileName(
-                self, "حفظ التقرير", "", "Excel Files (*.xlsx)")
-            
-            if filename:
-                # Create workbook and worksheet
-                workbook = xlsxwriter.Workbook(filename)
-                worksheet = workbook.add_worksheet()
-
-                # Add formats
-                title_format = workbook.add_format({
-                    'bold': True,
-                    'font_size': 16,
-                    'align': 'center',
-                    'valign': 'vcenter'
-                })
-                
-                header_format = workbook.add_format({
-                    'bold': True,
-                    'bg_color': '#34495e',
-                    'font_color': 'white',
-                    'border': 1,
-                    'align': 'center',
-                    'valign': 'vcenter'
-                })
-                
-                cell_format = workbook.add_format({
-                    'align': 'center',
-                    'valign': 'vcenter',
-                    'border': 1
-                })
-                
-                number_format = workbook.add_format({
-                    'align': 'center',
-                    'valign': 'vcenter',
-                    'border': 1,
-                    'num_format': '#,##0.00'
-                })
-
-                # Set column widths
-                worksheet.set_column('A:G', 15)
-
-                # Write title
-                worksheet.merge_range('A1:G1', self.report_type.currentText(), title_format)
-                worksheet.merge_range('A2:G2', self.date_select.date().toString("yyyy-MM-dd"), title_format)
-
-                # Write summary
-                worksheet.merge_range('A4:C4', f"إجمالي المبيعات: {self.total_sales_value.text()}", cell_format)
-                worksheet.merge_range('D4:G4', f"إجمالي الأرباح: {self.total_profit_value.text()}", cell_format)
-
-                # Write headers - row 6
-                headers = ["رقم القطعة", "اسم القطعة", "النوع", "الكمية", "سعر البيع", "الربح", "التاريخ"]
-                for col, header in enumerate(headers):
-                    worksheet.write(5, col, header, header_format)
-
-                # Write data
-                for row in range(self.report_table.rowCount()):
-                    for col in range(self.report_table.columnCount()):
-                        item = self.report_table.item(row, col)
-                        value = item.text() if item else ''
-                        
-                        # Use number format for numeric columns
-                        if col in [3, 4, 5]:  # Quantity, Price, Profit columns
-                            try:
-                                value = float(value)
-                                worksheet.write(row + 6, col, value, number_format)
-                            except ValueError:
-                                worksheet.write(row + 6, col, value, cell_format)
-                        else:
-                            worksheet.write(row + 6, col, value, cell_format)
-
-                # Set RTL direction
-                worksheet.right_to_left()
-
-                # Add auto-filter
-                worksheet.autofilter(5, 0, 5 + self.report_table.rowCount(), 
-                                   self.report_table.columnCount() - 1)
-
-                # Close workbook
-                workbook.close()
-                
-                self.show_message("نجاح", "تم تصدير التقرير بنجاح", QMessageBox.Information)
-
-        except Exception as e:
-            self.show_message("خطأ", f"حدث خطأ أثناء تصدير التقرير: {str(e)}", QMessageBox.Critical)
+        """Export the selected report period to an Excel file, streamed from the database"""
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "حفظ التقرير", "", "Excel Files (*.xlsx)")
+        if filename:
+            self.start_export('xlsx', filename)
+
+    def start_export(self, file_format, filename):
+        """Run the export on a background thread with a cancellable progress dialog"""
+        if self.report_export.is_running():
+            self.show_message("تنبيه", "يوجد تصدير قيد التنفيذ", QMessageBox.Warning)
+            return
+
+        start_date, end_date = self.get_report_period()
+        title = self.report_type.currentText()
+
+        self.export_progress = QProgressDialog("جاري تصدير التقرير...", "إلغاء", 0, 100, self)
+        self.export_progress.setWindowTitle("تصدير")
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(300)
+        self.export_progress.canceled.connect(self.report_export.cancel)
+
+        self.report_export.start(file_format, filename, start_date, end_date, title)
+
+    def on_export_progress(self, percent):
+        if self.export_progress is not None:
+            self.export_progress.setValue(percent)
+
+    def close_export_progress(self):
+        if self.export_progress is not None:
+            self.export_progress.canceled.disconnect()
+            self.export_progress.close()
+            self.export_progress = None
+
+    def on_export_finished(self, written):
+        self.close_export_progress()
+        self.show_message("نجاح", f"تم تصدير التقرير بنجاح ({written} عملية بيع)", QMessageBox.Information)
+
+    def on_export_failed(self, message):
+        self.close_export_progress()
+        self.show_message("خطأ", f"حدث خطأ أثناء تصدير التقرير: {message}", QMessageBox.Critical)
 
     def show_message(self, title, message, icon):
         """Show message dialog"""
@@ -425,8 +375,9 @@ class ReportingUI(QWidget):
         msg.exec_()
 
     def closeEvent(self, event):
-        """Clean up database session on close"""
-        self.session.close()
+        """Stop background report and export jobs on close"""
+        self.report_jobs.shutdown()
+        self.report_export.shutdown()
         super().closeEvent(event)
 
     def refresh_report(self):
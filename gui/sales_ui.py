@@ -1,19 +1,24 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                           QLineEdit, QPushButton, QTableWidget, 
+                           QLineEdit, QPushButton, QTableView, QTableWidget,
                            QTableWidgetItem, QMessageBox, QComboBox,
                            QFrame, QHeaderView, QSpacerItem, QSizePolicy)
 from PyQt5.QtCore import Qt, QSize, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
-from database.models import Part, Sale
-from database.db_setup import Session
-from datetime import datetime
+from database.db_setup import Session, session_scope
+from app.sales import SalesManager
+from database.query_timing import timed_action
+from .search_worker import DebouncedSearch
+from .scan_worker import BarcodeScanner
+from .parts_table_model import (PartsTableModel, PART_NUMBER, NAME, TYPE,
+                                QUANTITY, COST_PRICE, SELLING_PRICE)
 
 class SalesUI(QWidget):
     sale_completed = pyqtSignal()
     
     def __init__(self):
         super().__init__()
-        self.session = Session()
+        # كل عملية بيع أو بحث تفتح جلسة قصيرة خاصة بها (انظر session_scope)
+        self.session_factory = Session
         self.init_ui()
         self.setStyleSheet("""
             QWidget {
@@ -53,20 +58,20 @@ class SalesUI(QWidget):
             QPushButton#addButton:hover {
                 background-color: #27ae60;
             }
-            QTableWidget {
+            QTableView, QTableWidget {
                 background-color: white;
                 border: 1px solid #bdc3c7;
                 border-radius: 5px;
                 gridline-color: #ecf0f1;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
-            QFrame#searchFrame, QFrame#saleFrame {
+            QFrame#searchFrame, QFrame#saleFrame, QFrame#cartFrame {
                 background-color: white;
                 border-radius: 10px;
                 padding: 15px;
@@ -92,24 +97,49 @@ class SalesUI(QWidget):
         search_label = QLabel("بحث عن القطعة:")
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("ادخل اسم القطعة أو رقمها")
+
+        # البحث المؤجل في الخلفية أثناء الكتابة
+        self.part_search = DebouncedSearch(self)
+        self.part_search.results_ready.connect(self.update_parts_table)
+        self.search_input.textChanged.connect(self.on_search_text_changed)
         search_button = QPushButton("بحث")
         search_button.setIcon(QIcon("icons/search.png"))
         search_button.setIconSize(QSize(20, 20))
         search_button.clicked.connect(self.search_parts)
+        self.search_input.returnPressed.connect(self.on_search_return)
+
+        # وضع الماسح: كل رمز مكتمل (ينتهي بـ Enter) يضاف مباشرة إلى السلة
+        self.scanner = BarcodeScanner(self, self.session_factory)
+        self.scanner.part_scanned.connect(self.add_scanned_part)
+        self.scanner.scan_failed.connect(self.on_scan_failed)
+        self.scan_mode_button = QPushButton("وضع الماسح")
+        self.scan_mode_button.setCheckable(True)
+        self.scan_mode_button.toggled.connect(self.set_scan_mode)
+        self.scan_status = QLabel("")
         
+        search_layout.addWidget(self.scan_status)
+        search_layout.addWidget(self.scan_mode_button)
         search_layout.addWidget(search_button)
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(search_label)
 
-        # جدول القطع
-        self.parts_table = QTableWidget()
-        self.parts_table.setColumnCount(6)
-        headers = ["السعر", "الكمية", "سعر التكلفة", "النوع", "الاسم", "رقم القطعة"]
-        self.parts_table.setHorizontalHeaderLabels(headers)
+        # جدول القطع (نموذج افتراضي يجلب الصفوف على صفحات)
+        self.parts_model = PartsTableModel([
+            ("السعر", lambda row: str(row[SELLING_PRICE])),
+            ("الكمية", lambda row: str(row[QUANTITY])),
+            ("سعر التكلفة", lambda row: str(row[COST_PRICE])),
+            ("النوع", lambda row: row[TYPE] or ""),
+            ("الاسم", lambda row: row[NAME]),
+            ("رقم القطعة", lambda row: row[PART_NUMBER]),
+        ], self)
+        self.parts_table = QTableView()
+        self.parts_table.setModel(self.parts_model)
         self.parts_table.setLayoutDirection(Qt.RightToLeft)
         
         # تنسيق الجدول
         self.parts_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.parts_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.parts_table.setSelectionBehavior(QTableView.SelectRows)
         self.parts_table.setAlternatingRowColors(True)
         self.parts_table.verticalHeader().setVisible(False)
 
@@ -133,52 +163,133 @@ class SalesUI(QWidget):
         add_sale_button.setIconSize(QSize(20, 20))
         add_sale_button.clicked.connect(self.add_sale)
 
+        add_to_cart_button = QPushButton("إضافة للسلة")
+        add_to_cart_button.setIcon(QIcon("icons/cart.png"))
+        add_to_cart_button.setIconSize(QSize(20, 20))
+        add_to_cart_button.clicked.connect(self.add_to_cart)
+
         # إضافة العناصر إلى تخطيط البيع
+        sale_layout.addWidget(add_to_cart_button)
         sale_layout.addWidget(add_sale_button)
         sale_layout.addWidget(self.price_input)
         sale_layout.addWidget(price_label)
         sale_layout.addWidget(self.quantity_input)
         sale_layout.addWidget(quantity_label)
 
+        # إطار السلة (فاتورة متعددة القطع)
+        cart_frame = QFrame()
+        cart_frame.setObjectName("cartFrame")
+        cart_layout = QVBoxLayout(cart_frame)
+
+        self.cart_table = QTableWidget()
+        self.cart_table.setColumnCount(5)
+        self.cart_table.setHorizontalHeaderLabels(
+            ["رقم القطعة", "الاسم", "الكمية", "سعر البيع", "المجموع"]
+        )
+        self.cart_table.setLayoutDirection(Qt.RightToLeft)
+        self.cart_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.cart_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.cart_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.cart_table.verticalHeader().setVisible(False)
+
+        cart_buttons = QHBoxLayout()
+        self.cart_total_label = QLabel("مجموع الفاتورة: 0.00")
+
+        remove_from_cart_button = QPushButton("حذف من السلة")
+        remove_from_cart_button.clicked.connect(self.remove_from_cart)
+
+        checkout_button = QPushButton("إتمام الفاتورة")
+        checkout_button.setObjectName("addButton")
+        checkout_button.setIcon(QIcon("icons/add.png"))
+        checkout_button.setIconSize(QSize(20, 20))
+        checkout_button.clicked.connect(self.checkout_cart)
+
+        cart_buttons.addWidget(checkout_button)
+        cart_buttons.addWidget(remove_from_cart_button)
+        cart_buttons.addStretch()
+        cart_buttons.addWidget(self.cart_total_label)
+
+        cart_layout.addWidget(self.cart_table)
+        cart_layout.addLayout(cart_buttons)
+
+        # بنود السلة: قوائم [رقم القطعة, الاسم, الكمية, سعر البيع]
+        self.cart_lines = []
+
         # إضافة كل شيء إلى التخطيط الرئيسي
         main_layout.addWidget(search_frame)
         main_layout.addWidget(self.parts_table)
         main_layout.addWidget(sale_frame)
+        main_layout.addWidget(cart_frame)
 
         self.setLayout(main_layout)
 
+    def on_search_text_changed(self, text):
+        # في وضع الماسح لا يُبحث أثناء وصول الأحرف، بل عند اكتمال الرمز
+        if self.scan_mode_button.isChecked():
+            return
+        if text.strip():
+            self.part_search.request(text)
+        else:
+            # مسح البحث يلغي الطلب المعلق ويعيد عرض كل القطع على صفحات
+            self.part_search.cancel()
+            self.parts_model.load_from_factory(self.session_factory)
+
+    def on_search_return(self):
+        if self.scan_mode_button.isChecked():
+            code = self.search_input.text()
+            self.search_input.clear()
+            self.scanner.scan(code)
+        else:
+            self.search_parts()
+
+    def set_scan_mode(self, enabled):
+        """تبديل حقل البحث بين البحث النصي ومسح الباركود"""
+        self.part_search.cancel()
+        self.search_input.clear()
+        self.scan_status.clear()
+        if enabled:
+            self.search_input.setPlaceholderText("امسح الباركود أو اكتب رقم القطعة ثم Enter")
+            self.scanner.rebuild_index()
+        else:
+            self.search_input.setPlaceholderText("ادخل اسم القطعة أو رقمها")
+        self.search_input.setFocus()
+
+    def add_scanned_part(self, code, part):
+        """إضافة القطعة الممسوحة إلى السلة؛ تكرار المسح يزيد الكمية"""
+        for line in self.cart_lines:
+            if line[0] == part.part_number:
+                line[2] += 1
+                quantity = line[2]
+                break
+        else:
+            self.cart_lines.append([part.part_number, part.name, 1, float(part.selling_price or 0)])
+            quantity = 1
+
+        self.update_cart_table()
+        status = f"{part.name} × {quantity}"
+        if quantity > part.quantity:
+            status += " - الكمية غير متوفرة في المخزون"
+        self.scan_status.setText(status)
+
+    def on_scan_failed(self, code):
+        # رسالة في الشريط بدل نافذة حتى لا يتوقف المسح
+        self.scan_status.setText(f"لم يتم العثور على الرمز: {code}")
+
+    @timed_action('sales.search_parts')
     def search_parts(self):
-        search_text = self.search_input.text()
-        
-        query = self.session.query(Part)
+        search_text = self.search_input.text().strip()
         if search_text:
-            query = query.filter(
-                (Part.name.ilike(f'%{search_text}%')) |
-                (Part.part_number.ilike(f'%{search_text}%'))
-            )
-        
-        parts = query.all()
-        self.update_parts_table(parts)
+            self.part_search.request_now(search_text)
+        else:
+            # عرض كل القطع على صفحات
+            self.part_search.cancel()
+            self.parts_model.load_from_factory(self.session_factory)
 
-    def update_parts_table(self, parts):
-        self.parts_table.setRowCount(len(parts))
-        
-        for row, part in enumerate(parts):
-            items = [
-                str(part.selling_price),
-                str(part.quantity),
-                str(part.cost_price),
-                part.type,
-                part.name,
-                part.part_number
-            ]
-            for col, item in enumerate(items):
-                table_item = QTableWidgetItem(item)
-                table_item.setTextAlignment(Qt.AlignCenter)
-                self.parts_table.setItem(row, col, table_item)
+    def update_parts_table(self, rows):
+        self.parts_model.set_rows(rows)
 
     def add_sale(self):
-        current_row = self.parts_table.currentRow()
+        current_row = self.parts_table.currentIndex().row()
         if current_row < 0:
             self.show_message("تنبيه", "الرجاء اختيار قطعة من الجدول", QMessageBox.Warning)
             return
@@ -190,39 +301,86 @@ class SalesUI(QWidget):
             self.show_message("خطأ", "الرجاء إدخال أرقام صحيحة", QMessageBox.Critical)
             return
 
-        part_number = self.parts_table.item(current_row, 5).text()
-        part = self.session.query(Part).filter_by(part_number=part_number).first()
+        part_number = self.parts_model.part_number_at(current_row)
 
-        if not part:
-            self.show_message("خطأ", "لم يتم العثور على القطعة", QMessageBox.Critical)
+        # خصم المخزون وتسجيل البيع في معاملة واحدة آمنة مع أجهزة البيع الأخرى
+        with timed_action('sales.add_sale'), session_scope(self.session_factory) as session:
+            success, message = SalesManager(session).create_sale(part_number, quantity, selling_price)
+        if not success:
+            self.show_message("خطأ", message, QMessageBox.Critical)
             return
 
-        if quantity > part.quantity:
-            self.show_message("خطأ", "الكمية المطلوبة غير متوفرة في المخزون", QMessageBox.Critical)
+        self.search_parts()  # تحديث الجدول
+        self.clear_inputs()
+        self.show_message("نجاح", message, QMessageBox.Information)
+        self.sale_completed.emit()
+
+    def add_to_cart(self):
+        """إضافة القطعة المحددة إلى السلة"""
+        current_row = self.parts_table.currentIndex().row()
+        row = self.parts_model.row_at(current_row)
+        if row is None:
+            self.show_message("تنبيه", "الرجاء اختيار قطعة من الجدول", QMessageBox.Warning)
             return
 
-        # إنشاء عملية البيع
-        sale = Sale(
-            part_id=part.id,
-            quantity=quantity,
-            selling_price=selling_price,
-            sale_date=datetime.now(),
-            profit=(selling_price - part.cost_price) * quantity
-        )
+        try:
+            quantity = int(self.quantity_input.text())
+            price_text = self.price_input.text().strip()
+            selling_price = float(price_text) if price_text else float(row[SELLING_PRICE])
+        except (TypeError, ValueError):
+            self.show_message("خطأ", "الرجاء إدخال أرقام صحيحة", QMessageBox.Critical)
+            return
 
-        # تحديث الكمية
-        part.quantity -= quantity
+        if quantity <= 0:
+            self.show_message("خطأ", "الكمية يجب أن تكون أكبر من صفر", QMessageBox.Critical)
+            return
 
-        try:
-            self.session.add(sale)
-            self.session.commit()
-            self.search_parts()  # تحديث الجدول
-            self.clear_inputs()
-            self.show_message("نجاح", "تم تسجيل عملية البيع بنجاح", QMessageBox.Information)
-            self.sale_completed.emit()
-        except Exception as e:
-            self.session.rollback()
-            self.show_message("خطأ", f"حدث خطأ أثناء تسجيل البيع: {str(e)}", QMessageBox.Critical)
+        self.cart_lines.append([row[PART_NUMBER], row[NAME], quantity, selling_price])
+        self.update_cart_table()
+        self.clear_inputs()
+
+    def remove_from_cart(self):
+        """حذف البند المحدد من السلة"""
+        current_row = self.cart_table.currentRow()
+        if 0 <= current_row < len(self.cart_lines):
+            del self.cart_lines[current_row]
+            self.update_cart_table()
+
+    def update_cart_table(self):
+        """تحديث جدول السلة ومجموع الفاتورة"""
+        self.cart_table.setRowCount(len(self.cart_lines))
+        total = 0
+        for row, (part_number, name, quantity, selling_price) in enumerate(self.cart_lines):
+            line_total = quantity * selling_price
+            total += line_total
+            items = [part_number, name, str(quantity), f"{selling_price:,.2f}", f"{line_total:,.2f}"]
+            for col, item in enumerate(items):
+                table_item = QTableWidgetItem(item)
+                table_item.setTextAlignment(Qt.AlignCenter)
+                self.cart_table.setItem(row, col, table_item)
+        self.cart_total_label.setText(f"مجموع الفاتورة: {total:,.2f}")
+
+    def checkout_cart(self):
+        """تسجيل كل بنود السلة كفاتورة واحدة"""
+        if not self.cart_lines:
+            self.show_message("تنبيه", "السلة فارغة", QMessageBox.Warning)
+            return
+
+        lines = [
+            (part_number, quantity, selling_price)
+            for part_number, _, quantity, selling_price in self.cart_lines
+        ]
+        with timed_action('sales.checkout_cart'), session_scope(self.session_factory) as session:
+            success, message = SalesManager(session).create_invoice(lines)
+        if not success:
+            self.show_message("خطأ", message, QMessageBox.Critical)
+            return
+
+        self.cart_lines = []
+        self.update_cart_table()
+        self.search_parts()  # تحديث الجدول
+        self.show_message("نجاح", message, QMessageBox.Information)
+        self.sale_completed.emit()
 
     def show_message(self, title, message, icon):
         msg = QMessageBox()
@@ -236,5 +394,6 @@ class SalesUI(QWidget):
         self.price_input.clear()
 
     def closeEvent(self, event):
-        self.session.close()
+        self.part_search.shutdown()
+        self.scanner.shutdown()
         super().closeEvent(event) 
\ No newline at end of file
@@ -0,0 +1,63 @@
+from PyQt5.QtCore import pyqtSignal
+from database.db_setup import Session
+from app.barcode_index import BarcodeIndex
+from .background_jobs import BackgroundJobs, BackgroundTask
+
+class IndexTask(BackgroundTask):
+    """بناء فهرس الرموز في خيط منفصل"""
+
+    def execute(self, session):
+        self.owner.index.build(session)
+
+class ScanTask(BackgroundTask):
+    """البحث عن رمز ممسوح في خيط منفصل بجلسة خاصة به"""
+
+    def __init__(self, code, owner):
+        super().__init__(owner)
+        self.code = code
+
+    def execute(self, session):
+        return self.owner.index.find(session, self.code)
+
+class BarcodeScanner(BackgroundJobs):
+    """
+    البحث عن الرموز الممسوحة دون إيقاف الواجهة
+    كل المهام تعمل في خيط واحد فتصل النتائج بنفس ترتيب المسح،
+    وبناء الفهرس يسبق أول مسح تلقائياً
+    """
+    part_scanned = pyqtSignal(str, object)
+    scan_failed = pyqtSignal(str)
+
+    # كل رمز ممسوح مطلوب، فلا يلغي المسح الجديد ما قبله
+    supersede = False
+
+    def __init__(self, parent=None, session_factory=None):
+        super().__init__(parent, session_factory or Session)
+        self.index = BarcodeIndex()
+
+    def rebuild_index(self):
+        """إعادة بناء فهرس الرموز في الخلفية (مثلاً عند فتح شاشة البيع)"""
+        self.start_task(IndexTask(self))
+
+    def scan(self, code):
+        """طلب البحث عن رمز مكتمل (يصل الرد عبر part_scanned أو scan_failed)"""
+        code = (code or "").strip()
+        if not code:
+            return
+        self.start_task(ScanTask(code, self))
+
+    def task_finished(self, task, part):
+        if not isinstance(task, ScanTask):
+            return
+        if part is None:
+            self.scan_failed.emit(task.code)
+        else:
+            self.part_scanned.emit(task.code, part)
+
+    def task_failed(self, task, message):
+        if isinstance(task, ScanTask):
+            print(f"Error looking up scanned code: {message}")
+            self.scan_failed.emit(task.code)
+        else:
+            # المسح يبقى ممكناً عبر البحث المباشر بالفهرس
+            print(f"Error building barcode index: {message}")
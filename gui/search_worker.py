@@ -0,0 +1,49 @@
+from PyQt5.QtCore import pyqtSignal
+from database.db_setup import Session
+from app.search import PartSearch
+from .background_jobs import BackgroundJobs, BackgroundTask
+
+class SearchTask(BackgroundTask):
+    """تنفيذ البحث في خيط منفصل بجلسة قاعدة بيانات خاصة به"""
+
+    def __init__(self, search_text, limit, owner):
+        super().__init__(owner)
+        self.search_text = search_text
+        self.limit = limit
+
+    def execute(self, session):
+        # صفوف عرض فقط (PartRow) لا تحتاج الجلسة بعد إغلاقها
+        return PartSearch(session).search_rows(self.search_text, self.limit)
+
+class DebouncedSearch(BackgroundJobs):
+    """
+    بحث مؤجل يعمل في الخلفية
+    ينتظر توقف الكتابة ثم ينفذ البحث في خيط منفصل، ويلغي الاستعلامات
+    القديمة بحيث لا تعرض إلا نتائج آخر طلب
+    """
+    results_ready = pyqtSignal(list)
+
+    def __init__(self, parent=None, delay=250, limit=None, session_factory=None):
+        super().__init__(parent, session_factory or Session, delay=delay, max_threads=2)
+        self.limit = limit
+        self.pending_text = ""
+
+    def request(self, search_text):
+        """طلب بحث جديد بعد انتهاء مهلة الانتظار"""
+        self.pending_text = (search_text or "").strip()
+        self.schedule()
+
+    def request_now(self, search_text=None):
+        """تنفيذ البحث فوراً دون انتظار"""
+        if search_text is not None:
+            self.pending_text = (search_text or "").strip()
+        self.start_now()
+
+    def create_task(self):
+        return SearchTask(self.pending_text, self.limit, self)
+
+    def task_finished(self, task, parts):
+        self.results_ready.emit(parts)
+
+    def task_failed(self, task, message):
+        print(f"Error running background search: {message}")
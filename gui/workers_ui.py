@@ -6,6 +6,9 @@ from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont, QIcon
 import sqlite3
 from datetime import datetime
+from database.connection import get_connection
+from database.query_timing import timed_action
+from database.search_keys import normalize_search_key, prefix_bounds
 
 class WorkerManagementUI(QDialog):
     def __init__(self):
@@ -170,6 +173,13 @@ class WorkerManagementUI(QDialog):
 
         main_layout.addLayout(form_layout)
 
+        # Search box: يطابق بداية الاسم بمفتاحه الموحد (أحمد = احمد)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("بحث باسم الموظف...")
+        self.search_input.setLayoutDirection(Qt.RightToLeft)
+        self.search_input.textChanged.connect(self.refresh_table)
+        main_layout.addWidget(self.search_input)
+
         # Table to display workers
         self.workers_table = QTableWidget()
         self.workers_table.setColumnCount(4)
@@ -229,26 +239,38 @@ class WorkerManagementUI(QDialog):
     def get_db_connection(self):
         """Create and return a database connection"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return get_connection(self.db_path)
         except sqlite3.Error as e:
             QMessageBox.critical(self, "خطأ في قاعدة البيانات", f"فشل الاتصال بقاعدة البيانات: {str(e)}")
             return None
 
-    def refresh_table(self):
+    @timed_action('workers.refresh_table')
+    def refresh_table(self, search_text=None):
         """Refresh the workers table with current database data"""
+        if search_text is None:
+            search_text = self.search_input.text()
+        # توحيد كلمة البحث مرة واحدة ثم مطابقة البادئة عبر فهرس name_key
+        key = normalize_search_key(search_text)
+
         try:
             conn = self.get_db_connection()
             if not conn:
                 return
 
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, name, phone, salary, status, created_at, updated_at 
-                FROM workers 
-                ORDER BY name
-            """)
+            if key:
+                cursor.execute("""
+                    SELECT id, name, phone, salary, status, created_at, updated_at 
+                    FROM workers 
+                    WHERE name_key >= ? AND name_key < ?
+                    ORDER BY name
+                """, prefix_bounds(key))
+            else:
+                cursor.execute("""
+                    SELECT id, name, phone, salary, status, created_at, updated_at 
+                    FROM workers 
+                    ORDER BY name
+                """)
             
             self.workers_table.setRowCount(0)
             
@@ -1,22 +1,27 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from gui.login_ui import LoginUI
-from gui.main_window import MainWindow
-from database.db_setup import init_db
+from database.migrations import ensure_database
+from config.logging_config import setup_logging
 
 def main():
-    # Initialize database and create all tables
-    init_db()
+    # سجل 'mahalli' يستقبل الاستعلامات والعمليات البطيئة
+    setup_logging()
+
+    # Initialize database and create all tables (first run or after new migrations only)
+    ensure_database()
     
     app = QApplication(sys.argv)
     
     # Show login dialog
     login = LoginUI()
     if login.exec_() == LoginUI.Accepted:
+        # النافذة الرئيسية وشاشاتها تُستورد بعد تسجيل الدخول فقط
+        from gui.main_window import MainWindow
         # If login successful, show main window
         window = MainWindow()
         window.show()
         sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
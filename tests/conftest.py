@@ -7,15 +7,21 @@ It includes functions for creating and cleaning up test databases.
 Functions:
     setup_test_db(): Sets up SQLAlchemy test database
     setup_test_sqlite_db(): Sets up SQLite test database for workers
+    setup_test_attendance_db(): Sets up SQLite test database for attendance reports
     cleanup_test_db(): Cleans up test databases
 """
 
+import hashlib
 import os
 import sys
 import sqlite3
+import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from database.models import Base
+from database.connection import close_all
+from app.part_cache import part_cache
+import app.workers
 
 # Add app directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -25,6 +31,30 @@ TEST_DB_PATH = "test_database.db"
 TEST_SQLITE_DB = "test_workers.db"
 TEST_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 
+# Database files tracked in the repository; tests must never modify them
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRACKED_DATABASES = ('company.db', 'database/workers.db', 'database/inventory.db')
+
+# app.workers writes to company.db by default
+APP_WORKERS_DATABASE = app.workers.DATABASE
+
+def database_digests():
+    digests = {}
+    for name in TRACKED_DATABASES:
+        path = os.path.join(ROOT, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digests[name] = hashlib.sha256(f.read()).hexdigest()
+    return digests
+
+@pytest.fixture(scope='session', autouse=True)
+def tracked_databases_untouched():
+    """Fail the run if any test changed a database file shipped with the repository"""
+    before = database_digests()
+    yield
+    changed = [name for name, digest in database_digests().items() if before.get(name) != digest]
+    assert not changed, f"Tests modified tracked database files: {changed}"
+
 def setup_test_db():
     """Setup test database"""
     engine = create_engine(TEST_DATABASE_URL)
@@ -61,15 +91,52 @@ def setup_test_sqlite_db():
             status TEXT,
             time_in TEXT,
             time_out TEXT,
-            FOREIGN KEY (worker_id) REFERENCES Workers (id)
+            FOREIGN KEY (worker_id) REFERENCES Workers (id),
+            UNIQUE(worker_id, date)
         )
     ''')
     
     conn.commit()
     conn.close()
 
+    # Point app.workers at the test database instead of company.db
+    app.workers.DATABASE = TEST_SQLITE_DB
+
+def setup_test_attendance_db():
+    """Setup test SQLite database with the real workers/attendance schema and November 2024 records"""
+    cleanup_test_db()
+    conn = sqlite3.connect(TEST_SQLITE_DB)
+    conn.executescript("""
+        CREATE TABLE workers (
+            id INTEGER PRIMARY KEY, name TEXT NOT NULL, phone TEXT NOT NULL,
+            salary INTEGER NOT NULL, status TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL, updated_at TIMESTAMP NOT NULL
+        );
+        CREATE TABLE attendance (
+            id INTEGER PRIMARY KEY, worker_id INTEGER NOT NULL, date DATE NOT NULL,
+            time_in TIMESTAMP, time_out TIMESTAMP, status TEXT, notes TEXT,
+            created_at TIMESTAMP NOT NULL, UNIQUE(worker_id, date)
+        );
+    """)
+    conn.executemany(
+        "INSERT INTO workers VALUES (?, ?, '0', ?, ?, '2024-01-01', '2024-01-01')",
+        [(1, "Ali", 3000, "نشط"), (2, "Badr", 1500, "نشط"), (3, "Old", 2000, "غير نشط")]
+    )
+    conn.executemany(
+        "INSERT INTO attendance (worker_id, date, status, created_at) VALUES (?, ?, ?, '')",
+        [(1, "2024-11-01", "غائب"), (1, "2024-11-02", "متأخر"), (1, "2024-11-03", "حاضر"),
+         (1, "2024-10-31", "غائب"), (2, "2024-11-30", "غائب"), (3, "2024-11-05", "غائب")]
+    )
+    conn.commit()
+    conn.close()
+
 def cleanup_test_db():
     """Cleanup test databases"""
+    # Idle pooled connections would otherwise keep pointing at the removed files
+    close_all()
+    # Cached part records belong to the removed database
+    part_cache.clear()
+    app.workers.DATABASE = APP_WORKERS_DATABASE
     try:
         if os.path.exists(TEST_DB_PATH):
             os.remove(TEST_DB_PATH)
@@ -0,0 +1,64 @@
+import sqlite3
+import unittest
+from app.attendance import AttendanceManager
+from tests.conftest import setup_test_attendance_db, cleanup_test_db, TEST_SQLITE_DB
+
+class TestBatchAttendance(unittest.TestCase):
+    """اختبار التسجيل الجماعي للحضور"""
+
+    def setUp(self):
+        setup_test_attendance_db()
+        self.manager = AttendanceManager(db_path=TEST_SQLITE_DB)
+
+    def tearDown(self):
+        cleanup_test_db()
+
+    def get_day(self, date):
+        conn = sqlite3.connect(TEST_SQLITE_DB)
+        rows = conn.execute(
+            "SELECT worker_id, status, time_in FROM attendance WHERE date = ? ORDER BY worker_id",
+            (date,)
+        ).fetchall()
+        conn.close()
+        return rows
+
+    def test_mark_all_active_workers(self):
+        worker_ids = self.manager.get_active_worker_ids()
+        self.assertEqual(sorted(worker_ids), [1, 2])
+
+        success, message = self.manager.mark_attendance_batch(worker_ids, "2024-11-04", "حاضر")
+        self.assertTrue(success, message)
+        self.assertEqual([(worker_id, status) for worker_id, status, _ in self.get_day("2024-11-04")],
+                         [(1, "حاضر"), (2, "حاضر")])
+
+    def test_existing_record_is_updated(self):
+        success, _ = self.manager.mark_attendance_batch([1, 2], "2024-11-01", "متأخر")
+        self.assertTrue(success)
+
+        rows = self.get_day("2024-11-01")
+        self.assertEqual([(worker_id, status) for worker_id, status, _ in rows],
+                         [(1, "متأخر"), (2, "متأخر")])
+
+    def test_single_statement_in_one_transaction(self):
+        statements = []
+        original_connect = self.manager.get_db_connection
+
+        def traced_connection():
+            conn = original_connect()
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        self.manager.get_db_connection = traced_connection
+        self.manager.mark_attendance_batch([1, 2, 2], "2024-11-04", "غائب")
+
+        inserts = [sql for sql in statements if "INSERT INTO attendance" in sql]
+        commits = [sql for sql in statements if sql.strip().upper() == "COMMIT"]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(len(commits), 1)
+
+    def test_empty_selection(self):
+        success, _ = self.manager.mark_attendance_batch([], "2024-11-04", "حاضر")
+        self.assertFalse(success)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from app.barcode_index import BarcodeIndex, normalize_code, invalidate_codes
+from database.models import Part
+from tests.conftest import setup_test_db, cleanup_test_db
+
+class TestBarcodeIndex(unittest.TestCase):
+    """اختبار فهرس رموز القطع لوضع الماسح"""
+
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.session.add_all([
+            Part(part_number='OF-1001', name='فلتر زيت', type='فلاتر', quantity=10,
+                 cost_price=5, selling_price=8, barcode='6281234567890'),
+            Part(part_number='BP-2002', name='Brake Pad', type='فرامل', quantity=4,
+                 cost_price=20, selling_price=30),
+        ])
+        self.session.commit()
+        self.index = BarcodeIndex()
+        self.index.build(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def test_normalize_code(self):
+        self.assertEqual(normalize_code(' of-1001\t'), 'OF1001')
+        self.assertEqual(normalize_code('٦٢٨ ١٢٣'), '628123')
+        self.assertEqual(normalize_code(None), '')
+
+    def test_finds_by_barcode_and_normalized_part_number(self):
+        self.assertEqual(self.index.find(self.session, '6281234567890').part_number, 'OF-1001')
+        self.assertEqual(self.index.find(self.session, 'bp 2002').name, 'Brake Pad')
+        self.assertIsNone(self.index.find(self.session, 'UNKNOWN'))
+        self.assertIsNone(self.index.find(self.session, '  '))
+
+    def test_parts_changed_after_build(self):
+        self.session.add(Part(part_number='AF-3003', name='Air Filter', type='فلاتر',
+                              quantity=7, cost_price=6, selling_price=9, barcode='999'))
+        self.session.query(Part).filter_by(part_number='BP-2002').delete()
+        self.session.commit()
+
+        self.assertEqual(self.index.find(self.session, '999').part_number, 'AF-3003')
+        self.assertIsNone(self.index.find(self.session, 'BP-2002'))
+        self.assertIsNone(self.index.find(self.session, 'bp 2002'))
+
+    def test_moved_barcode_returns_new_part(self):
+        self.session.query(Part).filter_by(part_number='OF-1001').update({'barcode': None})
+        self.session.query(Part).filter_by(part_number='BP-2002').update({'barcode': '6281234567890'})
+        self.session.commit()
+
+        # المطابقة الحرفية والخريطة القديمة لا تعيدان القطعة السابقة
+        self.assertEqual(self.index.find(self.session, '6281234567890').part_number, 'BP-2002')
+        self.assertEqual(self.index.find(self.session, '628-1234567890').part_number, 'BP-2002')
+
+        invalidate_codes()
+        self.assertFalse(self.index.is_current())
+        self.assertEqual(self.index.find(self.session, '628 1234567890').part_number, 'BP-2002')
+        self.assertTrue(self.index.is_current())
+
+    def test_exact_match_before_normalized(self):
+        self.session.add(Part(part_number='OF1001', name='Other Filter', type='فلاتر',
+                              quantity=1, cost_price=5, selling_price=8))
+        self.session.commit()
+        self.index.build(self.session)
+
+        self.assertEqual(self.index.find(self.session, 'OF-1001').name, 'فلتر زيت')
+        self.assertEqual(self.index.find(self.session, 'OF1001').name, 'Other Filter')
+        # الرمز الموحد يطابق قطعتين فلا يُختار أحدهما
+        self.assertIsNone(self.index.find(self.session, 'of 1001'))
+
+if __name__ == '__main__':
+    unittest.main()
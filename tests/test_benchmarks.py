@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from benchmarks.data_generator import generate
+from benchmarks.suite import run, compare
+from benchmarks.shift_memory import simulate_shift
+from benchmarks import row_projection
+
+def table_rows(path, query):
+    conn = sqlite3.connect(path)
+    rows = conn.execute(query).fetchall()
+    conn.close()
+    return rows
+
+class TestDataGenerator(unittest.TestCase):
+    """اختبار مولد البيانات التجريبية"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def generate(self, name, seed):
+        path = os.path.join(self.directory.name, name)
+        counts = generate(path, parts=50, sales=300, workers=4, years=1,
+                          attendance_days=30, seed=seed)
+        return path, counts
+
+    def test_same_seed_gives_same_data(self):
+        first, counts = self.generate('first.db', 7)
+        second, _ = self.generate('second.db', 7)
+        other, _ = self.generate('other.db', 8)
+
+        query = "SELECT part_id, quantity, selling_price, sale_date FROM sales ORDER BY id"
+        self.assertEqual(table_rows(first, query), table_rows(second, query))
+        self.assertNotEqual(table_rows(first, query), table_rows(other, query))
+        self.assertEqual(counts['sales'], 300)
+
+    def test_summaries_follow_generated_sales(self):
+        path, counts = self.generate('bench.db', 1)
+        (sold,), = table_rows(path, "SELECT SUM(quantity) FROM sales")
+        (summarized,), = table_rows(path, "SELECT SUM(quantity) FROM daily_sales_summary")
+        self.assertEqual(sold, summarized)
+        (attendance,), = table_rows(path, "SELECT COUNT(*) FROM attendance")
+        self.assertEqual(attendance, counts['attendance'])
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """اختبار مجموعة القياسات"""
+
+    def test_suite_times_every_operation(self):
+        results = run({'tiny': {'parts': 30, 'sales': 200, 'workers': 3}}, repeat=2)
+        operations = results['scales']['tiny']['operations']
+        self.assertEqual(set(operations), {
+            'InventoryManager.search_parts',
+            'SalesManager.create_sale',
+            'SalesReports.get_monthly_report',
+            'SalesReports.get_best_selling_parts',
+            'AttendanceReports.generate_monthly_report',
+            'AttendanceReports.calculate_salary',
+        })
+        for timing in operations.values():
+            self.assertEqual(timing['repeat'], 2)
+            self.assertLessEqual(timing['min_ms'], timing['max_ms'])
+        self.assertIn('sqlite', results['environment'])
+
+    def test_compare_flags_regressions(self):
+        baseline = {'scales': {'small': {'operations': {
+            'a': {'median_ms': 10.0}, 'b': {'median_ms': 10.0}
+        }}}}
+        current = {'scales': {'small': {'operations': {
+            'a': {'median_ms': 11.0}, 'b': {'median_ms': 30.0}
+        }}}}
+        rows = {row[1]: row for row in compare(baseline, current)}
+        self.assertFalse(rows['a'][5])
+        self.assertTrue(rows['b'][5])
+        self.assertEqual(rows['b'][4], 3.0)
+
+class TestShiftMemory(unittest.TestCase):
+    """اختبار محاكاة الوردية"""
+
+    def test_modes_report_hourly_memory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'shift.db')
+            generate(path, parts=50, sales=100, workers=1, years=1, attendance_days=1)
+            for mode in ('long-lived', 'unit-of-work'):
+                result = simulate_shift(path, mode, part_count=50, hours=2, actions_per_hour=20)
+                self.assertEqual([sample['hour'] for sample in result['hours']], [1, 2])
+                self.assertGreaterEqual(result['peak_kb'], result['hours'][-1]['memory_kb'])
+            self.assertEqual(result['hours'][-1]['identity_map'], 0)
+            with self.assertRaises(ValueError):
+                simulate_shift(path, 'forever', part_count=50)
+
+class TestRowProjection(unittest.TestCase):
+    """اختبار مقارنة كائنات ORM بصفوف العرض"""
+
+    def test_both_modes_return_the_same_rows(self):
+        results = row_projection.run(parts=40, sales=120, repeat=1)
+        for name in ('parts', 'sales_report'):
+            listing = results['listings'][name]
+            self.assertEqual(listing['orm']['rows'], listing['rows']['rows'])
+            self.assertGreater(listing['orm']['memory_kb'], listing['rows']['memory_kb'])
+        self.assertEqual(results['listings']['sales_report']['rows']['rows'], 120)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import gc
+import sqlite3
+import threading
+import unittest
+from database.connection import (ConnectionPool, PoolTimeout, get_connection,
+                                 get_pool, close_all)
+from tests.conftest import setup_test_attendance_db, cleanup_test_db, TEST_SQLITE_DB
+
+class TestConnectionPool(unittest.TestCase):
+    """اختبار مجمع اتصالات SQLite المشترك"""
+
+    def setUp(self):
+        setup_test_attendance_db()
+        self.pool = ConnectionPool(TEST_SQLITE_DB, size=2, timeout=0.2)
+
+    def tearDown(self):
+        self.pool.close()
+        cleanup_test_db()
+
+    def test_connection_is_reused(self):
+        conn = self.pool.acquire()
+        conn.close()
+        self.assertIs(self.pool.acquire(), conn)
+
+    def test_nested_acquire_gets_own_connection(self):
+        outer = self.pool.acquire()
+        inner = self.pool.acquire(row_factory=None)
+        self.assertIsNot(inner, outer)
+        self.assertIsInstance(inner.execute("SELECT name FROM workers").fetchone(), tuple)
+        inner.close()
+
+        # الاتصال الخارجي ما زال مفتوحاً بشكل صفوفه
+        row = outer.execute("SELECT name FROM workers WHERE id = 1").fetchone()
+        self.assertEqual(row['name'], "Ali")
+        outer.close()
+
+    def test_failed_inner_scope_keeps_outer_transaction(self):
+        outer = self.pool.acquire()
+        with outer:
+            outer.execute("UPDATE workers SET phone = 'outer' WHERE id = 1")
+            inner = self.pool.acquire()
+            try:
+                with inner:
+                    inner.execute("SELECT missing FROM workers")
+            except sqlite3.OperationalError:
+                pass
+            finally:
+                inner.close()
+            self.assertTrue(outer.in_transaction)
+        outer.close()
+
+        conn = self.pool.acquire()
+        phone = conn.execute("SELECT phone FROM workers WHERE id = 1").fetchone()[0]
+        self.assertEqual(phone, 'outer')
+        conn.close()
+
+    def test_pool_is_bounded(self):
+        held = []
+
+        def hold():
+            held.append(self.pool.acquire())
+
+        threads = [threading.Thread(target=hold) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.acquire()
+
+        held[0].close()
+        conn = self.pool.acquire()
+        self.assertIs(conn, held[0])
+
+    def test_uncommitted_work_is_rolled_back(self):
+        conn = self.pool.acquire()
+        conn.execute("DELETE FROM attendance")
+        conn.close()
+
+        conn = self.pool.acquire()
+        count = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+        self.assertEqual(count, 6)
+
+    def test_leaked_connection_returns_slot(self):
+        for _ in range(3):
+            self.pool.acquire().execute("SELECT 1")
+            gc.collect()
+        conn = self.pool.acquire()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM workers").fetchone()[0], 3)
+
+    def test_pragmas_applied(self):
+        conn = self.pool.acquire()
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+
+    def test_shared_pool_per_path(self):
+        self.assertIs(get_pool(TEST_SQLITE_DB), get_pool("./" + TEST_SQLITE_DB))
+        conn = get_connection(TEST_SQLITE_DB)
+        self.assertIs(conn.row_factory, sqlite3.Row)
+        conn.close()
+        close_all()
+        self.assertIsNot(get_pool(TEST_SQLITE_DB), conn.pool)
+
+if __name__ == '__main__':
+    unittest.main()
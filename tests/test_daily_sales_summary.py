@@ -0,0 +1,135 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.sales import SalesManager
+from app.sales_reports import SalesReports
+from database.models import Part, Sale
+from tests.conftest import setup_test_db, cleanup_test_db
+
+SUMMARY_SQL = text("""
+    SELECT sale_day, part_id, quantity, revenue, profit, sale_count
+    FROM daily_sales_summary
+    ORDER BY sale_day, part_id
+""")
+
+class TestDailySalesSummary(unittest.TestCase):
+    """اختبار الملخص اليومي للمبيعات المحدث مع كل عملية بيع أو إرجاع"""
+
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.part = Part(part_number='P001', name='Brake Pad', type='فرامل',
+                         quantity=20, cost_price=20, selling_price=30)
+        self.session.add(self.part)
+        self.session.commit()
+        self.sales_manager = SalesManager(self.session)
+        self.sales_reports = SalesReports(self.session)
+        self.today = datetime.now().strftime("%Y-%m-%d")
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def get_summary(self):
+        return [tuple(row) for row in self.session.execute(SUMMARY_SQL)]
+
+    def test_create_sale_updates_summary(self):
+        self.sales_manager.create_sale('P001', 2, 30)
+        self.sales_manager.create_sale('P001', 3, 25)
+
+        self.assertEqual(self.get_summary(), [
+            (self.today, self.part.id, 5, 2 * 30 + 3 * 25, 2 * 10 + 3 * 5, 2)
+        ])
+
+    def test_invoice_updates_summary(self):
+        self.sales_manager.create_invoice([('P001', 2, 30), ('P001', 1, 30)])
+
+        self.assertEqual(self.get_summary(), [
+            (self.today, self.part.id, 3, 90, 30, 2)
+        ])
+
+    def test_partial_return(self):
+        self.sales_manager.create_sale('P001', 4, 30)
+        sale = self.session.query(Sale).one()
+
+        success, message = self.sales_manager.return_sale(sale.id, 1)
+        self.assertTrue(success, message)
+
+        self.assertEqual(self.get_summary(), [
+            (self.today, self.part.id, 3, 90, 30, 2)
+        ])
+        self.session.expire_all()
+        self.assertEqual(self.session.get(Part, self.part.id).quantity, 17)
+
+        # البيع الأصلي باقٍ كما هو والمرتجع سطر مستقل مرتبط به
+        original = self.session.get(Sale, sale.id)
+        self.assertEqual((original.quantity, original.profit), (4, 40))
+        returned = self.session.query(Sale).filter_by(return_of_id=sale.id).one()
+        self.assertEqual((returned.quantity, returned.profit), (-1, -10))
+
+    def test_full_return_keeps_sale(self):
+        self.sales_manager.create_sale('P001', 4, 30)
+        sale = self.session.query(Sale).one()
+
+        success, _ = self.sales_manager.return_sale(sale.id)
+        self.assertTrue(success)
+
+        self.assertEqual(self.get_summary(), [
+            (self.today, self.part.id, 0, 0, 0, 2)
+        ])
+        self.session.expire_all()
+        self.assertEqual(self.session.get(Part, self.part.id).quantity, 20)
+        self.assertEqual(self.session.query(Sale).count(), 2)
+        self.assertEqual(self.session.get(Sale, sale.id).quantity, 4)
+
+        analysis = self.sales_reports.get_profit_analysis(
+            datetime.now() - timedelta(days=1), datetime.now() + timedelta(days=1))
+        self.assertEqual(analysis['total_profit'], 0)
+        self.assertEqual(analysis['total_revenue'], 0)
+
+    def test_return_more_than_sold(self):
+        self.sales_manager.create_sale('P001', 3, 30)
+        sale = self.session.query(Sale).one()
+
+        success, _ = self.sales_manager.return_sale(sale.id, 4)
+        self.assertFalse(success)
+
+        # المرتجعات السابقة تُخصم من الكمية القابلة للإرجاع
+        self.assertTrue(self.sales_manager.return_sale(sale.id, 2)[0])
+        self.assertFalse(self.sales_manager.return_sale(sale.id, 2)[0])
+        self.assertTrue(self.sales_manager.return_sale(sale.id)[0])
+        self.assertFalse(self.sales_manager.return_sale(sale.id)[0])
+
+        returned = self.session.query(Sale).filter_by(return_of_id=sale.id).first()
+        self.assertFalse(self.sales_manager.return_sale(returned.id)[0])
+
+    def test_rebuild_matches_triggers(self):
+        yesterday = datetime.now() - timedelta(days=1)
+        self.session.add_all([
+            Sale(part_id=self.part.id, quantity=2, selling_price=30,
+                 sale_date=yesterday, profit=20),
+            Sale(part_id=self.part.id, quantity=1, selling_price=30,
+                 sale_date=datetime.now(), profit=10),
+        ])
+        self.session.commit()
+        expected = self.get_summary()
+        self.assertEqual(len(expected), 2)
+
+        self.assertTrue(self.sales_reports.rebuild_daily_summary())
+        self.assertEqual(self.get_summary(), expected)
+
+    def test_reports_read_from_summary(self):
+        self.sales_manager.create_sale('P001', 2, 30)
+
+        report = self.sales_reports.get_daily_report(datetime.now(), include_sales=False)
+        self.assertEqual(report['sales'], [])
+        self.assertEqual(report['statistics']['total_sales'], 60)
+        self.assertEqual(report['statistics']['items_sold'], 2)
+
+        today = datetime.now()
+        monthly = self.sales_reports.get_monthly_report(today.year, today.month)
+        self.assertEqual(monthly['daily_stats'][today.date()],
+                         {'sales': 60, 'profit': 20, 'items': 2})
+
+if __name__ == '__main__':
+    unittest.main()
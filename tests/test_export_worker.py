@@ -0,0 +1,74 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.orm import sessionmaker
+from database.models import Part, Sale
+from tests.conftest import setup_test_db, cleanup_test_db
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from gui import export_worker
+from gui.export_worker import ReportExport
+
+pytestmark = [
+    pytest.mark.ui,
+    pytest.mark.skipif(openpyxl is None, reason="openpyxl not installed"),
+]
+
+TEST_XLSX = 'test_export_worker.xlsx'
+FIRST_DAY = datetime(2024, 1, 1)
+
+@pytest.fixture
+def test_session(monkeypatch):
+    session, engine = setup_test_db()
+    part = Part(part_number='P001', name='Brake Pad', quantity=100,
+                cost_price=20, selling_price=30)
+    session.add(part)
+    session.commit()
+    session.execute(Sale.__table__.insert(), [
+        {'part_id': part.id, 'quantity': 1, 'selling_price': 30,
+         'sale_date': FIRST_DAY + timedelta(hours=i), 'profit': 10}
+        for i in range(3000)
+    ])
+    session.commit()
+    monkeypatch.setattr(export_worker, 'Session', sessionmaker(bind=engine))
+    yield session
+    session.close()
+    engine.dispose()
+    cleanup_test_db()
+    if os.path.exists(TEST_XLSX):
+        os.remove(TEST_XLSX)
+
+class TestReportExport:
+    def test_export_in_background(self, qtbot, test_session):
+        export = ReportExport()
+        progress = []
+        export.progress_changed.connect(progress.append)
+
+        with qtbot.waitSignal(export.export_finished, timeout=10000) as blocker:
+            export.start('xlsx', TEST_XLSX, FIRST_DAY, FIRST_DAY + timedelta(days=365))
+        export.shutdown()
+
+        assert blocker.args == [3000]
+        assert progress[0] == 0 and progress[-1] == 100
+        assert progress == sorted(progress)
+        assert os.path.exists(TEST_XLSX)
+        assert not export.is_running()
+
+    def test_cancel_removes_partial_file(self, qtbot, test_session):
+        export = ReportExport()
+        finished = []
+        export.export_finished.connect(finished.append)
+
+        with qtbot.waitSignal(export.export_cancelled, timeout=10000):
+            export.start('xlsx', TEST_XLSX, FIRST_DAY, FIRST_DAY + timedelta(days=365))
+            export.cancel()
+        export.shutdown()
+
+        assert finished == []
+        assert not os.path.exists(TEST_XLSX)
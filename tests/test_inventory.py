@@ -90,7 +90,7 @@ class TestInventoryManager(unittest.TestCase):
     def test_search_parts(self):
         """Test searching for parts."""
         part_mock = MagicMock()
-        self.inventory_manager.session.query.return_value.filter.return_value.all.return_value = [part_mock]
+        self.inventory_manager.session.query.return_value.from_statement.return_value.params.return_value.all.return_value = [part_mock]
 
         result = self.inventory_manager.search_parts("Brake")
         self.assertEqual(len(result), 1)
@@ -105,11 +105,12 @@ class TestInventoryManager(unittest.TestCase):
 
     def test_get_part_by_number_found(self):
         """Test retrieving a part by number when found."""
-        part_mock = MagicMock()
-        self.inventory_manager.session.query.return_value.filter_by.return_value.first.return_value = part_mock
+        row = (1, "12345", "Brake Pad", "Brakes", 10, 50.0, 70.0)
+        self.inventory_manager.session.query.return_value.filter_by.return_value.first.return_value = row
 
         result = self.inventory_manager.get_part_by_number("12345")
         self.assertIsNotNone(result)
+        self.assertEqual(result.name, "Brake Pad")
 
     def test_get_part_by_number_not_found(self):
         """Test retrieving a part by number when not found."""
@@ -0,0 +1,74 @@
+import unittest
+from sqlalchemy import text
+from app.inventory_stats import InventoryStats, AGGREGATE_STATS_SQL
+from database.models import Part
+from tests.conftest import setup_test_db, cleanup_test_db
+
+class TestInventoryStats(unittest.TestCase):
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.stats = InventoryStats(self.session)
+
+        self.session.add_all([
+            Part(part_number='P001', name='Oil Filter', type='فلاتر',
+                 quantity=10, cost_price=5, selling_price=8),
+            Part(part_number='P002', name='Brake Pad', type='فرامل',
+                 quantity=3, cost_price=20, selling_price=30),
+        ])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def assertMatchesAggregate(self):
+        expected = dict(self.session.execute(AGGREGATE_STATS_SQL).first()._mapping)
+        stats = self.stats.get_stats()
+        for key, value in expected.items():
+            self.assertAlmostEqual(stats[key], value)
+
+    def test_stats_after_insert(self):
+        stats = self.stats.get_stats()
+        self.assertEqual(stats['part_count'], 2)
+        self.assertEqual(stats['total_quantity'], 13)
+        self.assertEqual(stats['low_stock_count'], 1)
+        self.assertAlmostEqual(stats['total_value'], 110)
+
+    def test_stats_follow_updates(self):
+        part = self.session.query(Part).filter_by(part_number='P001').first()
+        part.quantity = 4
+        part.cost_price = 6
+        self.session.commit()
+
+        stats = self.stats.get_stats()
+        self.assertEqual(stats['total_quantity'], 7)
+        self.assertEqual(stats['low_stock_count'], 2)
+        self.assertAlmostEqual(stats['total_value'], 84)
+        self.assertMatchesAggregate()
+
+    def test_stats_follow_deletes(self):
+        part = self.session.query(Part).filter_by(part_number='P002').first()
+        self.session.delete(part)
+        self.session.commit()
+
+        stats = self.stats.get_stats()
+        self.assertEqual(stats['part_count'], 1)
+        self.assertEqual(stats['low_stock_count'], 0)
+        self.assertMatchesAggregate()
+
+    def test_rebuild(self):
+        self.session.execute(text("UPDATE inventory_stats SET part_count = 99"))
+        self.session.commit()
+
+        self.assertTrue(self.stats.rebuild())
+        self.assertMatchesAggregate()
+
+    def test_missing_summary_falls_back_to_aggregate(self):
+        self.session.execute(text("DROP TABLE inventory_stats"))
+        self.session.commit()
+        self.assertMatchesAggregate()
+        self.assertEqual(self.stats.get_stats()['part_count'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
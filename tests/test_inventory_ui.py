@@ -0,0 +1,64 @@
+import os
+import pytest
+from PyQt5.QtWidgets import QDialog
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+from database.models import Part
+from tests.conftest import setup_test_db, cleanup_test_db
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from gui import inventory_ui
+from gui.inventory_ui import AddPartDialog, InventoryUI
+
+pytestmark = [
+    pytest.mark.ui,
+]
+
+@pytest.fixture
+def test_session(monkeypatch):
+    session, engine = setup_test_db()
+    session.add(Part(part_number='P001', name='Brake Pad', type='فرامل',
+                     quantity=10, cost_price=20, selling_price=30))
+    session.commit()
+    monkeypatch.setattr(inventory_ui, 'Session', sessionmaker(bind=engine))
+    monkeypatch.setattr(InventoryUI, 'show_message', lambda *args: None)
+    yield session
+    session.close()
+    engine.dispose()
+    cleanup_test_db()
+
+class TestEditPart:
+    def test_sale_during_edit_dialog_is_kept(self, qtbot, monkeypatch, test_session):
+        window = InventoryUI()
+        qtbot.addWidget(window)
+
+        def edit_while_selling(dialog):
+            # بيع من جهاز آخر أثناء فتح النافذة (لا توجد جلسة مفتوحة تمنعه)
+            test_session.execute(
+                update(Part).where(Part.part_number == 'P001').values(quantity=Part.quantity - 3)
+            )
+            test_session.commit()
+            dialog.name.setText('Brake Pad Set')
+            dialog.quantity.setText('12')
+            return QDialog.Accepted
+
+        monkeypatch.setattr(AddPartDialog, 'exec_', edit_while_selling)
+        window.edit_part(window.parts_model.index(0, 0))
+
+        test_session.expire_all()
+        part = test_session.query(Part).filter_by(part_number='P001').one()
+        assert part.name == 'Brake Pad Set'
+        # 10 - 3 مباعة + 2 أضافها المستخدم
+        assert part.quantity == 9
+
+    def test_cancelled_dialog_changes_nothing(self, qtbot, monkeypatch, test_session):
+        window = InventoryUI()
+        qtbot.addWidget(window)
+        monkeypatch.setattr(AddPartDialog, 'exec_', lambda dialog: QDialog.Rejected)
+
+        window.edit_part(window.parts_model.index(0, 0))
+
+        test_session.expire_all()
+        part = test_session.query(Part).filter_by(part_number='P001').one()
+        assert (part.name, part.quantity) == ('Brake Pad', 10)
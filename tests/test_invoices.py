@@ -0,0 +1,122 @@
+import unittest
+from sqlalchemy import event
+from app.part_cache import part_cache
+from app.sales import SalesManager
+from database.models import Part, Sale, Invoice
+from tests.conftest import setup_test_db, cleanup_test_db
+
+class TestInvoices(unittest.TestCase):
+    """اختبار الفواتير متعددة القطع"""
+
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.session.add_all([
+            Part(part_number='P001', name='Brake Pad', type='فرامل',
+                 quantity=10, cost_price=20, selling_price=30),
+            Part(part_number='P002', name='Oil Filter', type='فلاتر',
+                 quantity=5, cost_price=8, selling_price=12),
+        ])
+        self.session.commit()
+        self.sales_manager = SalesManager(self.session)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def get_quantity(self, part_number):
+        self.session.expire_all()
+        return self.session.query(Part).filter_by(part_number=part_number).one().quantity
+
+    def test_cart_loads_parts_in_one_query(self):
+        self.session.add_all([
+            Part(part_number=f'R{i:03d}', name=f'Repair Part {i}', type='أخرى',
+                 quantity=10, cost_price=5, selling_price=8)
+            for i in range(20)
+        ])
+        self.session.commit()
+        part_cache.clear()
+
+        statements = []
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(' '.join(statement.split()))
+        event.listen(self.engine, 'before_cursor_execute', capture)
+        try:
+            success, message = self.sales_manager.create_invoice(
+                [(f'R{i:03d}', 1, 8) for i in range(20)]
+            )
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', capture)
+        self.assertTrue(success, message)
+
+        first_write = next(
+            index for index, statement in enumerate(statements)
+            if statement.startswith('UPDATE')
+        )
+        reads = [statement for statement in statements[:first_write]
+                 if statement.startswith('SELECT') and 'FROM parts' in statement]
+        self.assertEqual(len(reads), 1)
+        self.assertIn(' IN (', reads[0])
+        # الخصم يعيد السجل الجديد فلا توجد قراءات للقطع أثناء الكتابة
+        self.assertEqual(
+            [statement for statement in statements[first_write:]
+             if statement.startswith('SELECT') and 'FROM parts' in statement],
+            []
+        )
+
+    def test_create_invoice(self):
+        success, message = self.sales_manager.create_invoice([
+            ('P001', 2, 30),
+            ('P002', 3, 12),
+        ])
+        self.assertTrue(success, message)
+
+        invoice = self.session.query(Invoice).one()
+        self.assertEqual(len(invoice.sales), 2)
+        self.assertEqual(invoice.total_amount, 2 * 30 + 3 * 12)
+        self.assertEqual(invoice.total_profit, 2 * 10 + 3 * 4)
+        self.assertEqual(self.get_quantity('P001'), 8)
+        self.assertEqual(self.get_quantity('P002'), 2)
+
+    def test_repeated_part_uses_total_quantity(self):
+        success, _ = self.sales_manager.create_invoice([
+            ('P002', 3, 12),
+            ('P002', 3, 12),
+        ])
+        self.assertFalse(success)
+        self.assertEqual(self.get_quantity('P002'), 5)
+        self.assertEqual(self.session.query(Sale).count(), 0)
+
+    def test_invalid_line_rejects_whole_invoice(self):
+        success, message = self.sales_manager.create_invoice([
+            ('P001', 2, 30),
+            ('P999', 1, 10),
+        ])
+        self.assertFalse(success)
+        self.assertIn('P999', message)
+        self.assertEqual(self.get_quantity('P001'), 10)
+        self.assertEqual(self.session.query(Invoice).count(), 0)
+
+    def test_return_from_invoice(self):
+        self.sales_manager.create_invoice([('P001', 2, 30), ('P002', 3, 12)])
+        invoice = self.session.query(Invoice).one()
+        line = self.session.query(Sale).filter_by(part_id=invoice.sales[1].part_id).one()
+
+        success, message = self.sales_manager.return_sale(line.id, 1)
+        self.assertTrue(success, message)
+
+        self.session.expire_all()
+        invoice = self.session.query(Invoice).one()
+        # المرتجع سطر في نفس الفاتورة فيبقى الإجمالي مساوياً لمجموع الأسطر
+        self.assertEqual(len(invoice.sales), 3)
+        self.assertEqual(invoice.total_amount, 2 * 30 + 2 * 12)
+        self.assertEqual(invoice.total_amount,
+                         sum(sale.selling_price * sale.quantity for sale in invoice.sales))
+        self.assertEqual(self.get_quantity('P002'), 3)
+
+    def test_empty_invoice(self):
+        success, _ = self.sales_manager.create_invoice([])
+        self.assertFalse(success)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from database import migrations
+from database.migrations import migrate, get_schema_version, LATEST_VERSION
+
+TEST_DB = 'test_migrations.db'
+
+# مخطط قديم قبل إضافة الفواتير والملخصات والفهارس
+OLD_SCHEMA = [
+    """
+    CREATE TABLE parts (
+        id INTEGER PRIMARY KEY, part_number VARCHAR(50) NOT NULL UNIQUE,
+        name VARCHAR(100) NOT NULL, type VARCHAR(50), quantity INTEGER,
+        cost_price FLOAT NOT NULL, selling_price FLOAT
+    )
+    """,
+    """
+    CREATE TABLE sales (
+        id INTEGER PRIMARY KEY, part_id INTEGER NOT NULL REFERENCES parts(id),
+        quantity INTEGER NOT NULL, selling_price FLOAT NOT NULL,
+        sale_date DATETIME, profit FLOAT
+    )
+    """,
+    """
+    CREATE TABLE workers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, phone TEXT NOT NULL,
+        salary INTEGER NOT NULL, status TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL, updated_at TIMESTAMP NOT NULL
+    )
+    """,
+    "INSERT INTO parts VALUES (1, 'P001', 'Brake Pad', NULL, 10, 20, 30)",
+    "INSERT INTO parts VALUES (2, 'P002', 'بطّارية', NULL, 4, 50, 70)",
+    "INSERT INTO workers VALUES (1, 'أحمد', '0', 0, 'نشط', '2024-01-01', '2024-01-01')",
+    "INSERT INTO sales VALUES (1, 1, 2, 30, '2024-03-01 10:00:00.000000', 20)",
+]
+
+class TestMigrations(unittest.TestCase):
+    """اختبار ترقية قاعدة بيانات قديمة إلى آخر إصدار"""
+
+    def setUp(self):
+        self.engine = create_engine(f'sqlite:///{TEST_DB}')
+        with self.engine.begin() as connection:
+            for statement in OLD_SCHEMA:
+                connection.exec_driver_sql(statement)
+
+    def tearDown(self):
+        self.engine.dispose()
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
+
+    def get_names(self, connection, kind):
+        return {row[0] for row in connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = ?", (kind,)
+        )}
+
+    def test_migrate_old_database(self):
+        with self.engine.begin() as connection:
+            self.assertEqual(get_schema_version(connection), 0)
+            self.assertEqual(migrate(connection), LATEST_VERSION)
+
+        with self.engine.connect() as connection:
+            self.assertEqual(get_schema_version(connection), LATEST_VERSION)
+            self.assertTrue({'idx_sales_sale_date', 'idx_sales_part_id', 'idx_sales_invoice_id',
+                             'idx_parts_barcode', 'idx_parts_name_key', 'idx_workers_name_key',
+                             'idx_sales_return_of_id'}
+                            <= self.get_names(connection, 'index'))
+            self.assertTrue({'parts_fts', 'inventory_stats', 'daily_sales_summary'}
+                            <= self.get_names(connection, 'table'))
+
+            summary = connection.exec_driver_sql(
+                "SELECT sale_day, quantity, revenue FROM daily_sales_summary"
+            ).all()
+            self.assertEqual([tuple(row) for row in summary], [('2024-03-01', 2, 60.0)])
+
+    def test_name_search_keys(self):
+        with self.engine.begin() as connection:
+            migrate(connection)
+
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql(
+                "SELECT name_key FROM workers").scalar(), 'احمد')
+            # فهرس البحث أعيد بناؤه على مفتاح الاسم
+            found = connection.exec_driver_sql(
+                "SELECT rowid FROM parts_fts WHERE parts_fts MATCH '\"بطاريه\"'"
+            ).all()
+            self.assertEqual([row[0] for row in found], [2])
+
+    def test_migrate_is_idempotent(self):
+        with self.engine.begin() as connection:
+            migrate(connection)
+        with self.engine.begin() as connection:
+            self.assertEqual(migrate(connection), LATEST_VERSION)
+
+    def test_failed_migration_is_rolled_back(self):
+        def broken(connection):
+            connection.exec_driver_sql("CREATE TABLE half_done (id INTEGER)")
+            connection.exec_driver_sql("SELECT missing FROM parts")
+
+        steps = migrations.MIGRATIONS[:1] + [(2, broken)]
+        with mock.patch.object(migrations, 'MIGRATIONS', steps):
+            with self.assertRaises(OperationalError):
+                with self.engine.begin() as connection:
+                    migrate(connection)
+
+        with self.engine.connect() as connection:
+            # الترقية الأولى نجحت وبقيت، والفاشلة أُلغيت مع رقم إصدارها
+            self.assertEqual(get_schema_version(connection), 1)
+            self.assertNotIn('half_done', self.get_names(connection, 'table'))
+
+    def test_missing_fts5_is_skipped(self):
+        with mock.patch('database.db_setup.fts5_available', return_value=False):
+            with self.engine.begin() as connection:
+                self.assertEqual(migrate(connection), LATEST_VERSION)
+
+        with self.engine.connect() as connection:
+            tables = self.get_names(connection, 'table')
+            self.assertNotIn('parts_fts', tables)
+            self.assertIn('inventory_stats', tables)
+
+if __name__ == '__main__':
+    unittest.main()
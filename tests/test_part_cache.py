@@ -0,0 +1,120 @@
+import unittest
+from sqlalchemy import update
+from app.part_cache import PartCache, part_cache
+from app.inventory import InventoryManager
+from app.sales import SalesManager
+from database.models import Part, Sale
+from tests.conftest import setup_test_db, cleanup_test_db
+
+class TestPartCache(unittest.TestCase):
+    """اختبار الذاكرة المؤقتة لسجلات القطع"""
+
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.session.add_all([
+            Part(part_number=f'P00{i}', name=f'Part {i}', type='محرك',
+                 quantity=5, cost_price=10, selling_price=15)
+            for i in range(1, 4)
+        ])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def set_quantity(self, part_number, quantity):
+        """تغيير المخزون مباشرة كما يفعل جهاز بيع آخر"""
+        self.session.execute(
+            update(Part).where(Part.part_number == part_number).values(quantity=quantity)
+        )
+        self.session.commit()
+
+    def test_counts_hits_and_misses(self):
+        cache = PartCache(max_size=10, ttl=60, enabled=True)
+        self.assertEqual(cache.get(self.session, 'P001').name, 'Part 1')
+        self.assertEqual(cache.get(self.session, 'P001').name, 'Part 1')
+        self.assertIsNone(cache.get(self.session, 'MISSING'))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 2, 1))
+        self.assertEqual(stats['hit_rate'], 0.333)
+
+    def test_get_many_serves_hits_and_loads_misses(self):
+        cache = PartCache(max_size=10, ttl=60, enabled=True)
+        cache.get(self.session, 'P001')
+        found = cache.get_many(self.session, ['P001', 'P002', 'P003', 'MISSING'])
+
+        self.assertEqual(sorted(found), ['P001', 'P002', 'P003'])
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 4, 3))
+
+    def test_evicts_least_recently_used(self):
+        cache = PartCache(max_size=2, ttl=60, enabled=True)
+        cache.get(self.session, 'P001')
+        cache.get(self.session, 'P002')
+        cache.get(self.session, 'P001')
+        cache.get(self.session, 'P003')
+
+        self.assertEqual(cache.stats()['evictions'], 1)
+        cache.get(self.session, 'P001')
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_expired_and_disabled_entries_are_reloaded(self):
+        expiring = PartCache(max_size=10, ttl=0, enabled=True)
+        expiring.get(self.session, 'P001')
+        self.set_quantity('P001', 9)
+        self.assertEqual(expiring.get(self.session, 'P001').quantity, 9)
+
+        disabled = PartCache(max_size=10, ttl=60, enabled=False)
+        disabled.get(self.session, 'P001')
+        self.assertEqual(disabled.stats()['size'], 0)
+
+    def test_writes_invalidate_cached_parts(self):
+        inventory = InventoryManager(self.session)
+        self.assertEqual(inventory.get_part_by_number('P001').quantity, 5)
+
+        success, _ = SalesManager(self.session).create_sale('P001', 2, 15)
+        self.assertTrue(success)
+        self.assertEqual(inventory.get_part_by_number('P001').quantity, 3)
+
+        inventory.update_part('P001', {
+            'part_number': 'P001', 'name': 'Oil Filter', 'type': 'محرك',
+            'quantity': 3, 'cost_price': 10, 'selling_price': 20,
+        })
+        self.assertEqual(inventory.get_part_by_number('P001').name, 'Oil Filter')
+
+        inventory.delete_part('P002')
+        self.assertIsNone(inventory.get_part_by_number('P002'))
+
+    def test_sale_rereads_stale_stock(self):
+        self.assertEqual(part_cache.get(self.session, 'P003').quantity, 5)
+        self.set_quantity('P003', 20)
+
+        success, _ = SalesManager(self.session).create_sale('P003', 10, 15)
+        self.assertTrue(success)
+        self.assertEqual(part_cache.get(self.session, 'P003').quantity, 10)
+
+    def test_sale_profit_uses_current_cost_price(self):
+        self.assertEqual(part_cache.get(self.session, 'P001').cost_price, 10)
+        # جهاز آخر يغير سعر التكلفة والسجل القديم ما زال في الذاكرة المؤقتة
+        self.session.execute(
+            update(Part).where(Part.part_number == 'P001').values(cost_price=12)
+        )
+        self.session.commit()
+
+        success, _ = SalesManager(self.session).create_sale('P001', 2, 15)
+        self.assertTrue(success)
+        self.assertEqual(self.session.query(Sale.profit).scalar(), 6)
+
+    def test_sale_updates_cached_part_in_place(self):
+        part_cache.get(self.session, 'P002')
+        misses = part_cache.stats()['misses']
+
+        success, _ = SalesManager(self.session).create_sale('P002', 2, 15)
+        self.assertTrue(success)
+        self.assertEqual(part_cache.get(self.session, 'P002').quantity, 3)
+        self.assertEqual(part_cache.stats()['misses'], misses)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import csv
+import tempfile
+import unittest
+from sqlalchemy import text
+from app.part_import import PartImporter
+from app.inventory_stats import InventoryStats
+from app.search import PartSearch
+from database.models import Part
+from tests.conftest import setup_test_db, cleanup_test_db
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+HEADER = ["رقم القطعة", "اسم القطعة", "النوع", "الكمية", "سعر التكلفة", "سعر البيع"]
+
+class TestPartImporter(unittest.TestCase):
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.importer = PartImporter(self.session, batch_size=2)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        self.session.add(Part(part_number='P001', name='Existing', type='أخرى',
+                              quantity=1, cost_price=1, selling_price=2))
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+        self.tmp_dir.cleanup()
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmp_dir.name, 'parts.csv')
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+        return path
+
+    def test_import_csv(self):
+        path = self.write_csv([
+            ['P002', 'Oil Filter', 'فلاتر', '10', '5', '8'],
+            ['P001', 'Duplicate of existing', 'فلاتر', '1', '5', '8'],
+            ['P003', 'Brake Pad', 'فرامل', '4', '20', '30'],
+            ['P003', 'Duplicate in file', 'فرامل', '4', '20', '30'],
+            [],
+            ['P004', '', 'فرامل', '4', '20', '30'],
+            ['P005', 'Bad price', 'فرامل', 'x', '20', '30'],
+            ['P006', 'Spark Plug', '', '7', '3', '4'],
+        ])
+
+        result = self.importer.import_file(path)
+
+        self.assertEqual(result['imported'], 3)
+        self.assertEqual(
+            [(line, number) for line, number, _ in result['rejected']],
+            [(3, 'P001'), (5, 'P003'), (7, 'P004'), (8, 'P005')]
+        )
+        self.assertEqual(result['rejected'][0][2], "رقم القطعة موجود مسبقاً")
+        self.assertEqual(result['rejected'][2][2], "اسم القطعة مطلوب")
+        self.assertEqual(self.session.query(Part).count(), 4)
+
+        # المشغلات تحدث فهرس البحث وملخص المخزون أثناء الإدراج بالجملة
+        self.assertEqual(PartSearch(self.session).search('Spark')[0].part_number, 'P006')
+        self.assertEqual(InventoryStats(self.session).get_stats()['part_count'], 4)
+
+    def test_import_uses_bulk_load_profile(self):
+        seen = []
+
+        def rows():
+            for number in ('P010', 'P011', 'P012'):
+                seen.append(self.session.execute(text("PRAGMA synchronous")).scalar())
+                yield 2, {'part_number': number, 'name': 'Filter', 'type': 'فلاتر',
+                          'quantity': '1', 'cost_price': '5', 'selling_price': '8'}
+
+        result = self.importer.import_rows(rows())
+
+        self.assertEqual(result['imported'], 3)
+        self.assertEqual(set(seen), {0})  # OFF أثناء الاستيراد
+        # إعادة ملف التخزين الحالي بعد الاستيراد
+        self.assertEqual(self.session.execute(text("PRAGMA synchronous")).scalar(), 2)
+
+    def test_unsupported_file(self):
+        with self.assertRaises(ValueError):
+            self.importer.import_file(os.path.join(self.tmp_dir.name, 'parts.txt'))
+
+    @unittest.skipIf(openpyxl is None, "openpyxl not installed")
+    def test_import_xlsx(self):
+        path = os.path.join(self.tmp_dir.name, 'parts.xlsx')
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['part_number', 'name', 'type', 'quantity', 'cost_price', 'selling_price'])
+        sheet.append([12345, 'Air Filter', 'فلاتر', 3, 6.5, 9])
+        sheet.append(['P001', 'Duplicate', 'فلاتر', 3, 6.5, 9])
+        workbook.save(path)
+
+        result = self.importer.import_file(path)
+
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(len(result['rejected']), 1)
+        part = self.session.query(Part).filter_by(part_number='12345').first()
+        self.assertEqual(part.quantity, 3)
+        self.assertEqual(part.cost_price, 6.5)
+
+if __name__ == '__main__':
+    unittest.main()
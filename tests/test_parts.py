@@ -13,7 +13,7 @@ class TestPartsManager(unittest.TestCase):
     def test_search_parts_with_term(self):
         """Test searching parts with a valid search term."""
         part_mock = MagicMock()
-        self.parts_manager.session.query.return_value.filter.return_value.all.return_value = [part_mock]
+        self.parts_manager.session.query.return_value.from_statement.return_value.params.return_value.all.return_value = [part_mock]
 
         result = self.parts_manager.search_parts("Brake")
         self.assertEqual(len(result), 1)
@@ -30,11 +30,12 @@ class TestPartsManager(unittest.TestCase):
 
     def test_get_part_by_number_found(self):
         """Test retrieving a part by part number when it exists."""
-        part_mock = MagicMock()
-        self.parts_manager.session.query.return_value.filter_by.return_value.first.return_value = part_mock
+        row = (1, "12345", "Brake Pad", "Brakes", 10, 50.0, 70.0)
+        self.parts_manager.session.query.return_value.filter_by.return_value.first.return_value = row
 
         result = self.parts_manager.get_part_by_number("12345")
         self.assertIsNotNone(result)
+        self.assertEqual(result.quantity, 10)
         self.parts_manager.session.query.assert_called_once()
 
     def test_get_part_by_number_not_found(self):
@@ -0,0 +1,91 @@
+import os
+import pytest
+from PyQt5.QtCore import Qt, QModelIndex
+from sqlalchemy.orm import sessionmaker
+from database.models import Part
+from tests.conftest import setup_test_db, cleanup_test_db
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from gui.parts_table_model import PartsTableModel, PART_NUMBER, QUANTITY
+
+pytestmark = [
+    pytest.mark.ui,
+]
+
+COLUMNS = [
+    ("رقم القطعة", lambda row: row[PART_NUMBER]),
+    ("الكمية", lambda row: str(row[QUANTITY])),
+]
+
+@pytest.fixture
+def test_session():
+    session, engine = setup_test_db()
+    session.add_all([
+        Part(part_number=f'P{i:05d}', name=f'Part {i}', type='أخرى',
+             quantity=i, cost_price=1, selling_price=2)
+        for i in range(1, 251)
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+    cleanup_test_db()
+
+class TestPartsTableModel:
+    def test_loads_first_page_only(self, qapp, test_session):
+        model = PartsTableModel(COLUMNS, page_size=100)
+        model.load_from_session(test_session)
+
+        assert model.rowCount() == 100
+        assert model.columnCount() == 2
+        assert model.canFetchMore(QModelIndex())
+
+    def test_fetch_more_pages_until_exhausted(self, qapp, test_session):
+        model = PartsTableModel(COLUMNS, page_size=100)
+        model.load_from_session(test_session)
+
+        while model.canFetchMore(QModelIndex()):
+            model.fetchMore(QModelIndex())
+
+        assert model.rowCount() == 250
+        assert model.part_number_at(249) == 'P00250'
+        assert len({model.part_number_at(row) for row in range(250)}) == 250
+
+    def test_load_from_factory_uses_a_short_session_per_page(self, qapp, test_session):
+        factory = sessionmaker(bind=test_session.get_bind())
+        opened = []
+
+        def session_factory():
+            session = factory()
+            opened.append(session)
+            return session
+
+        model = PartsTableModel(COLUMNS, page_size=100)
+        model.load_from_factory(session_factory)
+        while model.canFetchMore(QModelIndex()):
+            model.fetchMore(QModelIndex())
+
+        assert model.rowCount() == 250
+        assert len(opened) == 3
+        assert not any(session.in_transaction() for session in opened)
+
+    def test_formats_cells_on_demand(self, qapp, test_session):
+        model = PartsTableModel(COLUMNS, page_size=100)
+        model.load_from_session(test_session)
+
+        index = model.index(4, 1)
+        assert model.data(index) == '5'
+        assert model.data(index, Qt.TextAlignmentRole) == Qt.AlignCenter
+        assert model.headerData(0, Qt.Horizontal) == "رقم القطعة"
+
+    def test_set_parts_from_search_results(self, qapp, test_session):
+        parts = test_session.query(Part).filter(Part.quantity <= 3).all()
+        model = PartsTableModel(COLUMNS, page_size=2)
+        model.set_parts(parts)
+
+        assert model.rowCount() == 2
+        model.fetchMore(QModelIndex())
+        assert model.rowCount() == 3
+        assert not model.canFetchMore(QModelIndex())
+        assert model.part_number_at(3) is None
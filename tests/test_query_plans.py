@@ -0,0 +1,55 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.sales_reports import SalesReports
+from database.models import Part, Sale
+from tests.conftest import setup_test_db, cleanup_test_db
+
+class TestReportQueryPlans(unittest.TestCase):
+    """التأكد من أن استعلامات التقارير تستخدم الفهارس ولا تمسح الجداول بالكامل"""
+
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        part = Part(part_number='P001', name='Brake Pad', quantity=100,
+                    cost_price=20, selling_price=30)
+        self.session.add(part)
+        self.session.commit()
+        self.session.add(Sale(part_id=part.id, quantity=1, selling_price=30,
+                              sale_date=datetime.now(), profit=10))
+        self.session.commit()
+        self.sales_reports = SalesReports(self.session)
+        self.statements = []
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def capture(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def run_reports(self):
+        now = datetime.now()
+        event.listen(self.engine, 'before_cursor_execute', self.capture)
+        try:
+            self.sales_reports.get_daily_report(now)
+            self.sales_reports.get_monthly_report(now.year, now.month)
+            self.sales_reports.get_best_selling_parts(now - timedelta(days=7), now)
+            self.sales_reports.get_profit_analysis(now - timedelta(days=7), now)
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', self.capture)
+
+    def test_report_queries_use_indexes(self):
+        self.run_reports()
+        self.assertTrue(self.statements)
+
+        dbapi_connection = self.session.connection().connection.dbapi_connection
+        for statement, parameters in self.statements:
+            plan = [row[3] for row in dbapi_connection.execute(
+                "EXPLAIN QUERY PLAN " + statement, parameters
+            )]
+            scans = [detail for detail in plan if detail.startswith('SCAN')]
+            self.assertEqual(scans, [], f"{statement}\n{plan}")
+
+if __name__ == '__main__':
+    unittest.main()
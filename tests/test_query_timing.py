@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine, text
+from database.connection import ConnectionPool
+from database.query_timing import (TimingStats, LatencyHistogram, instrument_engine,
+                                   timed_action, current_action, dump_timings,
+                                   parameters_shape, stats)
+from tests.conftest import setup_test_attendance_db, cleanup_test_db, TEST_SQLITE_DB
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_and_percentiles(self):
+        histogram = LatencyHistogram()
+        for duration in (0.5, 0.7, 3, 4, 40, 6000):
+            histogram.add(duration)
+        summary = histogram.to_dict()
+        self.assertEqual(summary['count'], 6)
+        self.assertEqual(summary['buckets'], {'<=1ms': 2, '<=5ms': 2, '<=50ms': 1, '>5000ms': 1})
+        self.assertEqual(summary['p50_ms'], 5)
+        self.assertEqual(summary['max_ms'], 6000)
+
+    def test_parameters_shape_hides_values(self):
+        self.assertEqual(parameters_shape(('secret', 1)), "2 values")
+        self.assertEqual(parameters_shape({'name': 'secret'}), "{name}")
+        self.assertEqual(parameters_shape([(1,), (2,)], executemany=True), "2 rows")
+        self.assertEqual(parameters_shape(()), "none")
+
+class TestQueryTiming(unittest.TestCase):
+    """اختبار قياس زمن الاستعلامات"""
+
+    def setUp(self):
+        setup_test_attendance_db()
+        stats.reset()
+        self.slow_query_ms = stats.slow_query_ms
+
+    def tearDown(self):
+        stats.slow_query_ms = self.slow_query_ms
+        stats.reset()
+        cleanup_test_db()
+
+    def test_sqlalchemy_queries_are_recorded(self):
+        engine = create_engine(f"sqlite:///{TEST_SQLITE_DB}")
+        instrument_engine(engine)
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT COUNT(*) FROM workers WHERE status = :status"),
+                             {'status': 'نشط'})
+        engine.dispose()
+
+        queries = stats.snapshot()['queries']
+        self.assertEqual(queries["SELECT COUNT(*) FROM workers WHERE status = ?"]['count'], 3)
+
+    def test_raw_queries_are_recorded(self):
+        pool = ConnectionPool(TEST_SQLITE_DB)
+        conn = pool.acquire()
+        conn.execute("SELECT name FROM workers WHERE id = ?", (1,)).fetchone()
+        conn.cursor().execute("SELECT name FROM workers WHERE id = ?", (2,)).fetchone()
+        conn.close()
+        pool.close()
+
+        queries = stats.snapshot()['queries']
+        self.assertEqual(queries["SELECT name FROM workers WHERE id = ?"]['count'], 2)
+
+    def test_slow_query_logged_with_action(self):
+        stats.slow_query_ms = 0
+        pool = ConnectionPool(TEST_SQLITE_DB)
+        conn = pool.acquire()
+        with self.assertLogs('mahalli', level='WARNING') as logs:
+            with timed_action('workers.refresh_table'):
+                self.assertEqual(current_action(), 'workers.refresh_table')
+                conn.execute("SELECT * FROM workers WHERE salary > ?", (1000,)).fetchall()
+        conn.close()
+        pool.close()
+
+        self.assertIsNone(current_action())
+        message = logs.output[0]
+        self.assertIn("action=workers.refresh_table", message)
+        self.assertIn("params=1 values", message)
+        self.assertNotIn("1000", message)
+        self.assertIn('workers.refresh_table', stats.snapshot()['actions'])
+
+    def test_decorated_slot_ignores_extra_signal_arguments(self):
+        class Screen:
+            @timed_action('screen.refresh')
+            def refresh(self):
+                return current_action()
+
+        self.assertEqual(Screen().refresh(False), 'screen.refresh')
+        self.assertEqual(stats.snapshot()['actions']['screen.refresh']['count'], 1)
+
+    def test_dump_timings(self):
+        stats.record_query("SELECT 1", None, 0.003)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'timings.json')
+            dump_timings(path)
+            with open(path, encoding='utf-8') as timings_file:
+                dumped = json.load(timings_file)
+        self.assertEqual(dumped['queries']['SELECT 1']['buckets'], {'<=5ms': 1})
+
+    def test_disabled_stats_record_nothing(self):
+        disabled = TimingStats()
+        disabled.enabled = False
+        disabled.record_query("SELECT 1", None, 1.0)
+        self.assertEqual(disabled.snapshot(), {'queries': {}, 'actions': {}})
+
+if __name__ == '__main__':
+    unittest.main()
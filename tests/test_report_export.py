@@ -0,0 +1,117 @@
+import csv
+import os
+import tracemalloc
+import unittest
+from datetime import datetime, timedelta
+from app.report_export import ReportExporter, EXPORT_HEADERS
+from database.models import Part, Sale
+from tests.conftest import setup_test_db, cleanup_test_db
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+TEST_CSV = 'test_report_export.csv'
+TEST_XLSX = 'test_report_export.xlsx'
+FIRST_DAY = datetime(2024, 1, 1)
+
+class TestReportExport(unittest.TestCase):
+    """اختبار تصدير التقارير مباشرة من قاعدة البيانات"""
+
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        part = Part(part_number='P001', name='فحمات فرامل', type='فرامل',
+                    quantity=10000, cost_price=20, selling_price=30)
+        self.session.add(part)
+        self.session.commit()
+        # عملية بيع كل 6 ساعات لمدة سنة
+        self.session.execute(Sale.__table__.insert(), [
+            {'part_id': part.id, 'quantity': 2, 'selling_price': 30.5,
+             'sale_date': FIRST_DAY + timedelta(hours=6 * i), 'profit': 21}
+            for i in range(4 * 366)
+        ])
+        self.session.commit()
+        self.exporter = ReportExporter(self.session, batch_size=100)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+        for path in (TEST_CSV, TEST_XLSX):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read_csv(self):
+        with open(TEST_CSV, newline='', encoding='utf-8') as csv_file:
+            return list(csv.reader(csv_file))
+
+    def test_export_whole_year(self):
+        progress = []
+        written = self.exporter.export_csv(
+            TEST_CSV, FIRST_DAY, datetime(2025, 1, 1),
+            progress=lambda done, total: progress.append((done, total))
+        )
+
+        self.assertEqual(written, 4 * 366)
+        rows = self.read_csv()
+        self.assertEqual(rows[0], ['﻿' + EXPORT_HEADERS[0]] + EXPORT_HEADERS[1:])
+        self.assertEqual(rows[1], ['P001', 'فحمات فرامل', 'فرامل', '2', '30.5', '21.0', '2024-01-01 00:00'])
+        self.assertEqual(len(rows), 4 * 366 + 1)
+
+        # التقدم يُبلغ بعد كل دفعة
+        self.assertEqual(len(progress), 15)
+        self.assertEqual(progress[-1], (4 * 366, 4 * 366))
+
+    def test_export_single_day(self):
+        written = self.exporter.export_csv(TEST_CSV, datetime(2024, 2, 1), datetime(2024, 2, 2))
+
+        self.assertEqual(written, 4)
+        self.assertEqual([row[6] for row in self.read_csv()[1:]], [
+            '2024-02-01 00:00', '2024-02-01 06:00', '2024-02-01 12:00', '2024-02-01 18:00'
+        ])
+
+    def test_rows_are_streamed_in_batches(self):
+        batches = list(self.exporter.sales_reports.iter_report_rows(
+            FIRST_DAY, datetime(2025, 1, 1), batch_size=100
+        ))
+        self.assertTrue(all(len(batch) <= 100 for batch in batches))
+        self.assertEqual(sum(len(batch) for batch in batches), 4 * 366)
+
+    @unittest.skipIf(load_workbook is None, "openpyxl not installed")
+    def test_export_xlsx(self):
+        progress = []
+        written = self.exporter.export_xlsx(
+            TEST_XLSX, datetime(2024, 2, 1), datetime(2024, 3, 1), "تقرير شهري",
+            progress=lambda done, total: progress.append((done, total))
+        )
+        self.assertEqual(written, 4 * 29)
+        self.assertEqual(progress[-1], (4 * 29, 4 * 29))
+
+        workbook = load_workbook(TEST_XLSX, read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        workbook.close()
+
+        self.assertEqual(rows[0][0], "تقرير شهري")
+        self.assertEqual(rows[1][0], "2024-02-01 - 2024-02-29")
+        self.assertEqual(list(rows[5]), EXPORT_HEADERS)
+        # الخلايا الرقمية والتواريخ تكتب بأنواعها وليس كنصوص
+        self.assertEqual(rows[6], ('P001', 'فحمات فرامل', 'فرامل', 2, 30.5, 21, datetime(2024, 2, 1)))
+        self.assertEqual(len(rows), 6 + 4 * 29)
+
+    @unittest.skipIf(load_workbook is None, "openpyxl not installed")
+    def test_xlsx_memory_does_not_grow_with_rows(self):
+        def peak_memory(end_date):
+            tracemalloc.start()
+            try:
+                self.exporter.export_xlsx(TEST_XLSX, FIRST_DAY, end_date)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small = peak_memory(FIRST_DAY + timedelta(days=50))
+        large = peak_memory(FIRST_DAY + timedelta(days=366))
+        self.assertLess(large, small * 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
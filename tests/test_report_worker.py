@@ -0,0 +1,96 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.orm import sessionmaker
+from database.models import Part, Sale
+from tests.conftest import setup_test_db, cleanup_test_db
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from gui import report_worker
+from gui.report_worker import ReportJobs
+
+pytestmark = [
+    pytest.mark.ui,
+]
+
+FIRST_DAY = datetime(2024, 3, 1)
+
+@pytest.fixture
+def test_session(monkeypatch):
+    session, engine = setup_test_db()
+    part = Part(part_number='P001', name='Brake Pad', type='فرامل',
+                quantity=1000, cost_price=20, selling_price=30)
+    session.add(part)
+    session.commit()
+    # عمليتا بيع في كل يوم من أيام مارس
+    session.add_all([
+        Sale(part_id=part.id, quantity=1 + hour % 2, selling_price=30,
+             sale_date=FIRST_DAY + timedelta(days=day, hours=hour),
+             profit=10 * (1 + hour % 2))
+        for day in range(31) for hour in (9, 14)
+    ])
+    session.commit()
+    monkeypatch.setattr(report_worker, 'Session', sessionmaker(bind=engine))
+    yield session
+    session.close()
+    engine.dispose()
+    cleanup_test_db()
+
+def day_range(day):
+    start = FIRST_DAY + timedelta(days=day)
+    return start, start + timedelta(days=1)
+
+class TestReportJobs:
+    def test_only_latest_period_is_built(self, qtbot, test_session):
+        jobs = ReportJobs(delay=50)
+        received = []
+        jobs.report_ready.connect(received.append)
+
+        # محاكاة التنقل السريع بين التواريخ
+        for day in range(10):
+            jobs.request(*day_range(day))
+
+        with qtbot.waitSignal(jobs.report_ready, timeout=3000):
+            pass
+        qtbot.wait(200)
+        jobs.shutdown()
+
+        assert len(received) == 1
+        report = received[0]
+        assert report['start_date'] == FIRST_DAY + timedelta(days=9)
+        assert len(report['rows']) == 2
+        assert report['totals']['items_sold'] == 3
+        assert report['totals']['total_sales'] == 90
+
+    def test_superseded_report_is_dropped(self, qtbot, test_session):
+        jobs = ReportJobs(delay=10, batch_size=5)
+        received = []
+        jobs.report_ready.connect(received.append)
+
+        jobs.request_now(FIRST_DAY, FIRST_DAY + timedelta(days=31))
+        jobs.request_now(*day_range(4))
+
+        qtbot.waitUntil(lambda: len(received) >= 1, timeout=3000)
+        qtbot.wait(200)
+        jobs.shutdown()
+
+        assert [report['start_date'] for report in received] == [FIRST_DAY + timedelta(days=4)]
+
+    def test_progress_and_rows(self, qtbot, test_session):
+        jobs = ReportJobs(batch_size=10)
+        progress = []
+        busy = []
+        jobs.progress_changed.connect(progress.append)
+        jobs.busy_changed.connect(busy.append)
+
+        with qtbot.waitSignal(jobs.report_ready, timeout=3000) as blocker:
+            jobs.request_now(FIRST_DAY, FIRST_DAY + timedelta(days=31))
+        jobs.shutdown()
+
+        report = blocker.args[0]
+        assert len(report['rows']) == 62
+        assert report['rows'][0][:3] == ('P001', 'Brake Pad', 'فرامل')
+        assert progress[-1] == 100
+        assert progress == sorted(progress)
+        assert busy == [True, False]
@@ -1,7 +1,10 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from app.reports import AttendanceReports
+from app.reports import (AttendanceReports, ATTENDANCE_MATRIX_SQL,
+                         STATUS_CODES, NO_RECORD)
 import sqlite3
+from tests.conftest import setup_test_attendance_db, cleanup_test_db, TEST_SQLITE_DB as TEST_DB
+
 
 
 class TestAttendanceReports(unittest.TestCase):
@@ -9,7 +12,7 @@ class TestAttendanceReports(unittest.TestCase):
         """Set up the test class with an instance of AttendanceReports."""
         self.reports = AttendanceReports(db_path=":memory:")
 
-    @patch("app.reports.sqlite3.connect")
+    @patch("app.reports.get_connection")
     def test_generate_daily_report(self, mock_connect):
         """Test daily report generation."""
         mock_conn = MagicMock()
@@ -37,7 +40,7 @@ class TestAttendanceReports(unittest.TestCase):
         self.assertEqual(result[0]["name"], "John Doe")
         mock_connect.assert_called_once_with(":memory:")
 
-    @patch("app.reports.sqlite3.connect")
+    @patch("app.reports.get_connection")
     def test_generate_monthly_report(self, mock_connect):
         """Test monthly report generation."""
         mock_conn = MagicMock()
@@ -66,7 +69,7 @@ class TestAttendanceReports(unittest.TestCase):
         self.assertEqual(result[0]["absent_days"], 5)
         mock_connect.assert_called_once_with(":memory:")
 
-    @patch("app.reports.sqlite3.connect")
+    @patch("app.reports.get_connection")
     def test_calculate_salary(self, mock_connect):
         """Test salary calculation."""
         mock_conn = MagicMock()
@@ -95,5 +98,65 @@ class TestAttendanceReports(unittest.TestCase):
         self.reports = None
 
 
+class TestPayroll(unittest.TestCase):
+    """اختبار حساب رواتب كل العمال باستعلام واحد"""
+
+    def setUp(self):
+        setup_test_attendance_db()
+        self.reports = AttendanceReports(db_path=TEST_DB)
+
+    def tearDown(self):
+        cleanup_test_db()
+
+    def test_calculate_payroll(self):
+        payroll = self.reports.calculate_payroll(2024, 11)
+
+        self.assertEqual(payroll["name"], ["Ali", "Badr"])
+        self.assertEqual(list(payroll["absent_days"]), [1, 1])
+        self.assertEqual(list(payroll["late_days"]), [1, 0])
+        self.assertEqual(list(payroll["final_salary"]), [2875.0, 1450.0])
+
+    def test_payroll_matches_calculate_salary(self):
+        payroll = self.reports.calculate_payroll(2024, 11)
+
+        for index, worker_id in enumerate(payroll["worker_id"]):
+            salary = self.reports.calculate_salary(worker_id, 2024, 11)
+            self.assertAlmostEqual(payroll["final_salary"][index], salary["final_salary"])
+            self.assertAlmostEqual(payroll["absent_deduction"][index], salary["absent_deduction"])
+            self.assertAlmostEqual(payroll["late_deduction"][index], salary["late_deduction"])
+
+
+class TestAttendanceMatrix(unittest.TestCase):
+    """اختبار مصفوفة الحضور الشهرية (عامل × يوم)"""
+
+    def setUp(self):
+        setup_test_attendance_db()
+        self.reports = AttendanceReports(db_path=TEST_DB)
+
+    def tearDown(self):
+        cleanup_test_db()
+
+    def test_generate_attendance_matrix(self):
+        matrix = self.reports.generate_attendance_matrix(2024, 11)
+
+        self.assertEqual(matrix.shape, (2, 30))
+        self.assertEqual(matrix.names, ["Ali", "Badr"])
+        self.assertEqual(matrix[0, 1], STATUS_CODES["غائب"])
+        self.assertEqual(matrix[0, 2], STATUS_CODES["متأخر"])
+        self.assertEqual(matrix[0, 3], STATUS_CODES["حاضر"])
+        self.assertEqual(matrix[0, 4], NO_RECORD)
+        self.assertEqual(matrix[1, 30], STATUS_CODES["غائب"])
+        self.assertEqual(matrix.count(0, STATUS_CODES["غائب"]), 1)
+        self.assertEqual(len(matrix.codes), 60)
+
+    def test_matrix_query_uses_index(self):
+        conn = sqlite3.connect(TEST_DB)
+        plan = [row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN " + ATTENDANCE_MATRIX_SQL, ("2024-11-01", "2024-11-30")
+        )]
+        conn.close()
+        self.assertFalse([detail for detail in plan if detail.startswith("SCAN a")], plan)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+import threading
+import unittest
+from unittest import mock
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from app.sales import SalesManager
+from database.models import Part, Sale
+from tests.conftest import setup_test_db, cleanup_test_db
+
+THREADS = 8
+ATTEMPTS_PER_THREAD = 20
+STOCK = 50
+
+class TestConcurrentSales(unittest.TestCase):
+    """اختبار ضغط: عدة أجهزة بيع تبيع نفس القطعة في نفس الوقت"""
+
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.session.add(Part(part_number='P001', name='Brake Pad', type='فرامل',
+                              quantity=STOCK, cost_price=20, selling_price=30))
+        self.session.commit()
+        self.session_factory = sessionmaker(bind=self.engine)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def test_no_oversell_under_contention(self):
+        results = []
+        errors = []
+        lock = threading.Lock()
+        start = threading.Barrier(THREADS)
+
+        def terminal():
+            sales = SalesManager(self.session_factory())
+            try:
+                start.wait()
+                for _ in range(ATTEMPTS_PER_THREAD):
+                    success, message = sales.create_sale('P001', 1, 30)
+                    with lock:
+                        results.append(success)
+                        if not success and message != "الكمية المطلوبة غير متوفرة في المخزون":
+                            errors.append(message)
+            finally:
+                sales.close()
+
+        threads = [threading.Thread(target=terminal) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count(True), STOCK)
+
+        self.session.expire_all()
+        part = self.session.query(Part).filter_by(part_number='P001').one()
+        sold = self.session.query(func.sum(Sale.quantity)).scalar()
+        self.assertEqual(part.quantity, 0)
+        self.assertEqual(sold, STOCK)
+
+    def test_rejects_when_stock_changed_after_validation(self):
+        sales = SalesManager(self.session_factory())
+        validate_sale = sales.validate_sale
+        decrement_stock = sales.decrement_stock
+        decrements = []
+
+        def validate_then_sell_elsewhere(part, quantity, selling_price):
+            # التحقق ينجح بالكمية القديمة، ثم يبيع جهاز آخر معظم المخزون قبل الخصم
+            result = validate_sale(part, quantity, selling_price)
+            other = self.session_factory()
+            other.query(Part).filter_by(part_number='P001').update({'quantity': 2})
+            other.commit()
+            other.close()
+            return result
+
+        def record_decrement(part_id, quantity):
+            decrements.append(decrement_stock(part_id, quantity))
+            return decrements[-1]
+
+        with mock.patch.object(sales, 'validate_sale', side_effect=validate_then_sell_elsewhere), \
+             mock.patch.object(sales, 'decrement_stock', side_effect=record_decrement):
+            success, message = sales.create_sale('P001', 5, 30)
+
+        self.assertFalse(success)
+        self.assertEqual(message, "الكمية المطلوبة غير متوفرة في المخزون")
+        # الأمر المشروط لم يخصم شيئاً وأُلغيت المعاملة دون سجل بيع
+        self.assertEqual(decrements, [None])
+        self.assertFalse(sales.session.in_transaction())
+        self.assertEqual(sales.session.query(Sale).count(), 0)
+        self.assertEqual(
+            sales.session.query(Part.quantity).filter_by(part_number='P001').scalar(), 2
+        )
+        sales.close()
+
+if __name__ == '__main__':
+    unittest.main()
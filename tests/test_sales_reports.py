@@ -2,6 +2,7 @@ import unittest
 from datetime import datetime, timedelta
 from app.sales_reports import SalesReports
 from database.models import Part, Sale
+from database.queries import PartRow, SaleRow
 from tests.conftest import setup_test_db, cleanup_test_db
 
 class TestSalesReports(unittest.TestCase):
@@ -99,6 +100,18 @@ class TestSalesReports(unittest.TestCase):
         self.assertEqual(analysis['total_profit'], 750)
         self.assertGreater(analysis['profit_margin'], 0)
 
+    def test_reports_return_plain_rows(self):
+        report = self.sales_reports.get_daily_report(datetime.now())
+        self.assertEqual(report['sales'], [SaleRow(
+            'P001', 'Test Part', 'Test Type', 10, 150, 500, self.test_sales[0].sale_date
+        )])
+
+        best_part, total_quantity, _ = self.sales_reports.get_best_selling_parts(
+            datetime.now() - timedelta(days=7), datetime.now()
+        )[0]
+        self.assertIsInstance(best_part, PartRow)
+        self.assertEqual((best_part.part_number, total_quantity), ('P001', 15))
+
     def test_empty_period_report(self):
         # Test report for future date
         future_date = datetime.now() + timedelta(days=30)
@@ -0,0 +1,60 @@
+import os
+import pytest
+from sqlalchemy.orm import sessionmaker
+from database.models import Part
+from database.queries import PartRow
+from tests.conftest import setup_test_db, cleanup_test_db
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from gui.scan_worker import BarcodeScanner
+
+pytestmark = [
+    pytest.mark.ui,
+]
+
+@pytest.fixture
+def session_factory():
+    session, engine = setup_test_db()
+    session.add_all([
+        Part(part_number=f'OF-{i:04d}', name=f'Oil Filter {i}', type='فلاتر',
+             quantity=5, cost_price=5, selling_price=8, barcode=f'628{i:010d}')
+        for i in range(20)
+    ])
+    session.commit()
+    yield sessionmaker(bind=engine)
+    session.close()
+    engine.dispose()
+    cleanup_test_db()
+
+class TestBarcodeScanner:
+    def test_scans_arrive_in_order(self, qtbot, session_factory):
+        scanner = BarcodeScanner(session_factory=session_factory)
+        scanner.rebuild_index()
+        received = []
+        scanner.part_scanned.connect(lambda code, part: received.append(part.part_number))
+        scanner.scan_failed.connect(lambda code: received.append(None))
+
+        codes = ['6280000000003', 'of0007', 'NOPE', '6280000000003']
+        with qtbot.waitSignals([scanner.part_scanned] * 3 + [scanner.scan_failed], timeout=3000):
+            for code in codes:
+                scanner.scan(code)
+        scanner.shutdown()
+
+        assert received == ['OF-0003', 'OF-0007', None, 'OF-0003']
+        assert scanner.index.ready
+
+    def test_repeated_scans_increment_cart_quantity(self, qtbot):
+        from gui.sales_ui import SalesUI
+        window = SalesUI()
+        qtbot.addWidget(window)
+        part = PartRow(1, 'OF-0001', 'Oil Filter 1', 'فلاتر', 2, 5.0, 8.0)
+
+        window.add_scanned_part('6280000000001', part)
+        window.add_scanned_part('6280000000001', part)
+        window.add_scanned_part('OF-0001', part)
+
+        assert window.cart_lines == [['OF-0001', 'Oil Filter 1', 3, 8.0]]
+        assert window.cart_table.item(0, 2).text() == '3'
+        assert 'غير متوفرة' in window.scan_status.text()
+        window.scanner.shutdown()
@@ -0,0 +1,111 @@
+import unittest
+from app.search import PartSearch
+from database.models import Part
+from database.queries import PartRow
+from tests.conftest import setup_test_db, cleanup_test_db
+
+class TestPartSearch(unittest.TestCase):
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.search = PartSearch(self.session)
+
+        self.session.add_all([
+            Part(part_number='OF-1001', name='فلتر زيت', type='فلاتر',
+                 quantity=10, cost_price=5, selling_price=8),
+            Part(part_number='BP-2002', name='Brake Pad', type='فرامل',
+                 quantity=4, cost_price=20, selling_price=30),
+            Part(part_number='AF-3003', name='Air Filter', type='فلاتر',
+                 quantity=7, cost_price=6, selling_price=9),
+        ])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def test_search_by_part_number_substring(self):
+        results = self.search.search('2002')
+        self.assertEqual([part.part_number for part in results], ['BP-2002'])
+
+    def test_search_by_name_and_type(self):
+        self.assertEqual(len(self.search.search('filter')), 1)
+        self.assertEqual(len(self.search.search('فلاتر')), 2)
+        self.assertEqual(self.search.search('زيت')[0].part_number, 'OF-1001')
+
+    def test_part_number_match_ranked_first(self):
+        self.session.add(Part(part_number='X-99', name='Kit for BP-2002',
+                              type='فرامل', quantity=1, cost_price=1, selling_price=2))
+        self.session.commit()
+
+        results = self.search.search('BP-2002')
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].part_number, 'BP-2002')
+
+    def test_index_follows_updates_and_deletes(self):
+        part = self.session.query(Part).filter_by(part_number='AF-3003').first()
+        part.name = 'Cabin Filter'
+        self.session.commit()
+
+        self.assertEqual(len(self.search.search('Air Filter')), 0)
+        self.assertEqual(len(self.search.search('Cabin')), 1)
+
+        self.session.delete(part)
+        self.session.commit()
+        self.assertEqual(len(self.search.search('Cabin')), 0)
+
+    def test_short_term_and_empty_term(self):
+        self.assertEqual(len(self.search.search('BP')), 1)
+        self.assertEqual(len(self.search.search('')), 3)
+        self.assertEqual(len(self.search.search('', limit=2)), 2)
+
+    def test_search_rows_match_search(self):
+        for term in ('فلتر', 'BP', ''):
+            rows = self.search.search_rows(term)
+            self.assertEqual([row.part_number for row in rows],
+                             [part.part_number for part in self.search.search(term)])
+            self.assertTrue(all(isinstance(row, PartRow) for row in rows))
+
+    def test_arabic_spelling_variants(self):
+        self.session.add_all([
+            Part(part_number='BT-4004', name='بطّارية إضاءة', type='كهرباء',
+                 quantity=3, cost_price=50, selling_price=70),
+            Part(part_number='LM-5005', name='أضواء أمامية', type='كهرباء',
+                 quantity=3, cost_price=50, selling_price=70),
+        ])
+        self.session.commit()
+
+        self.assertEqual([part.part_number for part in self.search.search('بطاريه')], ['BT-4004'])
+        self.assertEqual([part.part_number for part in self.search.search('اضاءة')], ['BT-4004'])
+        # الكلمات القصيرة تطابق أي جزء من مفتاح الاسم أو رقم القطعة
+        self.assertEqual(sorted(part.part_number for part in self.search.search('اض')),
+                         ['BT-4004', 'LM-5005'])
+        self.assertEqual([part.part_number for part in self.search.search('bt')], ['BT-4004'])
+        # النوع غير موحد فيُطابق كما كُتب
+        self.assertEqual(len(self.search.search('كهرباء')), 2)
+
+    def test_short_term_matches_inside_part_number(self):
+        self.session.add_all([
+            Part(part_number='P00012', name='Spark Plug', type='محرك',
+                 quantity=1, cost_price=1, selling_price=2),
+            Part(part_number='OF1001', name='Oil Filter', type='فلاتر',
+                 quantity=1, cost_price=1, selling_price=2),
+        ])
+        self.session.commit()
+
+        self.assertIn('P00012', [part.part_number for part in self.search.search('12')])
+        self.assertEqual([part.part_number for part in self.search.search('f1')], ['OF1001'])
+
+    def test_name_key_follows_updates(self):
+        part = self.session.query(Part).filter_by(part_number='OF-1001').first()
+        part.name = 'فلتر هواء'
+        self.session.commit()
+        self.assertEqual(part.name_key, 'فلتر هواء')
+        self.assertEqual(self.search.search('زيت'), [])
+        self.assertEqual(len(self.search.search('هواء')), 1)
+
+    def test_quotes_in_term(self):
+        self.assertEqual(self.search.search('"brake'), [])
+
+if __name__ == '__main__':
+    unittest.main()
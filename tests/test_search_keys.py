@@ -0,0 +1,53 @@
+import sqlite3
+import unittest
+from database.db_setup import add_name_key
+from database.search_keys import normalize_search_key, search_key_sql, prefix_bounds
+
+NAMES = ['  أحمد إبراهيم ', 'مُحَمَّد', 'فاطمة', 'مصطفى', 'عـلـي', 'آمنة', 'Oil FILTER', 'ÉCOLE']
+
+class TestSearchKeys(unittest.TestCase):
+    """اختبار توحيد مفاتيح البحث العربية وتطابقها بين بايثون و SQLite"""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE workers (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        self.conn.executemany("INSERT INTO workers (name) VALUES (?)", [(name,) for name in NAMES])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_normalize_variants(self):
+        self.assertEqual(normalize_search_key('أحمد'), normalize_search_key('احمد'))
+        self.assertEqual(normalize_search_key('إسلام'), 'اسلام')
+        self.assertEqual(normalize_search_key('مصطفى'), 'مصطفي')
+        self.assertEqual(normalize_search_key('فاطمة'), 'فاطمه')
+        self.assertEqual(normalize_search_key('مُحَمَّـد'), 'محمد')
+        self.assertEqual(normalize_search_key(' Brake PAD '), 'brake pad')
+        self.assertEqual(normalize_search_key(None), '')
+
+    def test_generated_column_matches_python(self):
+        add_name_key(self.conn.execute, 'workers')
+        for name, key in self.conn.execute("SELECT name, name_key FROM workers"):
+            self.assertEqual(key, normalize_search_key(name), name)
+
+        # الصفوف الجديدة والمعدلة تُحسب مفاتيحها عند الكتابة
+        self.conn.execute("UPDATE workers SET name = 'أسامة' WHERE id = 1")
+        self.assertEqual(self.conn.execute(
+            "SELECT name_key FROM workers WHERE id = 1").fetchone()[0], 'اسامه')
+
+    def test_prefix_search_uses_index(self):
+        add_name_key(self.conn.execute, 'workers')
+        add_name_key(self.conn.execute, 'workers')  # إعادة الإضافة لا تفشل
+
+        sql = "SELECT name FROM workers WHERE name_key >= ? AND name_key < ?"
+        bounds = prefix_bounds(normalize_search_key('اَحمد'))
+        self.assertEqual([row[0] for row in self.conn.execute(sql, bounds)], ['  أحمد إبراهيم '])
+        plan = [row[3] for row in self.conn.execute("EXPLAIN QUERY PLAN " + sql, bounds)]
+        self.assertIn('idx_workers_name_key', plan[0])
+
+    def test_sql_expression_for_column(self):
+        self.assertTrue(search_key_sql('name').startswith('trim(lower('))
+        self.assertIn("'ى', 'ي'", search_key_sql('name'))
+
+if __name__ == '__main__':
+    unittest.main()
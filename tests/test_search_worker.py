@@ -0,0 +1,84 @@
+import os
+import pytest
+from sqlalchemy.orm import sessionmaker
+from database.models import Part
+from tests.conftest import setup_test_db, cleanup_test_db
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from gui import search_worker
+from gui.search_worker import DebouncedSearch
+
+pytestmark = [
+    pytest.mark.ui,
+]
+
+@pytest.fixture
+def test_session(monkeypatch):
+    session, engine = setup_test_db()
+    session.add_all([
+        Part(part_number=f'OF-{i:04d}', name=f'Oil Filter {i}', type='فلاتر',
+             quantity=i, cost_price=5, selling_price=8)
+        for i in range(20)
+    ])
+    session.commit()
+    monkeypatch.setattr(search_worker, 'Session', sessionmaker(bind=engine))
+    yield session
+    session.close()
+    engine.dispose()
+    cleanup_test_db()
+
+class TestDebouncedSearch:
+    def test_only_latest_request_is_applied(self, qtbot, test_session):
+        search = DebouncedSearch(delay=50)
+        received = []
+        search.results_ready.connect(received.append)
+
+        # محاكاة كتابة رقم القطعة حرفاً حرفاً
+        for text in ['O', 'OF', 'OF-', 'OF-0', 'OF-00', 'OF-001']:
+            search.request(text)
+
+        with qtbot.waitSignal(search.results_ready, timeout=3000):
+            pass
+        search.shutdown()
+
+        assert len(received) == 1
+        assert sorted(part.part_number for part in received[0]) == [
+            f'OF-{i:04d}' for i in range(10, 20)
+        ]
+
+    def test_request_now_skips_delay(self, qtbot, test_session):
+        search = DebouncedSearch(delay=10000)
+        with qtbot.waitSignal(search.results_ready, timeout=3000) as blocker:
+            search.request_now('Filter 7')
+        search.shutdown()
+
+        assert [part.part_number for part in blocker.args[0]] == ['OF-0007']
+
+    def test_superseded_results_are_dropped(self, qtbot, test_session):
+        search = DebouncedSearch(delay=10)
+        received = []
+        search.results_ready.connect(received.append)
+
+        search.request_now('OF-0003')
+        search.request_now('OF-0004')
+
+        qtbot.waitUntil(lambda: len(received) >= 1, timeout=3000)
+        qtbot.wait(200)
+        search.shutdown()
+
+        assert [[part.part_number for part in parts] for parts in received] == [['OF-0004']]
+
+    def test_clearing_sales_search_shows_all_parts(self, qtbot, monkeypatch, test_session):
+        from gui import sales_ui
+        monkeypatch.setattr(sales_ui, 'Session', sessionmaker(bind=test_session.get_bind()))
+        window = sales_ui.SalesUI()
+        qtbot.addWidget(window)
+
+        window.search_input.setText('OF-0003')
+        window.search_input.setText('')
+        qtbot.wait(500)
+        window.part_search.shutdown()
+        window.scanner.shutdown()
+
+        assert window.parts_model.rowCount() == 20
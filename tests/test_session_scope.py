@@ -0,0 +1,44 @@
+import unittest
+from sqlalchemy.orm import sessionmaker
+from database.db_setup import session_scope
+from database.models import Part
+from tests.conftest import setup_test_db, cleanup_test_db
+
+class TestSessionScope(unittest.TestCase):
+    """اختبار جلسات العمليات القصيرة (unit of work)"""
+
+    def setUp(self):
+        self.session, self.engine = setup_test_db()
+        self.factory = sessionmaker(bind=self.engine)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        cleanup_test_db()
+
+    def add_part(self, session, part_number):
+        session.add(Part(part_number=part_number, name='فلتر زيت', type='محرك',
+                         quantity=5, cost_price=10, selling_price=15))
+
+    def test_commits_and_closes_on_success(self):
+        with session_scope(self.factory) as session:
+            self.add_part(session, 'P001')
+            part_id = session.query(Part.id).filter_by(part_number='P001').scalar()
+
+        self.assertEqual(len(session.identity_map), 0)
+        self.assertFalse(session.in_transaction())
+        self.assertIsNotNone(part_id)
+        self.assertEqual(self.session.query(Part).filter_by(part_number='P001').count(), 1)
+
+    def test_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with session_scope(self.factory) as session:
+                self.add_part(session, 'P002')
+                session.flush()
+                raise ValueError("فشل العملية")
+
+        self.assertEqual(len(session.identity_map), 0)
+        self.assertEqual(self.session.query(Part).filter_by(part_number='P002').count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
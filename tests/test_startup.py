@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# أقصى عدد وحدات جديدة يحملها main فوق PyQt5.QtWidgets قبل ظهور نافذة الدخول
+STARTUP_MODULE_BUDGET = 60
+
+# أقصى زمن استيراد main (تراكمي، بالميلي ثانية) - المقاس حالياً قرابة 85
+# ومسار الاستيراد الكامل القديم قرابة 500، فيفشل الاختبار إن عاد
+STARTUP_IMPORT_BUDGET_MS = 200
+
+# وحدات ثقيلة لا يجب تحميلها قبل تسجيل الدخول
+DEFERRED_MODULES = (
+    'sqlalchemy', 'gui.main_window', 'gui.sales_ui', 'gui.inventory_ui',
+    'gui.reporting_ui', 'gui.workers_ui', 'gui.attendance_ui', 'gui.report_windows',
+    'PyQt5.QtPrintSupport', 'app', 'database.models', 'database.db_setup',
+    'xlsxwriter', 'openpyxl', 'pandas',
+)
+
+STARTUP_SCRIPT = """
+import json, sys
+import PyQt5.QtWidgets
+before = set(sys.modules)
+import main
+created = main.ensure_database()
+print(json.dumps({'created': created, 'modules': sorted(set(sys.modules) - before)}))
+"""
+
+def run_python(code, cwd, *options):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, QT_QPA_PLATFORM='offscreen')
+    return subprocess.run(
+        [sys.executable, *options, '-c', code],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+
+class TestStartupImports(unittest.TestCase):
+    """ميزانية الاستيراد عند بدء التشغيل"""
+
+    @classmethod
+    def setUpClass(cls):
+        # قاعدة بيانات محدثة كما تكون بعد أول تشغيل
+        cls.directory = tempfile.TemporaryDirectory()
+        run_python("from database.db_setup import init_db; init_db()", cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_login_path_defers_heavy_modules(self):
+        result = json.loads(run_python(STARTUP_SCRIPT, self.directory.name).stdout)
+        self.assertFalse(result['created'])
+
+        loaded = [
+            module for module in result['modules']
+            if any(module == name or module.startswith(name + '.') for name in DEFERRED_MODULES)
+        ]
+        self.assertEqual(loaded, [])
+        self.assertLessEqual(len(result['modules']), STARTUP_MODULE_BUDGET)
+
+    def test_startup_import_time_budget(self):
+        stderr = run_python("import main", self.directory.name, '-X', 'importtime').stderr
+        cumulative = [
+            int(line.split('|')[1]) for line in stderr.splitlines()
+            if line.startswith('import time:') and line.split('|')[2].strip() == 'main'
+        ]
+        self.assertEqual(len(cumulative), 1)
+        self.assertLessEqual(cumulative[0] / 1000, STARTUP_IMPORT_BUDGET_MS)
+
+    def test_first_run_initializes_database(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = json.loads(run_python(STARTUP_SCRIPT, directory).stdout)
+            self.assertTrue(result['created'])
+            self.assertTrue(os.path.exists(os.path.join(directory, 'database', 'workers.db')))
+
+if __name__ == '__main__':
+    unittest.main()
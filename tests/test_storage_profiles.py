@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import unittest
+from unittest.mock import patch
+from sqlalchemy import create_engine, event, text
+from database import connection
+from database.connection import (STORAGE_PROFILES, ConnectionPool, configure_connection,
+                                 get_storage_profile, set_storage_profile)
+from benchmarks import storage_profiles
+from tests.conftest import setup_test_attendance_db, cleanup_test_db, TEST_SQLITE_DB
+
+def read_pragmas(conn):
+    return {
+        name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        for name in ('journal_mode', 'synchronous', 'cache_size', 'busy_timeout', 'temp_store')
+    }
+
+class TestStorageProfiles(unittest.TestCase):
+    """اختبار ملفات تخزين SQLite"""
+
+    def setUp(self):
+        setup_test_attendance_db()
+        self.pools = []
+
+    def tearDown(self):
+        for pool in self.pools:
+            pool.close()
+        cleanup_test_db()
+
+    def open_pool(self, profile):
+        pool = ConnectionPool(TEST_SQLITE_DB, profile=profile)
+        self.pools.append(pool)
+        return pool
+
+    def test_multi_terminal_profile(self):
+        conn = self.open_pool('multi-terminal').acquire()
+        pragmas = read_pragmas(conn)
+        conn.close()
+        self.assertEqual(pragmas['journal_mode'], 'wal')
+        self.assertEqual(pragmas['synchronous'], 1)  # NORMAL
+        self.assertEqual(pragmas['cache_size'], -32000)
+        self.assertEqual(pragmas['temp_store'], 2)  # MEMORY
+
+    def test_single_terminal_profile(self):
+        conn = self.open_pool('single-terminal').acquire()
+        pragmas = read_pragmas(conn)
+        conn.close()
+        self.assertEqual(pragmas['journal_mode'], 'delete')
+        self.assertEqual(pragmas['synchronous'], 2)  # FULL
+        self.assertEqual(pragmas['busy_timeout'], 5000)
+
+    def test_sqlalchemy_engine_uses_profile(self):
+        engine = create_engine(f"sqlite:///{TEST_SQLITE_DB}")
+        event.listen(
+            engine, 'connect',
+            lambda dbapi_connection, record: configure_connection(dbapi_connection, 'bulk-load')
+        )
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 0)  # OFF
+            self.assertEqual(conn.execute(text("PRAGMA busy_timeout")).scalar(), 30000)
+        engine.dispose()
+
+    def test_wal_lets_sales_write_during_report_read(self):
+        pool = self.open_pool('multi-terminal')
+        reader = pool.acquire()
+        reader.execute("BEGIN")
+        reader.execute("SELECT COUNT(*) FROM attendance").fetchone()
+
+        writer = sqlite3.connect(TEST_SQLITE_DB, timeout=0)
+        writer.execute("UPDATE workers SET salary = salary + 1 WHERE id = 1")
+        writer.commit()
+        writer.close()
+
+        reader.execute("COMMIT")
+        reader.close()
+
+    def test_profile_selected_from_config(self):
+        previous = connection._storage_profile
+        try:
+            connection._storage_profile = None
+            with patch.dict(os.environ):
+                os.environ.pop('MAHALLI_STORAGE_PROFILE', None)
+                # WAL يُفعّل صراحة فقط
+                self.assertEqual(get_storage_profile(), 'single-terminal')
+            connection._storage_profile = None
+            with patch.dict(os.environ, {'MAHALLI_STORAGE_PROFILE': 'bulk-load'}):
+                self.assertEqual(get_storage_profile(), 'bulk-load')
+            set_storage_profile('single-terminal')
+            self.assertEqual(get_storage_profile(), 'single-terminal')
+            with self.assertRaises(ValueError):
+                set_storage_profile('unknown')
+        finally:
+            connection._storage_profile = previous
+
+    def test_benchmark_compares_all_profiles(self):
+        results = storage_profiles.run(parts=200, sales=5)
+        self.assertEqual(set(results), set(STORAGE_PROFILES))
+        for result in results.values():
+            self.assertEqual(result['counter_sales']['count'], 5)
+            self.assertEqual(result['contended_sales']['count'], 5)
+
+if __name__ == '__main__':
+    unittest.main()